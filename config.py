@@ -25,10 +25,96 @@ SPIDER_DELAY_JITTER = float(os.getenv('SPIDER_DELAY_JITTER', '1.0'))   # 随机
 MIN_DELAY = float(os.getenv('MIN_DELAY', SPIDER_DELAY_SECONDS))
 MAX_DELAY = float(os.getenv('MAX_DELAY', SPIDER_DELAY_SECONDS + SPIDER_DELAY_JITTER))
 
+# 限速配置（按主机的令牌桶，所有爬虫共享）
+# 默认速率沿用 SPIDER_DELAY_SECONDS：每个主机平均每 SPIDER_DELAY_SECONDS 秒一个请求
+SPIDER_RATE_PER_HOST = float(os.getenv(
+    'SPIDER_RATE_PER_HOST',
+    str(1 / SPIDER_DELAY_SECONDS) if SPIDER_DELAY_SECONDS > 0 else '0'
+))  # 请求/秒，0 表示不限速
+SPIDER_RATE_BURST = float(os.getenv('SPIDER_RATE_BURST', '2'))    # 允许的突发请求数
+SPIDER_RATE_JITTER = float(os.getenv('SPIDER_RATE_JITTER', '0.5'))  # 需要等待时附加的随机延时上限（秒）
+# 按站点覆盖速率，格式：host=rate,host=rate（如 www.wstx.com=1,www.inwaishe.com=0.5）
+SPIDER_HOST_RATES = {
+    host.strip(): float(rate)
+    for host, _, rate in (item.partition('=') for item in os.getenv('SPIDER_HOST_RATES', '').split(','))
+    if host.strip() and rate.strip()
+}
+
+# 自适应限速（AutoThrottle）：按实测延迟与错误率动态调整每个主机的请求间隔和并发数
+SPIDER_AUTOTHROTTLE = os.getenv('SPIDER_AUTOTHROTTLE', 'false').lower() == 'true'
+AUTOTHROTTLE_TARGET_CONCURRENCY = float(os.getenv('AUTOTHROTTLE_TARGET_CONCURRENCY', '2.0'))  # 期望在途请求数
+AUTOTHROTTLE_START_DELAY = float(os.getenv('AUTOTHROTTLE_START_DELAY', str(SPIDER_DELAY_SECONDS)))  # 初始间隔（秒）
+AUTOTHROTTLE_MIN_DELAY = float(os.getenv('AUTOTHROTTLE_MIN_DELAY', '0.2'))   # 最小间隔（秒）
+AUTOTHROTTLE_MAX_DELAY = float(os.getenv('AUTOTHROTTLE_MAX_DELAY', '30'))    # 最大间隔（秒）
+
+# 重试与熔断
+# 可重试的状态码（其余非 2xx 响应如 403/404 不重试）；超时/连接错误总是重试
+SPIDER_RETRY_STATUS = {
+    int(code) for code in os.getenv('SPIDER_RETRY_STATUS', '429,500,502,503,504').split(',') if code.strip()
+}
+SPIDER_RETRY_BACKOFF = float(os.getenv('SPIDER_RETRY_BACKOFF', '1.0'))        # 首次重试的退避基数（秒），之后逐次翻倍
+SPIDER_RETRY_BACKOFF_MAX = float(os.getenv('SPIDER_RETRY_BACKOFF_MAX', '30'))  # 退避上限（秒）
+SPIDER_RETRY_AFTER_MAX = float(os.getenv('SPIDER_RETRY_AFTER_MAX', '120'))     # 服务端 Retry-After 的等待上限（秒）
+# 熔断：同一主机连续故障（超时/连接错误、5xx）达到次数后不再请求该主机（0 = 不熔断）
+SPIDER_CIRCUIT_THRESHOLD = int(os.getenv('SPIDER_CIRCUIT_THRESHOLD', '5'))
+# 熔断冷却时间（秒）：到期后放行一个探测请求，成功则恢复；0 = 熔断持续到本次运行结束
+SPIDER_CIRCUIT_COOLDOWN = float(os.getenv('SPIDER_CIRCUIT_COOLDOWN', '0'))
+
+# 并发配置
+# 单个站点（主机）同时抓取的详情页上限；设为 1 则退回逐篇顺序抓取
+SPIDER_CONCURRENCY = int(os.getenv('SPIDER_CONCURRENCY', '4'))
+# 列表页预取深度：处理当前页详情页的同时预先抓取后续 K 个列表页（0 = 不预取）
+SPIDER_LIST_PREFETCH = int(os.getenv('SPIDER_LIST_PREFETCH', '2'))
+# 单个站点的抓取超时（秒），各站点并行运行、互不影响
+SPIDER_SITE_TIMEOUT = float(os.getenv('SPIDER_SITE_TIMEOUT', '1800'))
+# 快速解析：用 lxml 直接建树代替完整的 BeautifulSoup 树（输出一致，解析耗时显著降低）
+SPIDER_FAST_PARSE = os.getenv('SPIDER_FAST_PARSE', 'true').lower() == 'true'
+# 解析进程数：>0 时详情页 HTML 交给该数量的解析进程（多核并行解析，网络请求仍在线程中并发），0 = 在抓取线程中解析
+SPIDER_PARSE_WORKERS = int(os.getenv('SPIDER_PARSE_WORKERS', '0'))
+# 额外站点描述文件（JSON 数组，每项描述一个站点的列表页 URL、链接正则、选择器等，格式见 spider.make_site_adapter）
+SPIDER_SITES_FILE = os.getenv('SPIDER_SITES_FILE', '')
+
+# 页码定位（回填历史月份）：先指数探测再二分查找目标月份所在的列表页范围，只抓取该范围
+# auto = 目标月份早于上个月时启用；true / false = 总是 / 从不启用
+SPIDER_LOCATE_PAGES = os.getenv('SPIDER_LOCATE_PAGES', 'auto').lower()
+SPIDER_LOCATE_MAX_PAGE = int(os.getenv('SPIDER_LOCATE_MAX_PAGE', '2000'))  # 探测的最大页码
+
 # 输出配置
 OUTPUT_DIR = 'output'
 OUTPUT_EXCEL = f'report_data_{TARGET_YEAR}_{TARGET_MONTH:02d}.xlsx'
 OUTPUT_JSON = f'report_data_{TARGET_YEAR}_{TARGET_MONTH:02d}.json'
+OUTPUT_PARQUET = f'report_data_{TARGET_YEAR}_{TARGET_MONTH:02d}.parquet'
+# 导出格式：Parquet 为完整的列式数据（需安装 pyarrow），ETL 优先读取；Excel 只是不含完整正文的摘要表
+EXPORT_PARQUET = os.getenv('OUTPUT_PARQUET', 'true').lower() == 'true'
+EXPORT_EXCEL = os.getenv('OUTPUT_EXCEL', 'true').lower() == 'true'
+
+# 抓取状态目录（增量抓取高水位线、续抓检查点等）
+CRAWL_STATE_DIR = os.getenv('CRAWL_STATE_DIR', os.path.join(OUTPUT_DIR, 'crawl_state'))
+# 抓取检查点：每完成多少篇详情页保存一次进度（每个列表页开始时也会保存），用于 --resume 续抓
+SPIDER_CHECKPOINT_EVERY = int(os.getenv('SPIDER_CHECKPOINT_EVERY', '10'))
+
+# 流式导出：每篇文章解析完即追加到 report_data_YYYY_MM.jsonl，抓取结束后再生成 JSON / Excel
+SPIDER_STREAM_JSONL = os.getenv('SPIDER_STREAM_JSONL', 'true').lower() == 'true'
+SPIDER_JSONL_FSYNC_EVERY = int(os.getenv('SPIDER_JSONL_FSYNC_EVERY', '20'))  # 每写入多少篇 fsync 一次
+
+# 正文内容存储：content_text / content_html 按内容哈希压缩存放，文章记录中只保留引用（相同正文只存一份）
+CONTENT_STORE = os.getenv('CONTENT_STORE', 'true').lower() == 'true'
+CONTENT_STORE_DIR = os.getenv('CONTENT_STORE_DIR', os.path.join(OUTPUT_DIR, 'content_store'))
+CONTENT_STORE_CODEC = os.getenv('CONTENT_STORE_CODEC', 'auto')          # auto|zstd|gzip（zstd 需安装 zstandard）
+CONTENT_STORE_CACHE = int(os.getenv('CONTENT_STORE_CACHE', '64'))       # 内存中缓存的已解压正文数
+
+# HTTP 缓存配置（磁盘缓存 + 条件请求，重复运行时避免重新下载）
+SPIDER_HTTP_CACHE = os.getenv('SPIDER_HTTP_CACHE', 'true').lower() == 'true'
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join(OUTPUT_DIR, 'http_cache'))
+HTTP_CACHE_LIST_TTL = float(os.getenv('HTTP_CACHE_LIST_TTL', '600'))           # 列表页新鲜期（秒）
+HTTP_CACHE_ARTICLE_TTL = float(os.getenv('HTTP_CACHE_ARTICLE_TTL', '2592000'))  # 文章页新鲜期（秒，默认 30 天）
+HTTP_CACHE_MAX_MB = float(os.getenv('HTTP_CACHE_MAX_MB', '512'))               # 缓存总大小上限（MB）
+
+# 抓取录制与回放（离线基准 / 回归测试，见 http_archive.py）
+# 录制：每次 HTTP 交换追加到该 WARC 存档（.gz 结尾则逐条 gzip 压缩），空 = 不录制
+SPIDER_RECORD_ARCHIVE = os.getenv('SPIDER_RECORD_ARCHIVE', '')
+# 回放：所有请求改发到该回放服务（python http_archive.py 存档 启动），不访问真实站点，空 = 不回放
+SPIDER_REPLAY_URL = os.getenv('SPIDER_REPLAY_URL', '')
 
 # 日志配置
 LOG_FILE = 'spider.log'
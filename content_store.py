@@ -0,0 +1,203 @@
+"""
+正文内容存储 - 压缩 + 内容寻址
+
+文章的 content_text / content_html 按内容的 SHA-256 压缩存放在 CONTENT_STORE_DIR 下，
+文章记录（JSON / JSONL / Excel / DataFrame）中只保留 content_text_ref / content_html_ref 引用：
+- 相同正文（转载、多站点同步发布的文章）只存一份
+- 正文按需读取：DataCleaner 标题不含关键词时才读正文，LLMExtractor 处理到该产品时才拼接正文
+- 已安装 zstandard 时用 zstd 压缩，否则用 gzip（标准库）
+
+目录结构：<CONTENT_STORE_DIR>/<哈希前两位>/<哈希>.zst 或 .gz
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 存入内容存储的正文字段；记录中对应的引用字段为 <字段名>_ref
+BODY_FIELDS = ('content_text', 'content_html')
+
+_EXTENSIONS = {'zstd': '.zst', 'gzip': '.gz'}
+
+
+class ContentStore:
+    """
+    内容寻址的正文存储
+
+    put() 写入正文返回引用（UTF-8 正文的 SHA-256），已存在的内容不再重复写入；
+    get() 按引用读取，最近读取的正文缓存在内存中（同一产品的正文会被多个步骤读取）。
+    多个线程/进程可同时写入：文件先写临时文件再原子替换。
+    """
+
+    def __init__(self, root: str = None, codec: str = None, cache_size: int = None):
+        """
+        Args:
+            root: 存储目录，None 则使用 config.CONTENT_STORE_DIR
+            codec: 压缩方式 auto / zstd / gzip，None 则使用 config.CONTENT_STORE_CODEC
+                   （auto 在安装了 zstandard 时用 zstd；指定 zstd 但未安装时回退到 gzip）
+            cache_size: 内存中缓存的已解压正文数，None 则使用 config.CONTENT_STORE_CACHE
+        """
+        self.root = Path(root or config.CONTENT_STORE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        codec = (codec or config.CONTENT_STORE_CODEC).lower()
+        if codec == 'gzip' or zstandard is None:
+            if codec == 'zstd':
+                logger.warning("[正文存储] 未安装 zstandard，改用 gzip 压缩")
+            self.codec = 'gzip'
+        else:
+            self.codec = 'zstd'
+
+        self.cache_size = config.CONTENT_STORE_CACHE if cache_size is None else cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'deduplicated': 0, 'raw_bytes': 0, 'stored_bytes': 0,
+                      'loaded': 0, 'cache_hits': 0}
+
+    def _path(self, ref: str, codec: str) -> Path:
+        return self.root / ref[:2] / f'{ref}{_EXTENSIONS[codec]}'
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor().compress(data)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("读取 zstd 压缩的正文需要安装 zstandard")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def put(self, text: str) -> str:
+        """写入正文，返回引用；空正文返回空字符串（不占用存储）"""
+        if not text:
+            return ''
+        data = text.encode('utf-8')
+        ref = hashlib.sha256(data).hexdigest()
+
+        if any(self._path(ref, codec).exists() for codec in _EXTENSIONS):
+            with self._lock:
+                self.stats['deduplicated'] += 1
+            return ref
+
+        path = self._path(ref, self.codec)
+        path.parent.mkdir(exist_ok=True)
+        compressed = self._compress(data)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.stats['stored'] += 1
+            self.stats['raw_bytes'] += len(data)
+            self.stats['stored_bytes'] += len(compressed)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """按引用读取正文；引用为空或内容缺失时返回空字符串"""
+        if not ref:
+            return ''
+        with self._lock:
+            if ref in self._cache:
+                self._cache.move_to_end(ref)
+                self.stats['cache_hits'] += 1
+                return self._cache[ref]
+
+        for codec in (self.codec, *(c for c in _EXTENSIONS if c != self.codec)):
+            try:
+                data = self._path(ref, codec).read_bytes()
+            except OSError:
+                continue
+            text = self._decompress(data, codec).decode('utf-8')
+            break
+        else:
+            logger.warning(f"[正文存储] 内容缺失: {ref}")
+            return ''
+
+        with self._lock:
+            self.stats['loaded'] += 1
+            if self.cache_size > 0:
+                self._cache[ref] = text
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return text
+
+    def externalize(self, article: Dict) -> Dict:
+        """把文章中的正文字段换成引用，返回新的文章字典（字段顺序不变）"""
+        result = {}
+        for key, value in article.items():
+            if key in BODY_FIELDS:
+                result[f'{key}_ref'] = self.put(value or '')
+            else:
+                result[key] = value
+        return result
+
+    def log_stats(self):
+        """输出存储统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        if not (stats['stored'] or stats['deduplicated'] or stats['loaded']):
+            return
+        ratio = stats['stored_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 0
+        logger.info(
+            f"[正文存储] 新写入 {stats['stored']} 份正文（{self.codec}，{stats['raw_bytes'] / 1024:.0f} KB → "
+            f"{stats['stored_bytes'] / 1024:.0f} KB，压缩率 {ratio:.0%}），重复内容 {stats['deduplicated']} 份未重复存储，"
+            f"读取 {stats['loaded']} 次（内存命中 {stats['cache_hits']} 次）"
+        )
+
+
+# 全局共享的内容存储实例（单例模式）
+_content_store_instance = None
+_content_store_lock = threading.Lock()
+
+
+def _shared_store() -> ContentStore:
+    global _content_store_instance
+    with _content_store_lock:
+        if _content_store_instance is None:
+            _content_store_instance = ContentStore()
+        return _content_store_instance
+
+
+def get_content_store() -> Optional[ContentStore]:
+    """获取全局内容存储单例；未启用 CONTENT_STORE（新文章正文仍内联保存）时返回 None"""
+    if not config.CONTENT_STORE:
+        return None
+    return _shared_store()
+
+
+def reset_content_store():
+    """丢弃全局内容存储（修改存储配置后调用）"""
+    global _content_store_instance
+    with _content_store_lock:
+        _content_store_instance = None
+
+
+def load_body(record, field: str = 'content_text') -> str:
+    """
+    读取文章记录的正文字段：记录中内联了正文则直接返回，否则按 <字段名>_ref 从内容存储读取
+
+    record 可以是字典或 DataFrame 的一行；未启用 CONTENT_STORE 时也能读取之前写入的引用。
+    """
+    value = record.get(field)
+    if isinstance(value, str):
+        return value
+    ref = record.get(f'{field}_ref')
+    if isinstance(ref, str) and ref:
+        return _shared_store().get(ref)
+    return ''
@@ -6,6 +6,7 @@
 import pandas as pd
 import json
 import re
+import hashlib
 import os
 import shutil
 import subprocess
@@ -16,6 +17,14 @@ from difflib import SequenceMatcher
 import requests
 from typing import Dict, List, Optional, Any
 from itertools import combinations
+from content_store import load_body
+from mcp_client import get_http_pool, print_mcp_stats
+from single_flight import get_single_flight
+
+try:
+    import pyarrow.parquet as pq  # Parquet 读取（可选依赖）
+except ImportError:
+    pq = None
 
 # ==================== 配置区 ====================
 
@@ -31,6 +40,17 @@ LLM_CONFIG = {
     "base_url": "http://192.168.0.250:7777"  # 内部 API 地址
 }
 
+
+def post_llm(url: str, headers: Dict, data: Dict, timeout: int) -> requests.Response:
+    """
+    发送 LLM chat/completions 请求
+
+    多个工作线程同时发送相同的请求（URL + 请求体）时只调用一次 LLM，共享同一个响应（或异常）
+    """
+    key = hashlib.sha256(json.dumps([url, data], ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+    return get_single_flight('LLM').do(key, requests.post, url, headers=headers, json=data, timeout=timeout)
+
+
 # ==================== Top 15 标准化数据 Schema（中文版）====================
 
 # 🖱️ 鼠标 Top 15 参数定义（中文版）
@@ -627,7 +647,7 @@ def _extract_with_llm(text: str, field: str, category: str) -> Dict:
         base_url = LLM_CONFIG["base_url"].rstrip('/')
         url = f"{base_url}/v1/chat/completions"
 
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = post_llm(url, headers, data, timeout=30)
         response.raise_for_status()
         result = response.json()
 
@@ -1092,7 +1112,8 @@ AVAILABLE_TEMPLATES = {
 
 # ==================== 爬虫数据获取函数 ====================
 
-def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
+def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR, incremental: bool = False,
+               resume: bool = False) -> str:
     """
     运行爬虫采集数据
 
@@ -1100,6 +1121,8 @@ def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
         year: 目标年份
         month: 目标月份
         output_dir: 输出目录
+        incremental: 增量模式，只抓取高水位线之后的新文章并追加到已有数据集
+        resume: 从上次中断的检查点继续抓取，已采集的文章不再请求
 
     Returns:
         str: 输出的 JSON 文件路径
@@ -1130,13 +1153,39 @@ def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
         original_year = config.TARGET_YEAR
         original_month = config.TARGET_MONTH
 
-        # 运行爬虫
-        all_articles = spider.run_spider_all(target_year=year, target_month=month, max_pages=20)
+        # 运行爬虫（流式导出时文章边抓边写入 report_data_YYYY_MM.jsonl）
+        stream = config.SPIDER_STREAM_JSONL or resume
+        all_articles = spider.run_spider_all(target_year=year, target_month=month, max_pages=20,
+                                             incremental=incremental, stream=stream, resume=resume)
 
         # 恢复原始配置
         config.TARGET_YEAR = original_year
         config.TARGET_MONTH = original_month
 
+        if stream:
+            # 由 JSONL 生成 JSON / Excel（增量模式下 JSONL 已包含之前的数据）
+            exporter = spider.DataExporter()
+            target_jsonl = output_dir / f'report_data_{year}_{month:02d}.jsonl'
+            total = 0
+            if target_jsonl.exists():
+                total = exporter.export_jsonl(target_jsonl, target_json.name, f'report_data_{year}_{month:02d}.xlsx')
+            if total:
+                print(f"\n{'='*60}")
+                print(f"✓ 爬取完成！本次采集 {len(all_articles)} 条，数据集共 {total} 条")
+                print(f"✓ 数据已保存: {target_json}")
+                print(f"{'='*60}\n")
+                return str(target_json)
+
+        # 增量模式：新文章追加到已有数据集
+        elif incremental and target_json.exists():
+            exporter = spider.DataExporter()
+            if all_articles:
+                all_articles = exporter.merge_into_json(all_articles, filename=target_json.name)
+                exporter.export_tables(all_articles, f'report_data_{year}_{month:02d}.xlsx')
+            else:
+                print(f"[INFO] 增量抓取没有发现新文章，沿用已有数据: {target_json}")
+            return str(target_json)
+
         # 验证数据
         if not all_articles:
             print(f"\n{'='*60}")
@@ -1151,7 +1200,7 @@ def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
         # 导出数据
         exporter = spider.DataExporter()
         exporter.export_to_json(all_articles, filename=f'report_data_{year}_{month:02d}.json')
-        exporter.export_to_excel(all_articles, filename=f'report_data_{year}_{month:02d}.xlsx')
+        exporter.export_tables(all_articles, f'report_data_{year}_{month:02d}.xlsx')
 
         print(f"\n{'='*60}")
         print(f"✓ 爬取完成！共采集 {len(all_articles)} 条数据")
@@ -1170,8 +1219,13 @@ def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
         env['TARGET_MONTH'] = str(month)
 
         # 运行 spider.py
+        command = [sys.executable, 'spider.py', '--month', f'{year}-{month:02d}']
+        if incremental:
+            command.append('--incremental')
+        if resume:
+            command.append('--resume')
         result = subprocess.run(
-            [sys.executable, 'spider.py'],
+            command,
             env=env,
             capture_output=True,
             text=True
@@ -1210,12 +1264,46 @@ def fetch_data(year: int, month: int, output_dir: Path = OUTPUT_DIR) -> str:
 
 # ==================== 任务一：数据预处理与清洗 ====================
 
+def get_combined_content(product: Dict) -> str:
+    """
+    产品的合并正文（各条记录的来源、标题与正文）
+
+    记录只带正文引用（content_text_ref）时从内容存储按需读取，结果不保存在产品数据中，
+    处理完一个产品即可释放。
+    """
+    if product.get('combined_content'):
+        return product['combined_content']
+    return '\n\n---\n\n'.join([
+        f"来源: {r['source']}\n标题: {r['title']}\n{load_body(r, 'content_text')}"
+        for r in product.get('records', [])
+    ])
+
+
 class DataCleaner:
     """数据清洗器 - Phase 4 增强版"""
 
+    # 读取 JSONL 时每批解析的行数
+    JSONL_CHUNKSIZE = 500
+    # 清洗与报告用到的列（读取 Parquet 时只载入这些列，不读 content_html 等大字段）
+    COLUMNS = ['source', 'title', 'publish_date', 'url', 'author', 'images', 'content_text', 'content_text_ref']
+
     def __init__(self, file_path: str):
         # 自动检测文件格式并读取
-        if file_path.endswith('.json'):
+        if file_path.endswith('.parquet'):
+            # 爬虫导出的 Parquet：按列读取，只载入需要的列
+            if pq is None:
+                raise ImportError("读取 Parquet 需要安装 pyarrow（pip install pyarrow）")
+            available = pq.read_schema(file_path).names
+            self.df = pd.read_parquet(file_path, columns=[c for c in self.COLUMNS if c in available])
+            # 列表列（images）读回为 numpy 数组：转回 list，与 JSON 输入一致（产品记录需可 JSON 序列化）
+            if 'images' in self.df.columns:
+                self.df['images'] = self.df['images'].map(
+                    lambda v: list(v) if v is not None and not isinstance(v, (str, list, float)) else v)
+        elif file_path.endswith('.jsonl'):
+            # 爬虫流式导出的 JSONL：分批解析，不先把整个文件载入成一个大列表
+            chunks = pd.read_json(file_path, lines=True, chunksize=self.JSONL_CHUNKSIZE)
+            self.df = pd.concat(chunks, ignore_index=True)
+        elif file_path.endswith('.json'):
             self.df = pd.read_json(file_path)
         elif file_path.endswith(('.xlsx', '.xls')):
             self.df = pd.read_excel(file_path, engine='openpyxl' if file_path.endswith('.xlsx') else 'xlrd')
@@ -1232,9 +1320,11 @@ class DataCleaner:
             text = str(text).lower()
             return any(kw in text for kw in KEYWORDS)
 
-        # 筛选标题或正文包含关键词的记录
-        mask = self.df['title'].apply(contains_keyword) | \
-               self.df['content_text'].apply(contains_keyword)
+        # 筛选标题或正文包含关键词的记录（标题已命中时不再读取正文）
+        mask = self.df.apply(
+            lambda row: contains_keyword(row['title']) or contains_keyword(load_body(row, 'content_text')),
+            axis=1, result_type='reduce'
+        ).astype(bool)
 
         filtered_df = self.df[mask].copy()
         print(f"[OK] 关键词筛选后: {len(filtered_df)} 条记录")
@@ -1266,6 +1356,7 @@ class DataCleaner:
 
         # 按发布时间排序（最新的在前）
         df = df.sort_values('publish_date', ascending=False)
+        inline_bodies = 'content_text_ref' not in df.columns
 
         used_indices = set()
 
@@ -1314,12 +1405,9 @@ class DataCleaner:
             # 只保存第一张图片
             current_product['images'] = [first_image] if first_image else []
 
-            # 合并所有正文内容
-            combined_content = '\n\n---\n\n'.join([
-                f"来源: {r['source']}\n标题: {r['title']}\n{r['content_text']}"
-                for r in current_product['records']
-            ])
-            current_product['combined_content'] = combined_content
+            # 合并所有正文内容（正文在内容存储中时不预先拼接，由 get_combined_content 按需读取）
+            if inline_bodies:
+                current_product['combined_content'] = get_combined_content(current_product)
 
             products.append(current_product)
             used_indices.add(i)
@@ -1331,6 +1419,9 @@ class DataCleaner:
     @staticmethod
     def _parse_images(images_str: str) -> List[str]:
         """解析图片字符串"""
+        if not isinstance(images_str, str) and hasattr(images_str, '__len__'):
+            # JSON 中的列表 / Parquet 中的数组
+            return [str(image) for image in images_str]
         if pd.isna(images_str):
             return []
 
@@ -1713,8 +1804,6 @@ class ParameterCompleter:
         Returns:
             提取的参数值
         """
-        import requests
-
         # 构造 LLM 提示
         prompt = f"""你是一个专业的外设参数提取助手。
 
@@ -1760,7 +1849,7 @@ class ParameterCompleter:
             base_url = self.llm_config.get("base_url", "").rstrip('/')
             url = f"{base_url}/v1/chat/completions"
 
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = post_llm(url, headers, data, timeout=30)
             response.raise_for_status()
 
             result = response.json()
@@ -1866,8 +1955,6 @@ class ParameterCompleter:
         Returns:
             参数字典 {field: value}
         """
-        import requests
-
         # 根据类别定义要提取的字段
         if category == '鼠标':
             fields_definition = """
@@ -1941,7 +2028,7 @@ class ParameterCompleter:
             base_url = self.llm_config.get("base_url", "").rstrip('/')
             url = f"{base_url}/v1/chat/completions"
 
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = post_llm(url, headers, data, timeout=30)
             response.raise_for_status()
 
             result = response.json()
@@ -2116,8 +2203,6 @@ class ParameterCompleter:
         Returns:
             提取的参数字典
         """
-        import requests
-
         # 构造字段说明
         fields_desc = "\n".join([f"  - {field} ({fields[field]}): 参数值" for field in fields])
 
@@ -2166,7 +2251,7 @@ class ParameterCompleter:
             base_url = self.llm_config.get("base_url", "").rstrip('/')
             url = f"{base_url}/v1/chat/completions"
 
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = post_llm(url, headers, data, timeout=30)
             response.raise_for_status()
 
             result = response.json()
@@ -2198,7 +2283,6 @@ class ParameterCompleter:
         Returns:
             搜索结果摘要文本
         """
-        import requests
         import json
 
         url = f"{self.search_config['base_url']}/mcp_web_search"
@@ -2226,7 +2310,7 @@ class ParameterCompleter:
             data["params"]["arguments"]["authorization"] = self.search_config['api_key']
 
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=self.search_config.get('timeout', 10))
+            response = get_http_pool().post(url, headers=headers, json=data, timeout=self.search_config.get('timeout', 10))
             response.raise_for_status()
 
             content_type = response.headers.get('content-type', '')
@@ -2354,7 +2438,6 @@ class ParameterCompleterV2:
         if not content:
             return {}
 
-        import requests
         import json
 
         # 构造字段说明
@@ -2438,7 +2521,7 @@ class ParameterCompleterV2:
             base_url = self.llm_config.get("base_url", "").rstrip('/')
             url = f"{base_url}/v1/chat/completions"
 
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = post_llm(url, headers, data, timeout=30)
             response.raise_for_status()
 
             result = response.json()
@@ -2469,7 +2552,6 @@ class ParameterCompleterV2:
 
         关键优化：只执行 1 次搜索，而不是 N 次
         """
-        import requests
         import json
 
         product_name = product.get('product_name', '')
@@ -2542,7 +2624,7 @@ class ParameterCompleterV2:
             base_url = self.llm_config.get("base_url", "").rstrip('/')
             url = f"{base_url}/v1/chat/completions"
 
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = post_llm(url, headers, data, timeout=30)
             response.raise_for_status()
 
             result = response.json()
@@ -2692,7 +2774,7 @@ class LLMExtractor:
     def extract_product_info(self, product: Dict) -> Dict:
         """提取产品信息 - PM 视角深度分析（强制使用API）"""
         # 强制使用真实的 LLM 调用
-        context = product['combined_content'][:10000]  # 增加长度限制以支持 PM 分析
+        context = get_combined_content(product)[:10000]  # 增加长度限制以支持 PM 分析
 
         # 提取主图
         main_image = product.get('images', [''])[0] if product.get('images') else ''
@@ -2889,7 +2971,7 @@ class LLMExtractor:
 
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, headers=headers, json=data, timeout=120)
+                response = post_llm(url, headers, data, timeout=120)
                 response.raise_for_status()
                 result = response.json()
                 return result["choices"][0]["message"]["content"]
@@ -5662,16 +5744,25 @@ def second_round_search(product_name: str, category: str, missing_fields: list,
     ]
     search_queries.extend(site_queries)
 
-    # 执行搜索
+    # 执行搜索（搜索函数支持批量时，如 mcp_client.MCPSearchFunction，所有查询一次发出）
     all_search_results = []
-    for query in search_queries[:4]:  # 限制搜索次数
-        try:
+    search_many = getattr(search_func, 'many', None)
+    if search_many:
+        for query in search_queries[:4]:
             print(f"        [二次搜索] 查询: {query}")
-            result = search_func(query)
-            if result:
-                all_search_results.append(result)
+        try:
+            all_search_results = [result for result in search_many(search_queries[:4]) if result]
         except Exception as e:
             print(f"        [二次搜索] 失败: {str(e)[:50]}")
+    else:
+        for query in search_queries[:4]:  # 限制搜索次数
+            try:
+                print(f"        [二次搜索] 查询: {query}")
+                result = search_func(query)
+                if result:
+                    all_search_results.append(result)
+            except Exception as e:
+                print(f"        [二次搜索] 失败: {str(e)[:50]}")
 
     if not all_search_results:
         print(f"        [二次搜索] 无搜索结果")
@@ -5732,7 +5823,7 @@ def process_single_product(extractor, completer, product, index):
                 product_for_completion = {
                     'product_name': extracted.get('product_name', ''),
                     'category': extracted.get('category', ''),
-                    'content_text': product.get('combined_content', ''),
+                    'content_text': get_combined_content(product),
                     'specs': extracted.get('specs', {}),
                     'data_sources': {}
                 }
@@ -6132,19 +6223,14 @@ def main(template_mode="pm_deep"):
     print(f"\n[步骤 2.1/5] 初始化参数补全器V2（Top 15 Schema）...")
 
     # 导入 MCP 客户端
-    from mcp_client import get_mcp_client
+    from mcp_client import get_mcp_client, AsyncMCPClient
 
     mcp_client = get_mcp_client()
+    async_mcp = AsyncMCPClient(mcp_client)
 
-    def mcp_search_func(query: str) -> str:
-        """MCP 搜索函数封装"""
-        if mcp_client.is_available():
-            result = mcp_client.search(query, max_results=3)
-            return result if result else ""
-        return ""
-
-    # 根据 MCP 可用性决定是否传入搜索函数
-    search_func = mcp_search_func if mcp_client.is_available() else None
+    # 根据 MCP 可用性决定是否传入搜索函数：各工作线程的搜索在同一个事件循环中并发执行（并发上限与截止时间见
+    # AsyncMCPClient），second_round_search 的多个查询同时发出
+    search_func = async_mcp.search_function(max_results=3) if mcp_client.is_available() else None
     completer = ParameterCompleterV2(llm_config=LLM_CONFIG, search_func=search_func)
 
     search_status = "启用" if mcp_client.is_available() else "禁用"
@@ -6218,6 +6304,10 @@ def main(template_mode="pm_deep"):
 
     elapsed = time.time() - start_time
     print(f"\n  [完成] 并发处理耗时: {elapsed:.1f}秒")
+    print_mcp_stats()
+    get_single_flight('LLM').print_stats()
+    async_mcp.print_stats()
+    async_mcp.close()
 
     if dropped_count > 0:
         print(f"[OK] 过滤掉 {dropped_count} 个无效产品")
@@ -6293,15 +6383,24 @@ def main(template_mode="pm_deep", input_file=None, target_year=None, target_mont
     print("=" * 60)
 
     # 确定输入文件路径
-    if input_file is None:
+    default_input = input_file is None
+    if default_input:
         input_file = f'output/report_data_{TARGET_YEAR}_{TARGET_MONTH:02d}.json'
 
     # 检查输入文件是否存在
     input_path = Path(input_file)
-    if not input_path.exists():
-        # 尝试 Excel 格式
+    parquet_path = input_path.with_suffix('.parquet')
+    if default_input and pq is not None and parquet_path.exists() and \
+            (not input_path.exists() or parquet_path.stat().st_mtime >= input_path.stat().st_mtime):
+        # 默认输入：同一数据集的 Parquet 不比 JSON 旧时优先读取（按列载入，不解析整个 JSON）
+        input_path = parquet_path
+    elif not input_path.exists():
+        # 尝试爬虫流式导出的 JSONL，再尝试 Excel 格式（Excel 只是摘要，不含完整正文）
+        jsonl_path = Path(str(input_path).replace('.json', '.jsonl'))
         excel_path = Path(str(input_path).replace('.json', '.xlsx'))
-        if excel_path.exists():
+        if jsonl_path.exists():
+            input_path = jsonl_path
+        elif excel_path.exists():
             input_path = excel_path
         else:
             print(f"\n[ERROR] 输入文件不存在: {input_file}")
@@ -6329,8 +6428,19 @@ def main(template_mode="pm_deep", input_file=None, target_year=None, target_mont
     # 初始化参数补全器 V2（Top 15 Schema）
     print(f"\n[步骤 2.1/5] 初始化参数补全器V2（Top 15 Schema）...")
 
-    completer = ParameterCompleterV2(llm_config=LLM_CONFIG, search_func=None)
-    print(f"[OK] 参数补全器V2已初始化（Top 15 Schema，搜索功能已禁用）")
+    # 导入 MCP 客户端
+    from mcp_client import get_mcp_client, AsyncMCPClient
+
+    mcp_client = get_mcp_client()
+    async_mcp = AsyncMCPClient(mcp_client)
+
+    # 根据 MCP 可用性决定是否传入搜索函数：各工作线程的搜索在同一个事件循环中并发执行（并发上限与截止时间见
+    # AsyncMCPClient），second_round_search 的多个查询同时发出
+    search_func = async_mcp.search_function(max_results=3) if mcp_client.is_available() else None
+    completer = ParameterCompleterV2(llm_config=LLM_CONFIG, search_func=search_func)
+
+    search_status = "启用" if mcp_client.is_available() else "禁用"
+    print(f"[OK] 参数补全器V2已初始化（Top 15 Schema，MCP搜索: {search_status}）")
 
     import concurrent.futures
     import time
@@ -6391,6 +6501,10 @@ def main(template_mode="pm_deep", input_file=None, target_year=None, target_mont
 
     elapsed = time.time() - start_time
     print(f"\n  [完成] 并发处理耗时: {elapsed:.1f}秒")
+    print_mcp_stats()
+    get_single_flight('LLM').print_stats()
+    async_mcp.print_stats()
+    async_mcp.close()
 
     if dropped_count > 0:
         print(f"[OK] 过滤掉 {dropped_count} 个无效产品")
@@ -6504,7 +6618,7 @@ if __name__ == '__main__':
         '--input',
         type=str,
         metavar='PATH',
-        help='输入文件路径（JSON 或 Excel 格式）'
+        help='输入文件路径（JSON、JSONL 或 Excel 格式）'
     )
 
     parser.add_argument(
@@ -6526,6 +6640,18 @@ if __name__ == '__main__':
         help='先运行爬虫采集数据，再生成报告（一键模式）'
     )
 
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='与 --fetch 配合：增量抓取，只追加上次抓取之后的新文章'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='与 --fetch 配合：从上次中断的检查点继续抓取，已采集的文章不再请求'
+    )
+
     parser.add_argument(
         '--force',
         action='store_true',
@@ -6555,7 +6681,7 @@ if __name__ == '__main__':
             target_month = TARGET_MONTH
 
         # 运行爬虫
-        fetch_data(target_year, target_month)
+        fetch_data(target_year, target_month, incremental=args.incremental, resume=args.resume)
 
     # 确定 report_path 默认值
     if args.report_path is None:
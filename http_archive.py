@@ -0,0 +1,424 @@
+"""
+抓取录制与回放 - WARC 格式的 HTTP 存档 + 本地回放服务
+
+录制（SPIDER_RECORD_ARCHIVE）：BaseSpider.request() 发出的每次 HTTP 交换（含重定向、4xx/5xx 响应）
+都以 WARC/1.1 response 记录追加到存档文件；文件名以 .gz 结尾时每条记录单独 gzip 压缩（与 .warc.gz 惯例一致）。
+响应体保存为解码后的内容（去掉 Content-Encoding / Transfer-Encoding），并记录请求耗时（WARC-Elapsed-Ms）。
+
+回放（SPIDER_REPLAY_URL）：爬虫会话挂载 ReplayAdapter，所有请求改发到本地 ReplayServer，
+不访问真实站点；回放服务可按固定值或录制时的耗时注入延迟，并按比例注入 429/5xx 错误。
+错误按 (URL, 第几次请求) 决定，与线程调度顺序无关，同样的参数多次回放结果一致。
+
+用法：
+    # 录制一个月的抓取
+    SPIDER_RECORD_ARCHIVE=output/archive/crawl_2026_01.warc.gz python spider.py --month 2026-01
+    # 启动回放服务，再让爬虫指向它
+    python http_archive.py output/archive/crawl_2026_01.warc.gz --port 8765 --latency recorded
+    SPIDER_REPLAY_URL=http://127.0.0.1:8765 python spider.py --month 2026-01
+"""
+import gzip
+import hashlib
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Generator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+WARC_VERSION = 'WARC/1.1'
+
+# 响应体按解码后的内容保存，这些头与保存的内容不再对应，录制时去掉
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+# 回放时由回放服务自己生成的响应头
+_SERVER_HEADERS = {'content-length', 'date', 'server'}
+
+
+class ArchiveRecord:
+    """存档中的一条 HTTP 响应"""
+
+    __slots__ = ('url', 'status', 'reason', 'headers', 'body', 'elapsed', 'date')
+
+    def __init__(self, url: str, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes,
+                 elapsed: float = 0.0, date: str = ''):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.date = date
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        return next((value for key, value in self.headers if key.lower() == name), None)
+
+
+def _warc_date() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class HttpArchiveWriter:
+    """
+    WARC 存档写入器（多线程共享，追加写入）
+
+    每条记录写完即 flush，抓取中途崩溃时已写入的记录仍可回放；
+    新文件开头写一条 warcinfo 记录。
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: 存档路径，None 则使用 config.SPIDER_RECORD_ARCHIVE；以 .gz 结尾时逐条 gzip 压缩
+        """
+        self.path = Path(path or config.SPIDER_RECORD_ARCHIVE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compress = self.path.suffix == '.gz'
+        self._lock = threading.Lock()
+        self.stats = {'records': 0, 'bytes': 0}
+
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, 'ab')
+        if is_new:
+            info = 'software: peripheral-monitor spider\r\nformat: WARC File Format 1.1\r\n'.encode('utf-8')
+            self._write_record('warcinfo', {'Content-Type': 'application/warc-fields'}, info)
+
+    def _write_record(self, warc_type: str, fields: Dict[str, str], payload: bytes):
+        header = [WARC_VERSION, f'WARC-Type: {warc_type}', f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+                  f'WARC-Date: {_warc_date()}']
+        header += [f'{key}: {value}' for key, value in fields.items()]
+        header.append(f'Content-Length: {len(payload)}')
+        data = ('\r\n'.join(header) + '\r\n\r\n').encode('utf-8') + payload + b'\r\n\r\n'
+        if self.compress:
+            data = gzip.compress(data, compresslevel=6)
+
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+            self.stats['bytes'] += len(data)
+            if warc_type == 'response':
+                self.stats['records'] += 1
+
+    def write(self, url: str, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes,
+              elapsed: float = 0.0):
+        """写入一条响应记录"""
+        lines = [f'HTTP/1.1 {status} {reason or ""}'.rstrip()]
+        lines += [f'{key}: {value}' for key, value in headers if key.lower() not in _DROPPED_HEADERS]
+        lines.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1', errors='replace') + body
+        self._write_record('response', {
+            'WARC-Target-URI': url,
+            'WARC-Payload-Digest': 'sha1:' + hashlib.sha1(body).hexdigest(),
+            'WARC-Elapsed-Ms': f'{elapsed * 1000:.0f}',
+            'Content-Type': 'application/http; msgtype=response',
+        }, payload)
+
+    def record(self, response: requests.Response):
+        """写入一次请求得到的响应（先写重定向经过的各个响应，再写最终响应）"""
+        for item in [*response.history, response]:
+            self.write(item.url, item.status_code, item.reason, list(item.headers.items()), item.content,
+                       item.elapsed.total_seconds())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def log_stats(self):
+        """输出录制统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(f"[抓取录制] 写入 {stats['records']} 条响应（{stats['bytes'] / 1024:.0f} KB）: {self.path}")
+
+
+def _parse_http_response(url: str, payload: bytes, fields: Dict[str, str]) -> ArchiveRecord:
+    head, _, body = payload.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    _, status, *reason = lines[0].split(' ', 2)
+    headers = []
+    for line in lines[1:]:
+        key, _, value = line.partition(':')
+        headers.append((key.strip(), value.strip()))
+    return ArchiveRecord(url, int(status), reason[0] if reason else '', headers, body,
+                         elapsed=float(fields.get('warc-elapsed-ms', 0)) / 1000, date=fields.get('warc-date', ''))
+
+
+def read_archive(path: str) -> Generator[ArchiveRecord, None, None]:
+    """按顺序读取存档中的响应记录（末尾不完整的记录忽略，如录制时进程被中断）"""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+    stream = gzip.open(path, 'rb') if compressed else open(path, 'rb')
+
+    with stream:
+        while True:
+            try:
+                version = stream.readline()
+                if not version:
+                    return
+                if not version.strip():
+                    continue
+                if not version.startswith(b'WARC/'):
+                    raise ValueError(f"不是有效的 WARC 记录: {version[:40]!r}")
+                fields = {}
+                for line in iter(stream.readline, b'\r\n'):
+                    if not line:
+                        return
+                    key, _, value = line.decode('utf-8').partition(':')
+                    fields[key.strip().lower()] = value.strip()
+                length = int(fields.get('content-length', 0))
+                payload = stream.read(length)
+                stream.read(4)
+                if len(payload) < length:
+                    raise EOFError
+            except (EOFError, gzip.BadGzipFile):
+                logger.warning(f"[抓取回放] 存档末尾有不完整的记录，已忽略: {path}")
+                return
+
+            if fields.get('warc-type') == 'response':
+                yield _parse_http_response(fields.get('warc-target-uri', ''), payload, fields)
+
+
+def replay_target(replay_url: str, url: str) -> str:
+    """原始 URL 在回放服务上的地址：<回放服务>/<scheme>/<host><path>?<query>"""
+    parts = urlsplit(url)
+    target = f"{replay_url.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return f'{target}?{parts.query}' if parts.query else target
+
+
+def original_url(path: str) -> Optional[str]:
+    """replay_target() 的逆变换：回放服务收到的请求路径 → 原始 URL"""
+    scheme, _, rest = path.lstrip('/').partition('/')
+    if scheme not in ('http', 'https') or not rest:
+        return None
+    return f'{scheme}://{rest}'
+
+
+class ReplayAdapter(HTTPAdapter):
+    """把会话的所有请求改发到回放服务，响应的 url 仍为原始 URL（对爬虫透明）"""
+
+    def __init__(self, replay_url: str, **kwargs):
+        self.replay_url = replay_url.rstrip('/')
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        url = request.url
+        request.url = replay_target(self.replay_url, url)
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            request.url = url
+        response.url = url
+        return response
+
+
+def mount_replay(session: requests.Session, replay_url: str):
+    """让会话的 http / https 请求都改发到回放服务"""
+    adapter = ReplayAdapter(replay_url)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+class ReplayServer:
+    """
+    本地回放服务：按原始 URL 返回存档中录制的响应
+
+    同一 URL 录制了多次时，优先使用最后一次 2xx 响应（录制时重试成功的页面回放时直接成功）；
+    存档中没有的 URL 返回 404。请求带 If-None-Match 且与录制的 ETag 一致时返回 304。
+    """
+
+    def __init__(self, archive: str, latency=0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, retry_after: float = None, seed: int = 0):
+        """
+        Args:
+            archive: 存档路径
+            latency: 每个响应的延迟（秒），'recorded' 则按录制时的请求耗时
+            jitter: 在延迟上叠加的随机抖动上限（秒）
+            error_rate: 注入错误的比例（0~1）
+            error_status: 注入的错误状态码（如 503、429）
+            retry_after: 注入错误时返回的 Retry-After 秒数（None 则不返回）
+            seed: 错误注入与抖动的随机种子
+        """
+        self.archive = str(archive)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.seed = seed
+        self.records: Dict[str, ArchiveRecord] = {}
+        for record in read_archive(self.archive):
+            current = self.records.get(record.url)
+            if current is None or 200 <= record.status < 300 or not 200 <= current.status < 300:
+                self.records[record.url] = record
+
+        self.stats = {'requests': 0, 'served': 0, 'not_modified': 0, 'errors': 0, 'misses': 0, 'bytes': 0}
+        self._request_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self.base_url = ''
+
+    def _draw(self, url: str, attempt: int) -> random.Random:
+        """(URL, 第几次请求) 对应的确定性随机数"""
+        digest = hashlib.sha256(f'{self.seed}:{attempt}:{url}'.encode('utf-8')).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def respond(self, path: str, if_none_match: str = None) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """处理一个请求，返回 (状态码, 响应头, 响应体)"""
+        url = original_url(path)
+        with self._lock:
+            attempt = self._request_counts.get(url, 0)
+            self._request_counts[url] = attempt + 1
+            self.stats['requests'] += 1
+        record = self.records.get(url)
+        draw = self._draw(url, attempt)
+
+        if self.latency == 'recorded':
+            delay = record.elapsed if record else 0.0
+        else:
+            delay = float(self.latency)
+        if self.jitter:
+            delay += draw.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and draw.random() < self.error_rate:
+            with self._lock:
+                self.stats['errors'] += 1
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            if self.retry_after is not None:
+                headers.append(('Retry-After', f'{self.retry_after:g}'))
+            return self.error_status, headers, f'<html><body>{self.error_status}</body></html>'.encode('utf-8')
+
+        if record is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            logger.debug(f"[抓取回放] 存档中没有该 URL: {url}")
+            return 404, [('Content-Type', 'text/html; charset=utf-8')], b'<html><body>404</body></html>'
+
+        etag = record.header('ETag')
+        if etag and if_none_match == etag:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            return 304, [('ETag', etag)], b''
+
+        with self._lock:
+            self.stats['served'] += 1
+            self.stats['bytes'] += len(record.body)
+        headers = [(key, value) for key, value in record.headers if key.lower() not in _SERVER_HEADERS]
+        return record.status, headers, record.body
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """在后台线程中启动服务，返回服务地址（port=0 时随机选择空闲端口）"""
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = replay.respond(self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for key, value in headers:
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f'http://{host}:{self._server.server_address[1]}'
+        logger.info(f"[抓取回放] 回放服务已启动: {self.base_url}（存档 {len(self.records)} 个 URL）")
+        return self.base_url
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        if not self._server:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def log_stats(self):
+        """输出回放统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(
+            f"[抓取回放] 请求 {stats['requests']} 次：回放 {stats['served']} 次（{stats['bytes'] / 1024:.0f} KB），"
+            f"304 {stats['not_modified']} 次，注入错误 {stats['errors']} 次，存档缺失 {stats['misses']} 次"
+        )
+
+
+# 全局共享的存档写入器（单例模式）
+_archive_writer_instance = None
+_archive_writer_lock = threading.Lock()
+
+
+def get_archive_writer() -> Optional[HttpArchiveWriter]:
+    """获取全局存档写入器单例；未配置 SPIDER_RECORD_ARCHIVE 时返回 None"""
+    global _archive_writer_instance
+    if not config.SPIDER_RECORD_ARCHIVE:
+        return None
+    with _archive_writer_lock:
+        if _archive_writer_instance is None:
+            _archive_writer_instance = HttpArchiveWriter()
+        return _archive_writer_instance
+
+
+def reset_archive_writer():
+    """关闭并丢弃全局存档写入器（修改 SPIDER_RECORD_ARCHIVE 后调用）"""
+    global _archive_writer_instance
+    with _archive_writer_lock:
+        if _archive_writer_instance is not None:
+            _archive_writer_instance.close()
+        _archive_writer_instance = None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='抓取存档回放服务')
+    parser.add_argument('archive', help='WARC 存档路径（SPIDER_RECORD_ARCHIVE 录制）')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认: 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口（默认: 8765）')
+    parser.add_argument('--latency', default='0',
+                        help="响应延迟/秒，'recorded' 则按录制时的请求耗时（默认: 0）")
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟抖动上限/秒（默认: 0）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='注入错误的比例 0~1（默认: 0）')
+    parser.add_argument('--error-status', type=int, default=503, help='注入的错误状态码（默认: 503）')
+    parser.add_argument('--retry-after', type=float, default=None, help='注入错误时返回的 Retry-After 秒数')
+    parser.add_argument('--seed', type=int, default=0, help='错误注入的随机种子（默认: 0）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = ReplayServer(args.archive, latency=args.latency if args.latency == 'recorded' else float(args.latency),
+                          jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+                          retry_after=args.retry_after, seed=args.seed)
+    server.start(args.host, args.port)
+    print(f"回放服务: {server.base_url}")
+    print(f"爬虫指向回放服务: SPIDER_REPLAY_URL={server.base_url} python spider.py --month YYYY-MM")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.log_stats()
+        server.shutdown()
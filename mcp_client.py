@@ -4,23 +4,305 @@ MCP HTTP 客户端 - 调用公司内部 MCP 服务
 支持服务：
 - web-search-prime: 搜索服务
 - web-reader: 网页内容抓取服务
+
+成功的搜索 / 抓取结果缓存在本地 SQLite（见 MCPCache），重复运行同一月份时几乎不再调用 MCP；
+多个线程同时发起的相同调用经请求合并（single_flight）只调用一次 MCP。
 """
 import os
+import re
 import json
+import time
+import asyncio
+import sqlite3
+import itertools
+import threading
+import unicodedata
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlsplit, urlunsplit
 from dotenv import load_dotenv
 
+from single_flight import get_single_flight
+
+try:
+    import aiohttp  # AsyncMCPClient 的非阻塞 HTTP（可选依赖）
+except ImportError:
+    aiohttp = None
+
 load_dotenv()
 
 
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter：统计真正建立的 TCP（TLS）连接数，用于计算连接复用率"""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._on_connect
+
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = CountingHTTPConnection
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = CountingHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+class PooledHTTP:
+    """
+    线程安全的 keep-alive 连接池
+
+    所有线程共享同一个 HTTPAdapter（urllib3 连接池，线程安全），每个线程使用自己的
+    requests.Session 挂载该 adapter（Session 本身不保证线程安全），
+    连续的 MCP 调用复用已建立的连接，不再每次重新握手。
+    连接池已满时请求等待空闲连接（pool_block），而不是新建用完即弃的连接。
+    """
+
+    def __init__(self, pool_size: int = None):
+        """
+        Args:
+            pool_size: 每个主机保持的连接数上限，None 则使用环境变量 MCP_POOL_SIZE（默认 10）
+        """
+        self.pool_size = pool_size or int(os.getenv('MCP_POOL_SIZE', '10'))
+        self.adapter = _CountingAdapter(self._connection_opened, pool_connections=4,
+                                        pool_maxsize=self.pool_size, pool_block=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'connections': 0}
+
+    def _connection_opened(self):
+        with self._lock:
+            self.stats['connections'] += 1
+
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的 Session（共享连接池）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['Connection'] = 'keep-alive'
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """通过连接池发送 POST 请求"""
+        with self._lock:
+            self.stats['requests'] += 1
+        return self.session.post(url, **kwargs)
+
+    def print_stats(self):
+        """输出连接复用统计（没有请求时不输出）"""
+        with self._lock:
+            stats = dict(self.stats)
+        if not stats['requests']:
+            return
+        reused = max(0, stats['requests'] - stats['connections'])
+        print(f"[MCP连接池] 请求 {stats['requests']} 次，新建连接 {stats['connections']} 次，"
+              f"复用连接 {reused} 次（复用率 {reused / stats['requests']:.0%}，连接池上限 {self.pool_size}）")
+
+    def close(self):
+        self.adapter.close()
+
+
+# 全局共享的连接池（MCP 客户端与 ParameterCompleter 的搜索回退共用）
+_http_pool_instance = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> PooledHTTP:
+    """获取全局连接池单例"""
+    global _http_pool_instance
+    with _http_pool_lock:
+        if _http_pool_instance is None:
+            _http_pool_instance = PooledHTTP()
+        return _http_pool_instance
+
+
+def reset_http_pool():
+    """关闭并丢弃全局连接池（修改 MCP_POOL_SIZE 后调用）"""
+    global _http_pool_instance
+    with _http_pool_lock:
+        if _http_pool_instance is not None:
+            _http_pool_instance.close()
+        _http_pool_instance = None
+
+
+_CJK = '[\u2e80-\u9fff\uf900-\ufaff]'
+
+
+def normalize_query(query: str) -> str:
+    """
+    搜索查询的规范化形式（缓存键）：全角转半角、忽略大小写、合并空白，去掉中文与其他字符之间的空白，
+    "罗技 G304 规格 参数" 与 "罗技G304  规格参数" 得到相同的键
+    """
+    text = unicodedata.normalize('NFKC', query).casefold()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return re.sub(rf'(?<={_CJK}) | (?={_CJK})', '', text)
+
+
+def normalize_url(url: str) -> str:
+    """网页 URL 的规范化形式（缓存键）：协议与主机名小写，去掉 #片段"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+
+def cache_key(method: str, params: Dict) -> Optional[str]:
+    """MCP 调用的缓存键；不缓存的方法返回 None"""
+    if method == "search/webSearchPrime" and params.get("search_query"):
+        return 'search:' + normalize_query(params["search_query"])
+    if method == "read" and params.get("url"):
+        return 'read:' + normalize_url(params["url"])
+    return None
+
+
+class MCPCache:
+    """
+    MCP 结果的持久化缓存（SQLite，TTL + LRU）
+
+    键为 cache_key() 的规范化查询 / URL，值为 MCP 返回的原始 result（JSON）。
+    搜索结果与网页内容分别有各自的有效期；条目总数超过上限时淘汰最久未访问的条目。
+    只缓存成功的结果，失败与超时下次仍会重新调用。多线程共享一个连接（加锁），
+    WAL 模式下多个进程也可同时读写。
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, search_ttl: float = None, read_ttl: float = None):
+        """
+        Args:
+            path: SQLite 文件路径，None 则使用环境变量 MCP_CACHE_PATH（默认 output/mcp_cache.sqlite）
+            max_entries: 条目数上限，None 则使用 MCP_CACHE_MAX_ENTRIES（默认 20000）
+            search_ttl: 搜索结果有效期（秒），None 则使用 MCP_CACHE_SEARCH_TTL（默认 7 天）
+            read_ttl: 网页内容有效期（秒），None 则使用 MCP_CACHE_READ_TTL（默认 30 天）
+        """
+        self.path = path or os.getenv('MCP_CACHE_PATH', os.path.join('output', 'mcp_cache.sqlite'))
+        self.max_entries = max_entries or int(os.getenv('MCP_CACHE_MAX_ENTRIES', '20000'))
+        self.ttls = {
+            'search': search_ttl if search_ttl is not None else float(os.getenv('MCP_CACHE_SEARCH_TTL', '604800')),
+            'read': read_ttl if read_ttl is not None else float(os.getenv('MCP_CACHE_READ_TTL', '2592000')),
+        }
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS mcp_cache ('
+                           'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS mcp_cache_accessed ON mcp_cache (accessed)')
+        self._conn.commit()
+        self._count = self._conn.execute('SELECT COUNT(*) FROM mcp_cache').fetchone()[0]
+        self.stats = {'lookups': 0, 'hits': 0, 'stored': 0, 'expired': 0, 'evicted': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的缓存结果，未命中返回 None"""
+        now = time.time()
+        with self._lock:
+            self.stats['lookups'] += 1
+            row = self._conn.execute('SELECT value, expires FROM mcp_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute('DELETE FROM mcp_cache WHERE key = ?', (key,))
+                self._conn.commit()
+                self._count -= 1
+                self.stats['expired'] += 1
+                return None
+            self._conn.execute('UPDATE mcp_cache SET accessed = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        """写入结果（有效期按键的类型），超出条目上限时淘汰最久未访问的条目"""
+        now = time.time()
+        ttl = self.ttls.get(key.split(':', 1)[0], self.ttls['search'])
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            exists = self._conn.execute('SELECT 1 FROM mcp_cache WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('INSERT OR REPLACE INTO mcp_cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                               (key, data, now + ttl, now))
+            self.stats['stored'] += 1
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._conn.execute('DELETE FROM mcp_cache WHERE key IN '
+                                   '(SELECT key FROM mcp_cache ORDER BY accessed LIMIT ?)', (excess,))
+                self._count -= excess
+                self.stats['evicted'] += excess
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def print_stats(self):
+        """输出缓存命中统计（没有查询时不输出）"""
+        with self._lock:
+            stats = dict(self.stats)
+        if not stats['lookups']:
+            return
+        print(f"[MCP缓存] 查询 {stats['lookups']} 次，命中 {stats['hits']} 次（命中率 {stats['hits'] / stats['lookups']:.0%}），"
+              f"新写入 {stats['stored']} 条，过期 {stats['expired']} 条，淘汰 {stats['evicted']} 条（{self.path}）")
+
+
+# 全局共享的 MCP 缓存（单例模式）
+_mcp_cache_instance = None
+_mcp_cache_lock = threading.Lock()
+
+
+def get_mcp_cache() -> Optional[MCPCache]:
+    """获取全局 MCP 缓存单例；MCP_CACHE=false 时返回 None"""
+    global _mcp_cache_instance
+    if os.getenv('MCP_CACHE', 'true').lower() != 'true':
+        return None
+    with _mcp_cache_lock:
+        if _mcp_cache_instance is None:
+            _mcp_cache_instance = MCPCache()
+        return _mcp_cache_instance
+
+
+def reset_mcp_cache():
+    """关闭并丢弃全局 MCP 缓存（修改缓存配置后调用）"""
+    global _mcp_cache_instance
+    with _mcp_cache_lock:
+        if _mcp_cache_instance is not None:
+            _mcp_cache_instance.close()
+        _mcp_cache_instance = None
+
+
 class MCPHTTPClient:
     """
     MCP HTTP 客户端
 
-    用于调用公司内部部署的 MCP HTTP 服务
+    用于调用公司内部部署的 MCP HTTP 服务；请求经全局连接池发送（见 PooledHTTP），多线程共享 keep-alive 连接
     """
 
+    # 批量请求（数组）得到这些状态码时视为网关不支持批量
+    BATCH_UNSUPPORTED_STATUS = (400, 404, 405, 501)
+
     def __init__(self):
         # 从环境变量读取配置
         self.base_url = os.getenv('MCP_BASE_URL', 'http://192.168.0.250:7891')
@@ -38,6 +320,19 @@ class MCPHTTPClient:
             f'{self.base_url}/mcp_web_reader'
         )
 
+        # JSON-RPC 批量调用：一次 POST 最多携带的请求数（0 = 不使用批量，改为并行单个调用）
+        self.batch_size = int(os.getenv('MCP_BATCH_SIZE', '10'))
+        # 网关是否支持批量调用：None = 未知（先尝试），True = 已确认支持（之后不再改为不支持），
+        # False = 已确认不支持，之后直接并行单个调用
+        self.batch_supported = None
+
+        self.http = get_http_pool()
+        self.cache = get_mcp_cache()
+        # 同时在途的相同调用（按 cache_key）只发送一次
+        self.flights = get_single_flight('MCP')
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+
     def is_available(self) -> bool:
         """检查 MCP 服务是否可用"""
         if not self.enabled:
@@ -49,9 +344,28 @@ class MCPHTTPClient:
 
         return True
 
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _request(self, method: str, params: Dict) -> Dict:
+        """构造 JSON-RPC 2.0 请求（每个请求的 id 唯一，批量调用按 id 对应响应）"""
+        return {
+            "jsonrpc": "2.0",
+            "id": self._next_id(),
+            "method": method,
+            "params": params
+        }
+
+    def _headers(self) -> Dict:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.token}"
+        }
+
     def _call_mcp(self, endpoint: str, method: str, params: Dict) -> Optional[Dict]:
         """
-        调用 MCP HTTP 服务
+        调用 MCP HTTP 服务（启用 MCP 缓存时先查缓存，成功的结果写入缓存；相同调用在途时等待其结果）
 
         Args:
             endpoint: 服务端点 URL
@@ -64,24 +378,31 @@ class MCPHTTPClient:
         if not self.is_available():
             return None
 
-        # 构造 JSON-RPC 2.0 请求
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-            "params": params
-        }
+        key = cache_key(method, params)
+        if key and self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.token}"
-        }
+        return self.flights.do(key, self._fetch, key, endpoint, method, params)
+
+    def _fetch(self, key: Optional[str], endpoint: str, method: str, params: Dict) -> Optional[Dict]:
+        """缓存未命中时调用上游，成功的结果写入缓存"""
+        result = self._send(endpoint, method, params)
+        if key and result and self.cache:
+            self.cache.put(key, result)
+        return result
+
+    def _send(self, endpoint: str, method: str, params: Dict) -> Optional[Dict]:
+        """发送单个 JSON-RPC 请求（不经过缓存），失败返回 None"""
+        # 构造 JSON-RPC 2.0 请求
+        payload = self._request(method, params)
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 endpoint,
                 json=payload,
-                headers=headers,
+                headers=self._headers(),
                 timeout=self.timeout
             )
             response.raise_for_status()
@@ -106,6 +427,133 @@ class MCPHTTPClient:
             print(f"[MCP客户端] 未知错误: {str(e)[:100]}")
             return None
 
+    def _call_mcp_many(self, endpoint: str, method: str, params_list: List[Dict]) -> List[Optional[Dict]]:
+        """
+        批量调用 MCP HTTP 服务，结果与 params_list 一一对应（单个失败为 None）
+
+        每 MCP_BATCH_SIZE 个请求组成一个 JSON-RPC 批量请求（数组）在一次 POST 中发送，按 id 对应响应；
+        网关不支持批量（返回非数组、HTTP 4xx/5xx）时记住该结论，改为在连接池上并行发送单个请求。
+        """
+        if not params_list or not self.is_available():
+            return [None] * len(params_list)
+
+        # 先查缓存；同一批中规范化后相同的查询只发送一次，其他线程正在调用的查询等待其结果
+        results = [None] * len(params_list)
+        keys = [cache_key(method, params) for params in params_list]
+        first_index = {}
+        duplicates = {}
+        pending = []
+        for index, key in enumerate(keys):
+            if key in first_index:
+                duplicates[index] = first_index[key]
+                continue
+            if key:
+                cached = self.cache.get(key) if self.cache else None
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                first_index[key] = index
+            pending.append(index)
+
+        def fetch(positions: List[int]) -> List[Optional[Dict]]:
+            indexes = [pending[position] for position in positions]
+            sent = self._send_many(endpoint, method, [params_list[index] for index in indexes])
+            for index, result in zip(indexes, sent):
+                if keys[index] and result and self.cache:
+                    self.cache.put(keys[index], result)
+            return sent
+
+        fetched = self.flights.do_many([keys[index] for index in pending], fetch)
+        for index, result in zip(pending, fetched):
+            results[index] = result
+        for index, source in duplicates.items():
+            results[index] = results[source]
+        return results
+
+    def _send_many(self, endpoint: str, method: str, params_list: List[Dict]) -> List[Optional[Dict]]:
+        """按 MCP_BATCH_SIZE 分批发送（不经过缓存），网关不支持批量时并行单个调用"""
+        results = []
+        size = self.batch_size or len(params_list) or 1
+        for start in range(0, len(params_list), size):
+            chunk = params_list[start:start + size]
+            chunk_results = None
+            if self.batch_size > 1 and len(chunk) > 1 and self.batch_supported is not False:
+                chunk_results = self._call_mcp_batch(endpoint, method, chunk)
+            if chunk_results is None:
+                chunk_results = self._call_mcp_parallel(endpoint, method, chunk)
+            results.extend(chunk_results)
+        return results
+
+    def _call_mcp_batch(self, endpoint: str, method: str, params_list: List[Dict]) -> Optional[List[Optional[Dict]]]:
+        """发送一个 JSON-RPC 批量请求；网关不支持批量时返回 None（由调用方回退到单个调用）"""
+        payload = [self._request(method, params) for params in params_list]
+
+        try:
+            response = self.http.post(
+                endpoint,
+                json=payload,
+                headers=self._headers(),
+                timeout=self.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            # 网络错误与批量支持无关，整批失败
+            print(f"[MCP客户端] 批量请求失败: {str(e)[:100]}")
+            return [None] * len(params_list)
+
+        if response.status_code in self.BATCH_UNSUPPORTED_STATUS:
+            return self._batch_unsupported(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            # 限流、服务端错误、鉴权失败等与批量支持无关，整批失败
+            print(f"[MCP客户端] 批量请求失败: HTTP {response.status_code}")
+            return [None] * len(params_list)
+        try:
+            result = response.json()
+        except ValueError:
+            return self._batch_unsupported(f"返回的不是 JSON: {response.text[:100]}")
+        if not isinstance(result, list):
+            # 包括对整个数组返回的 -32600 Invalid Request
+            return self._batch_unsupported(f"返回的不是数组: {str(result)[:100]}")
+
+        self.batch_supported = True
+        by_id = {item.get('id'): item for item in result if isinstance(item, dict)}
+        results = []
+        for request in payload:
+            item = by_id.get(request['id'])
+            if item is None:
+                results.append(None)
+            elif "error" in item:
+                print(f"[MCP客户端] 服务返回错误: {item['error']}")
+                results.append(None)
+            else:
+                results.append(item.get("result"))
+        return results
+
+    def _batch_unsupported(self, reason: str) -> None:
+        """批量请求得到"不支持批量"的响应：本批回退到单个调用；尚未确认支持批量时记住该结论"""
+        if self.batch_supported:
+            print(f"[MCP客户端] 批量请求异常（{reason}），本批改为并行单个调用")
+            return None
+        if self.batch_supported is None:
+            print(f"[MCP客户端] 网关不支持批量调用（{reason}），改为并行单个调用")
+        self.batch_supported = False
+        return None
+
+    def _call_mcp_parallel(self, endpoint: str, method: str, params_list: List[Dict]) -> List[Optional[Dict]]:
+        """在连接池上并行发送单个请求"""
+        if len(params_list) == 1:
+            return [self._send(endpoint, method, params_list[0])]
+        workers = min(len(params_list), getattr(self.http, 'pool_size', len(params_list)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda params: self._send(endpoint, method, params), params_list))
+
+    @staticmethod
+    def _search_params(query: str) -> Dict:
+        return {
+            "search_query": query,
+            "content_size": "medium",
+            "search_recency_filter": "noLimit"
+        }
+
     def search(self, query: str, max_results: int = 3) -> Optional[str]:
         """
         执行搜索（使用 web-search-prime）
@@ -123,11 +571,7 @@ class MCPHTTPClient:
         result = self._call_mcp(
             endpoint=self.search_endpoint,
             method="search/webSearchPrime",
-            params={
-                "search_query": query,
-                "content_size": "medium",
-                "search_recency_filter": "noLimit"
-            }
+            params=self._search_params(query)
         )
 
         if not result:
@@ -136,6 +580,21 @@ class MCPHTTPClient:
         # 解析搜索结果
         return self._parse_search_results(result, max_results)
 
+    def search_many(self, queries: List[str], max_results: int = 3) -> List[Optional[str]]:
+        """
+        批量搜索（JSON-RPC 批量调用，网关不支持时并行单个调用）
+
+        Args:
+            queries: 搜索关键词列表
+            max_results: 每个查询最大返回结果数
+
+        Returns:
+            与 queries 一一对应的搜索结果摘要文本，失败的查询为 None
+        """
+        results = self._call_mcp_many(self.search_endpoint, "search/webSearchPrime",
+                                      [self._search_params(query) for query in queries])
+        return [self._parse_search_results(result, max_results) if result else None for result in results]
+
     def _parse_search_results(self, result: Dict, max_results: int) -> str:
         """
         解析搜索结果为纯文本
@@ -188,6 +647,20 @@ class MCPHTTPClient:
             params={"url": url}
         )
 
+        return self._parse_read_result(result)
+
+    def read_many(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        批量抓取网页内容（JSON-RPC 批量调用，网关不支持时并行单个调用）
+
+        Returns:
+            与 urls 一一对应的网页纯文本内容，失败的为 None
+        """
+        results = self._call_mcp_many(self.reader_endpoint, "read", [{"url": url} for url in urls])
+        return [self._parse_read_result(result) for result in results]
+
+    @staticmethod
+    def _parse_read_result(result) -> Optional[str]:
         if not result:
             return None
 
@@ -201,6 +674,229 @@ class MCPHTTPClient:
         return str(result)
 
 
+class MCPSearchFunction:
+    """
+    搜索函数封装，用作 ParameterCompleterV2 / second_round_search 的 search_func
+
+    调用方式与普通搜索函数相同 (query: str) -> str（失败返回空字符串）；
+    另提供 many(queries)，second_round_search 等一次发出多个查询的地方用它走批量调用。
+    """
+
+    def __init__(self, client: MCPHTTPClient = None, max_results: int = 3):
+        self.client = client or get_mcp_client()
+        self.max_results = max_results
+
+    def __call__(self, query: str) -> str:
+        return self.client.search(query, max_results=self.max_results) or ""
+
+    def many(self, queries: List[str]) -> List[str]:
+        return [result or "" for result in self.client.search_many(queries, max_results=self.max_results)]
+
+
+class AsyncMCPClient:
+    """
+    asyncio 版 MCP 客户端（search / read_url 与 MCPHTTPClient 相同，均为协程）
+
+    - 同时进行的调用数受信号量限制（MCP_ASYNC_CONCURRENCY），超出的调用在事件循环中排队，不占用线程
+    - 每个调用有截止时间（MCP_CALL_DEADLINE 秒，含排队时间），超时返回 None
+    - 已安装 aiohttp 时用 aiohttp 的 keep-alive 连接池发送请求；否则在专用线程池中调用同步客户端
+    - search_function() 返回可直接作为 ParameterCompleterV2 / second_round_search 的 search_func 的同步封装：
+      调用在后台事件循环中执行，many() 让多个查询在同一事件循环中重叠进行
+
+    端点、Token 与结果解析沿用 MCPHTTPClient 的配置。一个实例只在一个事件循环中使用。
+    """
+
+    def __init__(self, client: MCPHTTPClient = None, concurrency: int = None, deadline: float = None):
+        """
+        Args:
+            client: 提供配置与结果解析的同步客户端，None 则使用全局单例
+            concurrency: 同时进行的调用数上限，None 则使用环境变量 MCP_ASYNC_CONCURRENCY（默认 20）
+            deadline: 每个调用的截止时间（秒），None 则使用环境变量 MCP_CALL_DEADLINE（默认同 MCP_TIMEOUT）
+        """
+        self.client = client or get_mcp_client()
+        self.concurrency = concurrency or int(os.getenv('MCP_ASYNC_CONCURRENCY', '20'))
+        self.deadline = deadline or float(os.getenv('MCP_CALL_DEADLINE', str(self.client.timeout)))
+
+        self._semaphore = None
+        self._session = None
+        self._executor = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'timeouts': 0, 'failures': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    def is_available(self) -> bool:
+        return self.client.is_available()
+
+    async def _post(self, endpoint: str, payload: Dict) -> Optional[Dict]:
+        """发送一个 JSON-RPC 请求，返回 result；失败返回 None"""
+        if aiohttp is None:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='mcp-async')
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.client._send, endpoint, payload['method'], payload['params'])
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.client.timeout),
+            )
+        try:
+            async with self._session.post(endpoint, json=payload, headers=self.client._headers()) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+        except aiohttp.ClientError as e:
+            print(f"[MCP异步] 请求失败: {str(e)[:100]}")
+            return None
+
+        if "error" in result:
+            print(f"[MCP异步] 服务返回错误: {result['error']}")
+            return None
+        return result.get("result")
+
+    async def _call(self, endpoint: str, method: str, params: Dict, deadline: float = None) -> Optional[Dict]:
+        """受并发上限与截止时间约束的 MCP 调用（与同步客户端共用 MCP 缓存与请求合并）"""
+        if not self.is_available():
+            return None
+        cache = self.client.cache
+        key = cache_key(method, params)
+        if key and cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            # 等待其他线程 / 协程的相同调用时同样受本次调用的截止时间约束
+            return await self.client.flights.do_async(key, self._fetch, key, endpoint, method, params, deadline,
+                                                      wait_timeout=deadline or self.deadline)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.stats['timeouts'] += 1
+            print(f"[MCP异步] 调用超时（{deadline or self.deadline:g} 秒）: {method} {str(params)[:60]}")
+            return None
+
+    async def _fetch(self, key: Optional[str], endpoint: str, method: str, params: Dict,
+                     deadline: float = None) -> Optional[Dict]:
+        """缓存未命中时调用上游（相同调用只由一个协程执行），成功的结果写入缓存"""
+        cache = self.client.cache
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded():
+            async with self._semaphore:
+                with self._stats_lock:
+                    self.stats['in_flight'] += 1
+                    self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+                try:
+                    return await self._post(endpoint, self.client._request(method, params))
+                finally:
+                    with self._stats_lock:
+                        self.stats['in_flight'] -= 1
+
+        with self._stats_lock:
+            self.stats['calls'] += 1
+        try:
+            result = await asyncio.wait_for(bounded(), timeout=deadline or self.deadline)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.stats['timeouts'] += 1
+            print(f"[MCP异步] 调用超时（{deadline or self.deadline:g} 秒）: {method} {str(params)[:60]}")
+            return None
+        except Exception as e:
+            result = None
+            print(f"[MCP异步] 未知错误: {str(e)[:100]}")
+        if result is None:
+            with self._stats_lock:
+                self.stats['failures'] += 1
+        elif key and cache:
+            cache.put(key, result)
+        return result
+
+    async def search(self, query: str, max_results: int = 3, deadline: float = None) -> Optional[str]:
+        """执行搜索（web-search-prime），失败或超时返回 None"""
+        result = await self._call(self.client.search_endpoint, "search/webSearchPrime",
+                                  self.client._search_params(query), deadline)
+        return self.client._parse_search_results(result, max_results) if result else None
+
+    async def read_url(self, url: str, deadline: float = None) -> Optional[str]:
+        """抓取网页内容（web-reader），失败或超时返回 None"""
+        result = await self._call(self.client.reader_endpoint, "read", {"url": url}, deadline)
+        return self.client._parse_read_result(result)
+
+    async def search_many(self, queries: List[str], max_results: int = 3, deadline: float = None) -> List[Optional[str]]:
+        """并发执行多个搜索，结果与 queries 一一对应"""
+        return list(await asyncio.gather(*(self.search(query, max_results, deadline) for query in queries)))
+
+    async def read_many(self, urls: List[str], deadline: float = None) -> List[Optional[str]]:
+        """并发抓取多个网页，结果与 urls 一一对应"""
+        return list(await asyncio.gather(*(self.read_url(url, deadline) for url in urls)))
+
+    async def aclose(self):
+        """关闭 aiohttp 会话与线程池"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环（守护线程），供同步调用方提交协程"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='mcp-async-loop', daemon=True).start()
+            return self._loop
+
+    def run(self, coro):
+        """在后台事件循环中执行协程并等待结果（供同步代码调用）"""
+        return asyncio.run_coroutine_threadsafe(coro, self._background_loop()).result()
+
+    def search_function(self, max_results: int = 3) -> 'AsyncSearchFunction':
+        """同步搜索函数封装，可作为 ParameterCompleterV2 的 search_func"""
+        return AsyncSearchFunction(self, max_results)
+
+    def close(self):
+        """关闭后台事件循环（使用过 search_function() / run() 时调用）"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    def print_stats(self):
+        """输出异步调用统计（没有调用时不输出）"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        if not stats['calls']:
+            return
+        print(f"[MCP异步] 调用 {stats['calls']} 次（并发上限 {self.concurrency}，峰值 {stats['peak_in_flight']}），"
+              f"超时 {stats['timeouts']} 次，失败 {stats['failures']} 次"
+              f"（{'aiohttp' if aiohttp is not None else '线程池'}）")
+
+
+class AsyncSearchFunction(MCPSearchFunction):
+    """AsyncMCPClient 的同步搜索函数封装：各工作线程的查询在同一个事件循环中并发执行"""
+
+    def __init__(self, client: AsyncMCPClient, max_results: int = 3):
+        self.client = client
+        self.max_results = max_results
+
+    def __call__(self, query: str) -> str:
+        return self.client.run(self.client.search(query, self.max_results)) or ""
+
+    def many(self, queries: List[str]) -> List[str]:
+        return [result or "" for result in self.client.run(self.client.search_many(queries, self.max_results))]
+
+
+def print_mcp_stats():
+    """输出 MCP 连接池、缓存与请求合并统计"""
+    get_http_pool().print_stats()
+    cache = get_mcp_cache()
+    if cache:
+        cache.print_stats()
+    get_single_flight('MCP').print_stats()
+
+
 # 创建全局实例（单例模式）
 _mcp_client_instance = None
 
@@ -234,3 +930,14 @@ def mcp_read_url(url: str) -> Optional[str]:
         content = mcp_read_url("https://example.com/article")
     """
     return get_mcp_client().read_url(url)
+
+
+def mcp_search_many(queries: List[str], max_results: int = 3) -> List[Optional[str]]:
+    """
+    便捷函数：批量执行 MCP 搜索（一次 JSON-RPC 批量调用）
+
+    用法：
+        from mcp_client import mcp_search_many
+        results = mcp_search_many(["罗技G304 传感器", "罗技G304 重量"])
+    """
+    return get_mcp_client().search_many(queries, max_results)
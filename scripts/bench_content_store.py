@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+正文内容存储基准
+
+用一个月的文章数据对比两种保存方式：
+- 内联：content_text / content_html 直接写在每条记录中（JSON / Parquet / DataFrame 都带完整正文）
+- 内容存储（CONTENT_STORE）：正文压缩后按内容哈希存放，记录中只保留引用，相同正文只存一份
+
+对比项：
+- 输出大小：JSON、Excel 与内容存储目录
+- 峰值内存：在独立子进程中运行 DataCleaner（载入 → 关键词/黑名单筛选 → 智能去重），
+  再像 LLMExtractor 一样逐个产品读取合并正文，记录进程峰值 RSS
+并校验两种方式得到的产品列表与合并正文完全一致。
+
+数据来源：
+- 默认生成一个月的样例文章（--articles 篇，其中 --syndicated 比例为另一站点转载的相同正文）
+- --input FILE：使用爬虫导出的 report_data_YYYY_MM.json / .jsonl（正文内联或引用均可）
+
+使用方式:
+    python scripts/bench_content_store.py [--articles 400] [--syndicated 0.3] [--input FILE]
+
+示例:
+    python scripts/bench_content_store.py
+    python scripts/bench_content_store.py --input output/report_data_2026_01.json
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import hashlib
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+import content_store  # noqa: E402
+import spider  # noqa: E402
+
+BRANDS = ['罗技', '雷蛇', 'ROG', '赛睿', '卓威', 'VGN', 'ATK', '狼蛛', '雷柏', '达尔优', '黑峡谷', '迈从']
+PRODUCTS = [('鼠标', ['PAW3395 传感器', '8K 回报率', '55g 轻量化', '光微动', '双模无线']),
+            ('键盘', ['磁轴', 'RT 快速触发', 'Gasket 结构', '三模连接', 'PBT 键帽']),
+            ('耳机', ['7.1 声道', '50mm 单元', '降噪麦克风', '2.4G 无线', '头梁调节']),
+            ('资讯', ['展会现场', '新品预告', '官方直播', '开学季活动', '年度盘点'])]
+
+
+def sample_articles(count: int, syndicated: float, seed: int = 2026) -> list:
+    """生成一个月的样例文章（字段与 parse_article 的结果一致）"""
+    rng = random.Random(seed)
+    articles = []
+    originals = []
+    for index in range(count):
+        if originals and rng.random() < syndicated:
+            # 转载：正文完全相同，来源、URL、发布时间不同
+            article = dict(rng.choice(originals))
+            article['source'] = '外设天下' if article['source'] == 'in外设' else 'in外设'
+            article['url'] = f"https://www.wstx.com/p-{60000 + index}-1"
+            article['publish_date'] = f"2026-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00"
+            articles.append(article)
+            continue
+
+        brand = rng.choice(BRANDS)
+        category, features = rng.choice(PRODUCTS)
+        model = f"{brand} {rng.choice('GXMVKR')}{rng.randint(1, 999)}"
+        title = f"{model} {category}正式发布" if category != '资讯' else f"{brand} {rng.choice(features)}"
+        paragraphs = [
+            f"{model} 采用{rng.choice(features)}，{rng.choice(features)}，重量 {rng.randint(40, 120)}g，"
+            f"首发价 {rng.randint(99, 1299)} 元。第 {i} 段介绍了{rng.choice(features)}带来的体验提升，"
+            f"并与上一代产品做了对比。"
+            for i in range(rng.randint(12, 40))
+        ]
+        aid = 10000 + index
+        html = ''.join(
+            f'<p style="text-indent:2em"><font size="3">{text}</font></p>'
+            + (f'<p style="text-align:center"><img src="https://www.inwaishe.com/data/attachment/portal/'
+               f'202601/{aid}_{i}.jpg" alt="{model}"></p>' if i % 3 == 0 else '')
+            for i, text in enumerate(paragraphs)
+        )
+        article = {
+            'source': 'in外设',
+            'title': title,
+            'publish_date': f"2026-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+            'url': f"http://www.inwaishe.com/article-{aid}-1.html",
+            'author': '编辑',
+            'content_text': '\n'.join(paragraphs),
+            'content_html': f'<td id="article_content_{aid}">{html}</td>',
+            'images': [f"https://www.inwaishe.com/data/attachment/portal/202601/{aid}_0.jpg"],
+        }
+        originals.append(article)
+        articles.append(article)
+    return articles
+
+
+def load_articles(path: str) -> list:
+    """读取爬虫导出的文章，正文统一展开为内联"""
+    if path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+    articles = []
+    for record in records:
+        article = {key: value for key, value in record.items() if not key.endswith('_ref')}
+        for field in content_store.BODY_FIELDS:
+            article[field] = content_store.load_body(record, field)
+        articles.append(article)
+    return articles
+
+
+def dir_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob('*') if file.is_file())
+
+
+def write_outputs(articles: list, output_dir: Path) -> dict:
+    """写出 JSON 与 Excel，返回各文件大小"""
+    config.OUTPUT_DIR = str(output_dir)
+    exporter = spider.DataExporter()
+    exporter.export_to_json(articles, 'report_data.json')
+    exporter.export_to_excel(articles, 'report_data.xlsx')
+    return {'json': (output_dir / 'report_data.json').stat().st_size,
+            'excel': (output_dir / 'report_data.xlsx').stat().st_size}
+
+
+def clean_in_subprocess(json_path: Path, store_dir: Path) -> dict:
+    """在独立进程中运行清洗流程，返回 {峰值 RSS, 产品数, 结果摘要}"""
+    result = subprocess.run(
+        [sys.executable, __file__, '--clean', str(json_path), '--store-dir', str(store_dir)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_clean(json_path: str, store_dir: str):
+    """子进程：DataCleaner 清洗 + 逐个产品读取合并正文（模拟 LLMExtractor），输出峰值 RSS"""
+    config.CONTENT_STORE_DIR = store_dir
+    import etl_pipeline
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            cleaner = etl_pipeline.DataCleaner(json_path)
+            filtered_df = cleaner.filter_by_keywords()
+            filtered_df = cleaner.filter_by_blacklist(filtered_df)
+            products = cleaner.smart_deduplicate(filtered_df)
+        finally:
+            sys.stdout = stdout
+
+    digest = hashlib.sha256()
+    for product in products:
+        context = etl_pipeline.get_combined_content(product)
+        digest.update(json.dumps([product['product_name'], product['sources'], product['images'], context],
+                                 ensure_ascii=False).encode('utf-8'))
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'peak_mb': peak_kb / 1024, 'delta_mb': (peak_kb - baseline_kb) / 1024,
+                      'products': len(products), 'digest': digest.hexdigest()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='正文内容存储基准测试')
+    parser.add_argument('--articles', type=int, default=400, help='样例文章数（默认: 400）')
+    parser.add_argument('--syndicated', type=float, default=0.3, help='样例中转载文章的比例（默认: 0.3）')
+    parser.add_argument('--input', help='使用爬虫导出的 JSON / JSONL 代替样例文章')
+    parser.add_argument('--clean', help=argparse.SUPPRESS)
+    parser.add_argument('--store-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    if args.clean:
+        run_clean(args.clean, args.store_dir)
+        return 0
+
+    articles = load_articles(args.input) if args.input else sample_articles(args.articles, args.syndicated)
+    if not articles:
+        print(f"[ERROR] 没有可用的文章: {args.input}")
+        return 1
+
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_content_store_'))
+    try:
+        inline_dir, store_output_dir, store_dir = work_dir / 'inline', work_dir / 'store', work_dir / 'content_store'
+        inline_dir.mkdir()
+        store_output_dir.mkdir()
+
+        store = content_store.ContentStore(str(store_dir))
+        referenced = [store.externalize(article) for article in articles]
+
+        sizes = {'内联:': write_outputs(articles, inline_dir), '内容存储:': write_outputs(referenced, store_output_dir)}
+        sizes['内联:']['store'] = 0
+        sizes['内容存储:']['store'] = dir_size(store_dir)
+
+        runs = {'内联:': clean_in_subprocess(inline_dir / 'report_data.json', store_dir),
+                '内容存储:': clean_in_subprocess(store_output_dir / 'report_data.json', store_dir)}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    raw_mb = sum(len(a['content_text'].encode('utf-8')) + len(a['content_html'].encode('utf-8'))
+                 for a in articles) / 1024 / 1024
+    unique = store.stats['stored']
+    print(f"文章 {len(articles)} 篇（正文 {raw_mb:.1f} MB），内容存储 {unique} 份正文"
+          f"（{store.stats['deduplicated']} 份重复未存储，压缩方式 {store.codec}）")
+    print(f"  {'':<12}{'JSON':>10}{'Excel':>10}{'正文存储':>10}{'合计':>10}{'峰值 RSS':>12}{'清洗增量':>10}")
+    for label, size in sizes.items():
+        run = runs[label]
+        total = size['json'] + size['excel'] + size['store']
+        print(f"  {label:<12}{size['json'] / 1024:>8.0f}KB{size['excel'] / 1024:>8.0f}KB{size['store'] / 1024:>8.0f}KB"
+              f"{total / 1024:>8.0f}KB{run['peak_mb']:>10.1f}MB{run['delta_mb']:>8.1f}MB")
+
+    inline, stored = runs.values()
+    if inline['digest'] != stored['digest'] or inline['products'] != stored['products']:
+        print("[FAIL] 两种方式清洗得到的产品 / 合并正文不一致")
+        return 1
+
+    before = sum(sizes['内联:'].values())
+    after = sum(sizes['内容存储:'].values())
+    print(f"[OK] 产品与合并正文一致（{inline['products']} 款），输出 {before / 1024:.0f}KB → {after / 1024:.0f}KB，"
+          f"峰值 RSS {inline['peak_mb']:.1f}MB → {stored['peak_mb']:.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+导出与载入性能基准
+
+用一个月的样例文章（正文内联）对比：
+- 旧方式：pandas.to_excel 写出含完整正文的 Excel，DataCleaner 再用 read_excel 读回
+- 新方式：Parquet（完整数据，zstd 压缩）+ openpyxl 只写模式的 Excel 摘要，
+  DataCleaner 按列读取 Parquet（只载入清洗用到的列）
+对比导出耗时、文件大小与 DataCleaner 载入耗时，并校验 Parquet 读回的清洗列与 JSON 一致、
+两种输入清洗去重得到的产品相同且可 JSON 序列化（ETL 写出 PROCESSED_JSON 时需要）。
+
+使用方式:
+    python scripts/bench_export.py [--articles 400] [--rounds 3]
+"""
+
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import config  # noqa: E402
+import spider  # noqa: E402
+import etl_pipeline  # noqa: E402
+from bench_content_store import sample_articles  # noqa: E402
+
+
+def legacy_export_excel(articles: list, filepath: Path):
+    """旧版 DataExporter.export_to_excel：整表经 pandas 写出，含完整正文"""
+    df = pd.DataFrame(articles)
+    df = df.reindex(columns=spider.DataExporter.COLUMNS, fill_value='')
+    df.to_excel(filepath, index=False, engine='openpyxl')
+
+
+def timed(func, rounds: int) -> float:
+    """返回平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds
+
+
+def load(path: Path) -> pd.DataFrame:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return etl_pipeline.DataCleaner(str(path)).df
+
+
+def clean_products(path: Path, columns: list) -> str:
+    """
+    DataCleaner 筛选 + 智能去重，返回产品列表的 JSON（不可序列化时抛出 TypeError）；
+    产品记录只比较 columns 中的字段（Parquet 不载入 content_html 等大字段）
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaner = etl_pipeline.DataCleaner(str(path))
+        filtered_df = cleaner.filter_by_blacklist(cleaner.filter_by_keywords())
+        products = cleaner.smart_deduplicate(filtered_df)
+    text = json.dumps(products, ensure_ascii=False, sort_keys=True)
+    products = json.loads(text)
+    for product in products:
+        product['records'] = [{k: v for k, v in record.items() if k in columns} for record in product['records']]
+    return json.dumps(products, ensure_ascii=False, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出与载入性能基准测试')
+    parser.add_argument('--articles', type=int, default=400, help='样例文章数（默认: 400）')
+    parser.add_argument('--rounds', type=int, default=3, help='每项重复次数（默认: 3）')
+    args = parser.parse_args()
+
+    spider.logger.setLevel(logging.WARNING)
+    if spider.pyarrow is None:
+        print("[ERROR] 未安装 pyarrow，无法运行 Parquet 基准（pip install pyarrow）")
+        return 1
+
+    articles = sample_articles(args.articles, 0.0)
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_export_'))
+    try:
+        return run(articles, work_dir, args.rounds)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run(articles: list, work_dir: Path, rounds: int) -> int:
+    config.OUTPUT_DIR = str(work_dir)
+    exporter = spider.DataExporter()
+    legacy_path = work_dir / 'legacy.xlsx'
+
+    exports = {
+        '旧: Excel 全量': timed(lambda: legacy_export_excel(articles, legacy_path), rounds),
+        '新: Parquet': timed(lambda: exporter.export_to_parquet(articles, 'report.parquet'), rounds),
+        '新: Excel 摘要': timed(lambda: exporter.export_to_excel(articles, 'report.xlsx'), rounds),
+    }
+    exporter.export_to_json(articles, 'report.json')
+    sizes = {
+        '旧: Excel 全量': legacy_path.stat().st_size,
+        '新: Parquet': (work_dir / 'report.parquet').stat().st_size,
+        '新: Excel 摘要': (work_dir / 'report.xlsx').stat().st_size,
+    }
+    loads = {
+        '旧: Excel 全量': timed(lambda: load(legacy_path), rounds),
+        '新: Parquet': timed(lambda: load(work_dir / 'report.parquet'), rounds),
+        'JSON': timed(lambda: load(work_dir / 'report.json'), rounds),
+    }
+
+    print(f"样例文章 {len(articles)} 篇，每项重复 {rounds} 次")
+    print(f"  {'':<16}{'导出':>10}{'大小':>10}{'载入':>10}")
+    for label in ('旧: Excel 全量', '新: Parquet', '新: Excel 摘要', 'JSON'):
+        export = f"{exports[label] * 1000:>8.0f}ms" if label in exports else f"{'-':>10}"
+        size = f"{sizes[label] / 1024:>8.0f}KB" if label in sizes else f"{'-':>10}"
+        loaded = f"{loads[label] * 1000:>8.0f}ms" if label in loads else f"{'-':>10}"
+        print(f"  {label:<16}{export}{size}{loaded}")
+
+    parquet_df = load(work_dir / 'report.parquet')
+    json_df = load(work_dir / 'report.json')
+    columns = list(parquet_df.columns)
+    same = (parquet_df['images'].map(list).tolist() == json_df['images'].map(list).tolist()
+            and parquet_df.drop(columns='images').astype(str).equals(json_df[columns].drop(columns='images').astype(str)))
+    print(f"  Parquet 载入列: {', '.join(columns)}")
+    if not same:
+        print("[FAIL] Parquet 读回的清洗列与 JSON 不一致")
+        return 1
+    try:
+        same_products = (clean_products(work_dir / 'report.parquet', columns)
+                         == clean_products(work_dir / 'report.json', columns))
+    except TypeError as e:
+        print(f"[FAIL] 清洗去重得到的产品不能 JSON 序列化: {e}")
+        return 1
+    if not same_products:
+        print("[FAIL] Parquet 与 JSON 输入清洗去重得到的产品不一致")
+        return 1
+
+    old_total = exports['旧: Excel 全量'] + loads['旧: Excel 全量']
+    new_total = exports['新: Parquet'] + exports['新: Excel 摘要'] + loads['新: Parquet']
+    print(f"[OK] Parquet 与 JSON 一致；导出 + 载入 {old_total * 1000:.0f}ms → {new_total * 1000:.0f}ms "
+          f"({old_total / new_total:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+MCP 客户端性能基准
+
+在本地启动一个模拟 MCP 网关（JSON-RPC，web-search-prime / web-reader），
+每个新连接先等待 --handshake 秒（模拟跨网段的 TCP + TLS 握手），每个请求再等待 --latency 秒：
+
+- pool 场景：多个线程（模拟 LLM 工作线程）并发搜索，
+  对比每次调用单独 requests.post（每次新建连接）vs 连接池（keep-alive 复用），
+  统计耗时、服务端收到的连接数，并校验结果一致
+- batch 场景：每个产品一次二次补全搜索（4 个查询，同 second_round_search），
+  对比逐个调用 vs search_many 批量调用 vs 网关不支持批量时的并行回退，
+  统计耗时、HTTP 请求数，并校验结果一致
+- async 场景：同样的二次补全搜索，对比同步客户端（每个工作线程逐个阻塞调用）
+  vs AsyncMCPClient（工作线程经 search_function() 提交，查询在事件循环中重叠进行）
+  vs 纯 asyncio（所有产品的查询一次 gather，受 --concurrency 限制），
+  校验结果一致，并检查截止时间生效（超时的调用按时返回 None）
+- cache 场景：一个月的产品（同一产品名有多种写法）各做一次二次补全搜索，
+  对比无缓存 vs MCP 缓存首次运行 vs 重复运行的 MCP 调用次数与缓存命中率，并校验结果一致
+- singleflight 场景：同一产品的多篇报道被相邻的工作线程同时处理（补全搜索 + LLM 提取），
+  对比不合并 vs 请求合并的 MCP / LLM 上游调用次数，并校验结果一致（不使用 MCP 缓存）
+
+使用方式:
+    python scripts/bench_mcp.py [--scenario pool|batch|async|cache|singleflight] [--threads 5] [--calls 20]
+                                [--latency 0.02] [--handshake 0.03] [--concurrency 20]
+
+示例:
+    python scripts/bench_mcp.py
+    python scripts/bench_mcp.py --threads 10 --calls 40 --handshake 0.05
+    python scripts/bench_mcp.py --scenario batch --calls 10
+    python scripts/bench_mcp.py --scenario async --latency 0.1
+    python scripts/bench_mcp.py --scenario cache
+    python scripts/bench_mcp.py --scenario singleflight --copies 4
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import json
+import asyncio
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mcp_client  # noqa: E402
+import etl_pipeline  # noqa: E402
+import single_flight  # noqa: E402
+
+
+class MockMCPGateway:
+    """模拟 MCP 网关：按查询 / URL 生成确定的结果，统计连接数与请求数（同时模拟 LLM chat/completions 接口）"""
+
+    def __init__(self, latency: float = 0.02, handshake: float = 0.03, batch: bool = True):
+        """
+        Args:
+            latency: 每个 JSON-RPC 调用的处理延迟（秒）；批量请求中的各调用在网关内并行处理，整批只计一次
+            handshake: 每个新连接的建立延迟（秒），模拟 TCP + TLS 握手
+            batch: 是否支持 JSON-RPC 批量请求（不支持时对数组请求返回 -32600 Invalid Request）
+        """
+        self.latency = latency
+        self.handshake = handshake
+        self.batch = batch
+        self.connections = 0
+        self.requests = 0
+        self.calls = 0
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self.base_url = ''
+
+    @staticmethod
+    def search_result(query: str) -> dict:
+        # 与真实搜索引擎一样，空格、大小写、全半角不同的查询返回相同的结果
+        query = mcp_client.normalize_query(query)
+        return {'results': [
+            {'title': f'{query} 评测 {i}', 'url': f'https://example.com/{abs(hash(query)) % 100000}/{i}',
+             'content': f'{query} 第 {i} 条结果：传感器 PAW3395，重量 55g，回报率 8K。'}
+            for i in range(1, 6)
+        ]}
+
+    @staticmethod
+    def read_result(url: str) -> dict:
+        return {'content': f'{url} 的正文：产品规格参数表。'}
+
+    def chat(self, payload: dict) -> dict:
+        """模拟 LLM chat/completions：按提示词生成确定的回答"""
+        with self._lock:
+            self.llm_calls += 1
+        time.sleep(self.latency)
+        prompt = payload['messages'][-1]['content']
+        return {'choices': [{'message': {'role': 'assistant', 'content': json.dumps(
+            {'sensor_solution': 'PAW3395', 'weight_center': '55g', 'prompt': prompt}, ensure_ascii=False)}}]}
+
+    def handle(self, payload):
+        """处理一个 JSON-RPC 请求或批量请求（数组）"""
+        if not isinstance(payload, list):
+            time.sleep(self.latency)
+            return self.call(payload)
+        if not self.batch:
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'Invalid Request'}}
+        time.sleep(self.latency)
+        return [self.call(request) for request in payload]
+
+    def call(self, request: dict) -> dict:
+        """处理一个 JSON-RPC 调用"""
+        with self._lock:
+            self.calls += 1
+        params = request.get('params') or {}
+        if request.get('method') == 'search/webSearchPrime':
+            result = self.search_result(params.get('search_query', ''))
+        elif request.get('method') == 'read':
+            result = self.read_result(params.get('url', ''))
+        else:
+            return {'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32601, 'message': 'Method not found'}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    def start(self) -> str:
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with gateway._lock:
+                    gateway.connections += 1
+                time.sleep(gateway.handshake)
+
+            def do_POST(self):
+                with gateway._lock:
+                    gateway.requests += 1
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                result = gateway.chat(payload) if self.path.endswith('/chat/completions') else gateway.handle(payload)
+                body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 客户端已放弃（超过截止时间）
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # 默认监听队列只有 5，异步客户端同时建立的连接会被丢弃重试
+            request_queue_size = 128
+
+        self._server = Server(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self._server.server_address[1]}'
+        return self.base_url
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.connections = self.requests = self.calls = self.llm_calls = 0
+
+
+def make_client(base_url: str, cache_path: str = None) -> mcp_client.MCPHTTPClient:
+    """指向模拟网关的 MCP 客户端（默认不使用 MCP 缓存，cache_path 指定时使用该缓存文件）"""
+    os.environ.update({'MCP_BASE_URL': base_url, 'MCP_TOKEN': 'bench', 'MCP_SEARCH_ENABLED': 'true',
+                       'MCP_SEARCH_ENDPOINT': f'{base_url}/mcp_web_search',
+                       'MCP_READER_ENDPOINT': f'{base_url}/mcp_web_reader',
+                       'MCP_CACHE': 'true' if cache_path else 'false', 'MCP_CACHE_PATH': cache_path or ''})
+    mcp_client.reset_mcp_cache()
+    return mcp_client.MCPHTTPClient()
+
+
+def queries_for(threads: int, calls: int) -> list:
+    """每个线程的查询列表（模拟各产品的补全搜索）"""
+    return [[f'产品{t}-{c} 规格 参数' for c in range(calls)] for t in range(threads)]
+
+
+class UnpooledHTTP:
+    """旧方式：每次调用单独 requests.post（每次新建连接）"""
+
+    def post(self, url: str, **kwargs):
+        return requests.post(url, **kwargs)
+
+
+def run_threads(client, queries: list) -> tuple:
+    """每个线程顺序执行自己的查询，返回 (结果, 耗时)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results = list(executor.map(lambda qs: [client.search(q) for q in qs], queries))
+    return results, time.perf_counter() - start
+
+
+def bench_pool(gateway: MockMCPGateway, args) -> int:
+    """单独 requests.post vs 连接池"""
+    client = make_client(gateway.base_url)
+    queries = queries_for(args.threads, args.calls)
+    runs = {}
+    for label, http in (('单独请求:', UnpooledHTTP()), ('连接池:', mcp_client.PooledHTTP(args.pool_size))):
+        client.http = http
+        gateway.reset_stats()
+        results, elapsed = run_threads(client, queries)
+        runs[label] = (results, elapsed, gateway.connections, gateway.requests)
+
+    print(f"模拟 MCP 网关: 处理延迟 {args.latency}s，新连接握手 {args.handshake}s；"
+          f"{args.threads} 个线程 x {args.calls} 次搜索")
+    for label, (_, elapsed, connections, requests_) in runs.items():
+        print(f"  {label:<12}{elapsed:6.2f}s  {requests_} 次请求，服务端建立连接 {connections} 次")
+    if isinstance(client.http, mcp_client.PooledHTTP):
+        client.http.print_stats()
+
+    (base, base_time, base_conns, _), (pooled, elapsed, conns, _) = runs.values()
+    if base != pooled:
+        print("[FAIL] 两种方式的搜索结果不一致")
+        return 1
+    if conns >= base_conns:
+        print("[FAIL] 连接池没有减少新建连接")
+        return 1
+    print(f"[OK] 结果一致；新建连接 {base_conns} → {conns} 次，耗时 {base_time:.2f}s → {elapsed:.2f}s "
+          f"({base_time / elapsed:.1f}x)")
+    return 0
+
+
+def product_queries(products: int) -> list:
+    """每个产品的二次补全查询（与 second_round_search 构造的查询一致）"""
+    names = [f'替身鼠标 M{index}' for index in range(products)]
+    return [[f'{name} 规格 参数', f'{name} 传感器', f'{name} 重量', f'site:inwaishe.com {name}'] for name in names]
+
+
+def bench_batch(gateway: MockMCPGateway, args) -> int:
+    """逐个调用 vs 批量调用 vs 不支持批量时的并行回退"""
+    client = make_client(gateway.base_url)
+    client.http = mcp_client.PooledHTTP(args.pool_size)
+    products = product_queries(args.threads * args.calls // 4 or 1)
+    runs = {}
+    for label, batch, call in (('逐个调用:', True, lambda qs: [client.search(q) for q in qs]),
+                               ('批量调用:', True, client.search_many),
+                               ('并行回退:', False, client.search_many)):
+        gateway.batch = batch
+        client.batch_supported = None
+        gateway.reset_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            results = list(executor.map(call, products))
+        runs[label] = (results, time.perf_counter() - start, gateway.requests)
+
+    print(f"模拟 MCP 网关: 处理延迟 {args.latency}s；{len(products)} 个产品 x 4 个查询，{args.threads} 个线程")
+    for label, (_, elapsed, requests_) in runs.items():
+        print(f"  {label:<12}{elapsed:6.2f}s  HTTP 请求 {requests_} 次")
+
+    (base, base_time, _), (batched, elapsed, _), (fallback, _, _) = runs.values()
+    if not base[0][0] or base != batched or base != fallback:
+        print("[FAIL] 批量 / 并行回退的搜索结果与逐个调用不一致")
+        return 1
+    print(f"[OK] 结果一致；批量调用耗时 {base_time:.2f}s → {elapsed:.2f}s ({base_time / elapsed:.1f}x)")
+    return 0
+
+
+def bench_async(gateway: MockMCPGateway, args) -> int:
+    """同步客户端 vs AsyncMCPClient（经 search_function 接入工作线程）vs 纯 asyncio"""
+    client = make_client(gateway.base_url)
+    client.http = mcp_client.PooledHTTP(args.pool_size)
+    products = product_queries(args.threads * args.calls // 4 or 1)
+    # 每个 AsyncMCPClient 实例只在一个事件循环中使用：线程接入用后台事件循环，纯 asyncio 用 asyncio.run 的事件循环
+    bridged_client = mcp_client.AsyncMCPClient(client, concurrency=args.concurrency)
+    async_client = mcp_client.AsyncMCPClient(client, concurrency=args.concurrency)
+    search_func = bridged_client.search_function()
+
+    async def gather_all():
+        results = await asyncio.gather(*(async_client.search_many(queries) for queries in products))
+        await async_client.aclose()
+        return [[result or '' for result in batch] for batch in results]
+
+    runs = {}
+    for label, run in (
+        ('同步线程:', lambda: run_workers(args.threads, products, lambda qs: [client.search(q) or '' for q in qs])),
+        ('异步(线程接入):', lambda: run_workers(args.threads, products, search_func.many)),
+        ('纯 asyncio:', lambda: asyncio.run(gather_all())),
+    ):
+        gateway.reset_stats()
+        start = time.perf_counter()
+        results = run()
+        runs[label] = (results, time.perf_counter() - start, gateway.requests)
+    bridged_client.close()
+
+    transport = 'aiohttp' if mcp_client.aiohttp is not None else '线程池'
+    print(f"模拟 MCP 网关: 处理延迟 {args.latency}s；{len(products)} 个产品 x 4 个查询，"
+          f"{args.threads} 个工作线程，异步并发上限 {args.concurrency}（{transport}）")
+    for label, (_, elapsed, requests_) in runs.items():
+        print(f"  {label:<16}{elapsed:6.2f}s  HTTP 请求 {requests_} 次")
+    bridged_client.print_stats()
+
+    # 截止时间：网关处理时间超过截止时间的调用应按时返回 None
+    slow_client = mcp_client.AsyncMCPClient(client, concurrency=args.concurrency, deadline=args.latency / 2)
+
+    async def search_late():
+        start = time.perf_counter()
+        result = await slow_client.search('截止时间测试')
+        elapsed = time.perf_counter() - start
+        await slow_client.aclose()
+        return result, elapsed
+
+    late, late_elapsed = asyncio.run(search_late())
+
+    (base, base_time, _), (bridged, bridged_time, _), (gathered, elapsed, _) = runs.values()
+    if not base[0][0] or base != bridged or base != gathered:
+        print("[FAIL] 异步客户端的搜索结果与同步客户端不一致")
+        return 1
+    if late is not None or late_elapsed > args.latency:
+        print(f"[FAIL] 截止时间未生效（{late_elapsed:.2f}s 后返回 {late!r:.20}）")
+        return 1
+    print(f"[OK] 结果一致；耗时 {base_time:.2f}s → {bridged_time:.2f}s（线程接入）/ {elapsed:.2f}s（纯 asyncio），"
+          f"超过截止时间的调用 {late_elapsed * 1000:.0f}ms 后返回")
+    return 0
+
+
+def month_products(products: int) -> list:
+    """
+    一个月的二次补全查询：多篇文章报道同一产品，产品名写法略有不同（空格、大小写、全角），
+    规范化后是相同的查询
+    """
+    variants = ['{brand} {model}', '{brand}{model}', '{brand} {model_lower}', '{brand} {model_wide}']
+    models = max(1, products // len(variants))
+    queries = []
+    for index in range(products):
+        model = f'G{300 + index % models}X'
+        name = variants[index // models % len(variants)].format(
+            brand='罗技', model=model, model_lower=model.lower(),
+            model_wide=model.translate({ord(c): ord(c) + 0xFEE0 for c in model}))
+        queries.append([f'{name} 规格 参数', f'{name} 传感器', f'site:inwaishe.com {name}', f'site:wstx.com {name}'])
+    return queries
+
+
+def bench_cache(gateway: MockMCPGateway, args) -> int:
+    """无缓存 vs MCP 缓存：同一个月运行两次"""
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_mcp_cache_'))
+    products = month_products(args.threads * args.calls // 4 or 1)
+    runs = {}
+    try:
+        for label, cache_path in (('无缓存:', None), ('缓存 第 1 次:', str(work_dir / 'mcp_cache.sqlite')),
+                                  ('缓存 第 2 次:', str(work_dir / 'mcp_cache.sqlite'))):
+            # 每次运行都是新进程的样子：重新创建客户端，缓存从磁盘重新打开
+            client = make_client(gateway.base_url, cache_path)
+            client.http = mcp_client.PooledHTTP(args.pool_size)
+            gateway.reset_stats()
+            start = time.perf_counter()
+            results = run_workers(args.threads, products, client.search_many)
+            elapsed = time.perf_counter() - start
+            stats = dict(client.cache.stats) if client.cache else {'lookups': 0, 'hits': 0}
+            runs[label] = (results, elapsed, gateway.calls, stats)
+        mcp_client.reset_mcp_cache()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"模拟 MCP 网关: 处理延迟 {args.latency}s；一个月 {len(products)} 篇产品文章 x 4 个查询"
+          f"（同一产品名有 4 种写法），{args.threads} 个线程")
+    for label, (_, elapsed, calls, stats) in runs.items():
+        ratio = f"，缓存命中率 {stats['hits'] / stats['lookups']:.0%}" if stats['lookups'] else ''
+        print(f"  {label:<14}{elapsed:6.2f}s  MCP 调用 {calls} 次{ratio}")
+
+    (base, _, base_calls, _), (first, _, first_calls, _), (second, _, second_calls, _) = runs.values()
+    if base != first or base != second:
+        print("[FAIL] 使用缓存后的搜索结果与无缓存时不一致")
+        return 1
+    if second_calls > base_calls * 0.05:
+        print(f"[FAIL] 重复运行仍有 {second_calls} 次 MCP 调用")
+        return 1
+    print(f"[OK] 结果一致；MCP 调用 {base_calls} 次 → 首次运行 {first_calls} 次（规范化去重）→ 重复运行 {second_calls} 次")
+    return 0
+
+
+def burst_products(products: int, copies: int) -> list:
+    """
+    同一产品的 copies 篇报道相邻排列（产品名写法不同，规范化后相同），
+    ETL 的工作线程按顺序取产品，同一产品的补全搜索与 LLM 提取同时在途
+    """
+    variants = ['{brand} {model}', '{brand}{model}', '{brand} {model_lower}', '{brand} {model_wide}']
+    queries = []
+    for index in range(products):
+        model = f'G{300 + index // copies}X'
+        name = variants[index % copies % len(variants)].format(
+            brand='罗技', model=model, model_lower=model.lower(),
+            model_wide=model.translate({ord(c): ord(c) + 0xFEE0 for c in model}))
+        queries.append([f'{name} 规格 参数', f'{name} 传感器', f'site:inwaishe.com {name}', f'site:wstx.com {name}'])
+    return queries
+
+
+def bench_single_flight(gateway: MockMCPGateway, args) -> int:
+    """不合并 vs 请求合并：相邻工作线程同时处理同一产品"""
+    products = burst_products(args.threads * args.calls // 4 or 1, args.copies)
+    llm_url = f'{gateway.base_url}/v1/chat/completions'
+    headers = {'Content-Type': 'application/json', 'Authorization': 'Bearer bench'}
+
+    def process(client):
+        def worker(queries: list) -> tuple:
+            context = client.search_many(queries)
+            # 与 LLMExtractor 一样，提示词由规范化后的产品名与参数 Schema 构成，同一产品的提示词相同
+            prompt = f"从以下资料中提取 {mcp_client.normalize_query(queries[0])} 的参数：{etl_pipeline.MOUSE_SCHEMA}"
+            data = {'model': 'bench', 'messages': [{'role': 'user', 'content': prompt}], 'temperature': 0.1}
+            response = etl_pipeline.post_llm(llm_url, headers, data, timeout=30)
+            response.raise_for_status()
+            return context, response.json()['choices'][0]['message']['content']
+        return worker
+
+    runs = {}
+    groups = {}
+    for label, enabled in (('不合并:', 'false'), ('请求合并:', 'true')):
+        os.environ['SINGLE_FLIGHT'] = enabled
+        single_flight.reset_single_flights()
+        client = make_client(gateway.base_url)
+        client.http = mcp_client.PooledHTTP(args.pool_size)
+        gateway.reset_stats()
+        start = time.perf_counter()
+        results = run_workers(args.threads, products, process(client))
+        runs[label] = (results, time.perf_counter() - start, gateway.calls, gateway.llm_calls)
+        groups[label] = (single_flight.get_single_flight('MCP'), single_flight.get_single_flight('LLM'))
+    os.environ.pop('SINGLE_FLIGHT')
+    single_flight.reset_single_flights()
+
+    print(f"模拟 MCP 网关 / LLM: 处理延迟 {args.latency}s；{len(products)} 篇产品文章（每个产品 {args.copies} 篇相邻）"
+          f" x 4 个查询 + 1 次 LLM 提取，{args.threads} 个线程")
+    for label, (_, elapsed, calls, llm_calls) in runs.items():
+        print(f"  {label:<10}{elapsed:6.2f}s  MCP 调用 {calls} 次，LLM 调用 {llm_calls} 次")
+    for group in groups['请求合并:']:
+        group.print_stats()
+
+    (base, base_time, base_calls, base_llm), (merged, elapsed, calls, llm_calls) = runs.values()
+    if not base[0][0][0] or base != merged:
+        print("[FAIL] 请求合并后的搜索 / LLM 结果与不合并时不一致")
+        return 1
+    if calls >= base_calls or llm_calls >= base_llm:
+        print("[FAIL] 请求合并没有减少上游调用")
+        return 1
+    print(f"[OK] 结果一致；MCP 调用 {base_calls} → {calls} 次，LLM 调用 {base_llm} → {llm_calls} 次，"
+          f"耗时 {base_time:.2f}s → {elapsed:.2f}s")
+    return 0
+
+
+def run_workers(threads: int, products: list, search) -> list:
+    """模拟 ETL 工作线程：每个线程处理一个产品的全部查询"""
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(search, products))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MCP 客户端性能基准测试')
+    parser.add_argument('--scenario', choices=['pool', 'batch', 'async', 'cache', 'singleflight'], default='pool', help='基准场景（默认: pool）')
+    parser.add_argument('--threads', type=int, default=5, help='并发线程数（默认: 5，与 ETL 批大小一致）')
+    parser.add_argument('--calls', type=int, default=20, help='每个线程的调用次数（默认: 20）')
+    parser.add_argument('--latency', type=float, default=0.02, help='网关处理延迟/秒（默认: 0.02）')
+    parser.add_argument('--handshake', type=float, default=0.03, help='新连接握手延迟/秒（默认: 0.03）')
+    parser.add_argument('--pool-size', type=int, default=10, help='连接池大小（默认: 10）')
+    parser.add_argument('--concurrency', type=int, default=20, help='AsyncMCPClient 并发上限（默认: 20）')
+    parser.add_argument('--copies', type=int, default=4, help='singleflight 场景每个产品的相邻文章数（默认: 4）')
+    args = parser.parse_args()
+
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    gateway = MockMCPGateway(latency=args.latency, handshake=args.handshake)
+    gateway.start()
+    try:
+        if args.scenario == 'batch':
+            return bench_batch(gateway, args)
+        if args.scenario == 'async':
+            return bench_async(gateway, args)
+        if args.scenario == 'cache':
+            return bench_cache(gateway, args)
+        if args.scenario == 'singleflight':
+            return bench_single_flight(gateway, args)
+        return bench_pool(gateway, args)
+    finally:
+        gateway.shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
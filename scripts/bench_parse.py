@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+页面解析性能基准
+
+对比 BeautifulSoup 完整建树 vs lxml 快速解析（SPIDER_FAST_PARSE）在列表页 / 详情页上的解析耗时，
+并逐页校验两条路径得到的文章候选（get_article_candidates）与文章字典（parse_article）完全一致；
+另外对比每页做字符集检测（response.apparent_encoding）与按主机缓存编码（BaseSpider.response_encoding）的耗时。
+
+--workers 1,2,4,8：解析进程池（ParserPool）基准，把详情页反复提交给不同数量的解析进程，
+对比多线程解析（受 GIL 限制）的吞吐量，并校验结果与顺序一致。
+
+页面来源：
+- 默认使用内置的样例页面（模拟 in外设 Discuz 门户与外设天下的列表页/详情页，含导航、评论、脚本等页面框架）
+- --from-cache DIR：使用 HTTP 缓存目录（config.HTTP_CACHE_DIR）中保存的真实页面，按 URL 归类到已注册站点与页面类型
+
+使用方式:
+    python scripts/bench_parse.py [--rounds 20] [--from-cache output/http_cache]
+                                  [--workers 1,2,4,8] [--docs 96] [--parser soup|lxml]
+
+示例:
+    python scripts/bench_parse.py
+    python scripts/bench_parse.py --from-cache output/http_cache --rounds 5
+    python scripts/bench_parse.py --workers 1,2,4,8 --parser soup
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+import spider  # noqa: E402
+
+
+def _nav(count: int) -> str:
+    return ''.join(
+        f'<li class="nav-item"><a href="/forum-{i}-1.html" title="版块 {i}">版块 {i} <em>新</em></a></li>'
+        for i in range(count)
+    )
+
+
+def _comments(count: int) -> str:
+    return ''.join(
+        f'<div class="comment" id="c{i}"><a class="xi2" href="home.php?mod=space&uid={i}">用户{i}</a>'
+        f'<span class="xg1">2026-01-{i % 28 + 1:02d} 12:00</span>'
+        f'<p>评论内容 {i}，这个鼠标的传感器很不错 &amp; 手感好</p></div>'
+        for i in range(count)
+    )
+
+
+def _paragraphs(aid: int, count: int) -> str:
+    return ''.join(
+        f'<p>第 {i} 段：某品牌 新款鼠标 {aid} 采用 PAW3395 传感器，重量 55g，回报率 8K。<br>\n  '
+        f'<strong>价格</strong> 299 元 &lt;首发&gt;</p>'
+        + (f'<p style="text-align:center"><img src="/data/attachment/portal/2026/{aid}_{i}.jpg" alt="图{i}"></p>'
+           if i % 3 == 0 else '')
+        for i in range(count)
+    )
+
+
+def fixture_pages() -> list:
+    """生成样例页面 [(spider 类, 页面类型, URL, HTML)]"""
+    head = '<head><meta charset="utf-8"><title>{title}</title><script>var cfg = {{"uid": 0}};</script>' \
+           '<style>.a > b {{ color: red }}</style></head>'
+    pages = []
+
+    for page in range(1, 4):
+        aids = range(20000 - page * 20, 20000 - (page - 1) * 20)
+        links = '\n'.join(
+            f'<dl class="bbda cl"><dt class="xs2"><a href="article-{aid}-1.html" class="xi2">新款鼠标 {aid} 评测</a></dt>'
+            f'<dd class="xs2 cl"><a href="article-{aid}-1.html"><img src="/data/{aid}.jpg"></a>摘要 {aid}……</dd>'
+            f'<dd><span class="xg1">2026-01-{aid % 28 + 1:02d} 1{aid % 10}:30</span></dd></dl>'
+            for aid in aids
+        )
+        html = (f'<!DOCTYPE html><html>{head.format(title=f"资讯 - 第 {page} 页")}<body>'
+                f'<div id="hd"><ul class="nav">{_nav(200)}</ul></div>'
+                f'<div id="ct"><div class="bm_c">{links}</div><div class="sd">{_nav(100)}</div></div>'
+                f'<div id="ft">{_nav(60)}<script>track();</script></div></body></html>')
+        pages.append((spider.InwaisheSpider, 'list',
+                       spider.InwaisheSpider.LIST_URL_TEMPLATE.format(page=page), html))
+
+    for aid in (10001, 10002, 10003):
+        html = (f'<!DOCTYPE html><html>{head.format(title=f"新款鼠标 {aid} 发布 - in外设")}<body>'
+                f'<div id="hd"><ul class="nav">{_nav(250)}</ul></div>'
+                f'<div id="ct"><div class="mn"><div class="h hm"><h1 class="ph">新款鼠标 {aid} 发布</h1>'
+                f'<p class="xg1"><span class="xg1">2026-01-15 10:30</span> 发布者: '
+                f'<a class="xw1" href="home.php?mod=space&uid=1">编辑</a></p></div>'
+                f'<table cellpadding="0" cellspacing="0"><tr><td id="article_content_{aid}">'
+                f'<!-- 正文开始 -->{_paragraphs(aid, 40)}</td></tr></table>'
+                f'<div id="comment">{_comments(60)}</div></div><div class="sd">{_nav(120)}</div></div>'
+                f'<div id="ft">{_nav(80)}<script>if (a < b && c > d) track();</script></div></body></html>')
+        pages.append((spider.InwaisheSpider, 'article', f'{spider.InwaisheSpider.BASE_URL}/article-{aid}-1.html', html))
+
+    for page in range(1, 4):
+        pids = range(50000 - page * 20, 50000 - (page - 1) * 20)
+        links = '\n'.join(
+            f'<li class="newsItem"><a href="/p-{pid}-1" class="pic"><img src="//img.wstx.com/{pid}.jpg"></a>'
+            f'<div class="txt"><h3><a href="/p-{pid}-1">外设新闻 {pid}</a></h3>'
+            f'<p class="info"><span>作者：编辑</span><span>2026-01-{pid % 28 + 1:02d}</span></p></div></li>'
+            for pid in pids
+        )
+        html = (f'<!DOCTYPE html><html>{head.format(title="新闻 - 外设天下")}<body>'
+                f'<div class="header"><ul>{_nav(150)}</ul></div><ul class="newsList">{links}</ul>'
+                f'<div class="footer">{_nav(60)}</div></body></html>')
+        pages.append((spider.WstxSpider, 'list', f'{spider.WstxSpider.BASE_URL}/news/{page}', html))
+
+    for pid in (40001, 40002, 40003):
+        html = (f'<!DOCTYPE html><html>{head.format(title=f"外设新闻 {pid} - 外设天下")}<body>'
+                f'<div class="header"><ul>{_nav(150)}</ul></div>'
+                f'<div class="artTitle"><h1>外设新闻 {pid}</h1></div>'
+                f'<div class="artTime"><span class="author">作者：<a href="/u?uid=7">小编</a>|'
+                f'发布时间：2026-01-21 10:03:37</span></div>'
+                f'<div class="articleNr">{_paragraphs(pid, 40)}</div>'
+                f'<div class="comments">{_comments(40)}</div><div class="footer">{_nav(60)}</div></body></html>')
+        pages.append((spider.WstxSpider, 'article', f'{spider.WstxSpider.BASE_URL}/p-{pid}-1', html))
+
+    return pages
+
+
+def cached_pages(cache_dir: str) -> list:
+    """从 HTTP 缓存目录读取真实页面，按 URL 归类 [(spider 类, 页面类型, URL, HTML)]"""
+    pages = []
+    for meta_path in sorted(Path(cache_dir).glob('*.json')):
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            response = spider.HttpCache.to_response(dict(meta, body=meta_path.with_suffix('.body').read_bytes()))
+        except (OSError, ValueError, KeyError):
+            continue
+
+        url = meta['url']
+        host = urlparse(url).netloc
+        for spider_class, _ in spider.SPIDER_REGISTRY:
+            if urlparse(spider_class.BASE_URL).netloc == host:
+                list_prefix = spider_class.LIST_URL_TEMPLATE.split('{page}')[0]
+                kind = 'list' if url.startswith(list_prefix) else 'article'
+                pages.append((spider_class, kind, url, response.text))
+                break
+    return pages
+
+
+def make_spider(spider_class, url: str, html: str):
+    """构造不联网的爬虫实例：request() 直接返回给定页面，所有日期都视为目标月份"""
+    instance = spider_class()
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = html.encode('utf-8')
+    response.encoding = 'utf-8'
+    instance.request = lambda *args, **kwargs: response
+    instance.compare_date = lambda article_date: 'keep'
+    return instance
+
+
+def parse_once(instance, kind: str, url: str):
+    if kind == 'list':
+        return list(instance.get_article_candidates(1))
+    return instance.parse_article(url)
+
+
+def timed(instance, kind: str, url: str, fast: bool, rounds: int):
+    """返回 (解析结果, 平均耗时 ms)"""
+    config.SPIDER_FAST_PARSE = fast
+    result = parse_once(instance, kind, url)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_once(instance, kind, url)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+
+def bench_charset(pages: list, rounds: int):
+    """每个响应都做字符集检测 vs 按主机缓存检测结果"""
+    detect_ms = cached_ms = 0.0
+    for spider_class, _, url, html in pages:
+        instance = spider_class()
+        instance.ENCODING = None
+        response = requests.Response()
+        response.status_code = 200
+        response._content = html.encode('utf-8')
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            response.apparent_encoding
+        detect_ms += (time.perf_counter() - start) / rounds * 1000
+
+        spider._host_encodings.clear()
+        instance.response_encoding(url, response)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            instance.response_encoding(url, response)
+        cached_ms += (time.perf_counter() - start) / rounds * 1000
+
+    print(f"\n字符集检测（平均每页）：每页检测 {detect_ms / len(pages):.2f}ms → 按主机缓存 {cached_ms / len(pages):.3f}ms")
+
+
+def bench_workers(pages: list, workers_list: list, docs: int, fast: bool) -> bool:
+    """多线程解析 vs 不同进程数的解析进程池；返回结果是否一致"""
+    config.SPIDER_FAST_PARSE = fast
+    articles = [(spider_class, url, html) for spider_class, kind, url, html in pages if kind == 'article']
+    if not articles:
+        print("\n[跳过] 没有详情页，无法进行解析进程池基准")
+        return True
+    jobs = [articles[i % len(articles)] for i in range(docs)]
+    instances = {}
+    for spider_class, _, _ in articles:
+        if spider_class not in instances:
+            instance = spider_class()
+            instance.set_target_months([(config.TARGET_YEAR, config.TARGET_MONTH)])
+            instances[spider_class] = instance
+
+    print(f"\n解析进程池：{docs} 篇详情页（{'lxml' if fast else 'BeautifulSoup'} 解析）")
+    threads = max(workers_list)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        reference = list(executor.map(lambda job: instances[job[0]].parse_article_html(job[1], job[2]), jobs))
+    baseline = time.perf_counter() - start
+    print(f"  {f'{threads} 线程':<12}{baseline:7.2f}s  {docs / baseline:7.1f} 篇/s")
+
+    same = True
+    for workers in workers_list:
+        pool = spider.ParserPool(workers)
+        specs = {spider_class: instance.parser_spec() for spider_class, instance in instances.items()}
+        # 预热：进程启动与模块导入不计入耗时
+        for future in [pool.submit(specs[articles[0][0]], articles[0][1], articles[0][2]) for _ in range(workers)]:
+            future.result()
+
+        start = time.perf_counter()
+        futures = [pool.submit(specs[spider_class], url, html) for spider_class, url, html in jobs]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+
+        same = same and results == reference
+        print(f"  {f'{workers} 进程':<12}{elapsed:7.2f}s  {docs / elapsed:7.1f} 篇/s  "
+              f"({baseline / elapsed:.1f}x){'' if results == reference else '  [结果不一致]'}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面解析性能基准测试')
+    parser.add_argument('--rounds', type=int, default=20, help='每个页面重复解析次数（默认: 20）')
+    parser.add_argument('--from-cache', metavar='DIR', help='使用 HTTP 缓存目录中的真实页面代替内置样例')
+    parser.add_argument('--workers', help='解析进程池基准的进程数列表，如 1,2,4,8（默认不运行）')
+    parser.add_argument('--docs', type=int, default=96, help='解析进程池基准的详情页篇数（默认: 96）')
+    parser.add_argument('--parser', choices=['soup', 'lxml'], default='soup',
+                        help='解析进程池基准使用的解析方式（默认: soup）')
+    args = parser.parse_args()
+
+    spider.logger.setLevel(logging.ERROR)
+    pages = cached_pages(args.from_cache) if args.from_cache else fixture_pages()
+    if not pages:
+        print(f"[ERROR] 没有可用的页面: {args.from_cache}")
+        return 1
+
+    print(f"页面解析基准：{len(pages)} 个页面，每页解析 {args.rounds} 次")
+    print(f"  {'页面':<44}{'大小':>8}{'BeautifulSoup':>15}{'lxml':>10}{'加速':>8}")
+
+    totals = {}
+    mismatches = 0
+    for spider_class, kind, url, html in pages:
+        instance = make_spider(spider_class, url, html)
+        reference, soup_ms = timed(instance, kind, url, False, args.rounds)
+        result, fast_ms = timed(instance, kind, url, True, args.rounds)
+
+        label = f"{spider_class.__name__[:-6]} {kind}"
+        total = totals.setdefault(label, [0.0, 0.0])
+        total[0] += soup_ms
+        total[1] += fast_ms
+
+        same = result == reference
+        mismatches += not same
+        print(f"  {url[-44:]:<44}{len(html) // 1024:>6}KB{soup_ms:>13.2f}ms{fast_ms:>8.2f}ms"
+              f"{soup_ms / fast_ms:>7.1f}x{'' if same else '  [结果不一致]'}")
+
+    print("\n按页面类型汇总（平均每页）：")
+    for label, (soup_ms, fast_ms) in totals.items():
+        count = sum(1 for spider_class, kind, _, _ in pages if f"{spider_class.__name__[:-6]} {kind}" == label)
+        print(f"  {label:<20}{soup_ms / count:>8.2f}ms → {fast_ms / count:>6.2f}ms  ({soup_ms / fast_ms:.1f}x)")
+
+    bench_charset(pages, max(1, args.rounds // 4))
+
+    if args.workers:
+        workers_list = [int(value) for value in args.workers.split(',') if value.strip()]
+        if not bench_workers(pages, workers_list, args.docs, args.parser == 'lxml'):
+            print("\n[FAIL] 解析进程池的结果与线程解析不一致")
+            return 1
+
+    if mismatches:
+        print(f"\n[FAIL] {mismatches} 个页面两种解析结果不一致")
+        return 1
+    print("\n[OK] 所有页面两种解析的候选列表 / 文章字典完全一致")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
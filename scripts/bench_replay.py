@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+抓取吞吐量基准（离线回放）
+
+用录制的一个月抓取存档（SPIDER_RECORD_ARCHIVE）启动本地回放服务，让 run_spider_all 的全部请求
+改发到回放服务（SPIDER_REPLAY_URL），完整跑两遍所有站点的抓取：
+- 报告耗时、采集篇数、请求数、吞吐量（篇/秒、请求/秒）与回放服务注入的错误数
+- 校验两遍的采集结果完全一致（回放不访问线上站点，错误注入按 URL 决定，结果可重复）
+
+数据来源：
+- --archive FILE：录制的存档，如
+  SPIDER_RECORD_ARCHIVE=output/archive/crawl_2026_01.warc.gz python spider.py --month 2026-01
+- 默认生成一份 in外设 + 外设天下 的样例存档（--pages 页 x --per-page 篇，内容与 bench_spider 的替身站点相同）
+
+使用方式:
+    python scripts/bench_replay.py [--archive FILE] [--month 2026-01] [--latency 0.05|recorded]
+                                   [--error-rate 0.05] [--rate 20] [--concurrency 4]
+
+示例:
+    python scripts/bench_replay.py
+    python scripts/bench_replay.py --error-rate 0.1 --error-status 429
+    python scripts/bench_replay.py --archive output/archive/crawl_2026_01.warc.gz --month 2026-01 --latency recorded
+"""
+
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import config  # noqa: E402
+import spider  # noqa: E402
+import content_store  # noqa: E402
+import http_archive  # noqa: E402
+from bench_spider import StandInSite  # noqa: E402
+
+INWAISHE = spider.InwaisheSpider.BASE_URL
+WSTX = spider.WstxSpider.BASE_URL
+HTML_HEADERS = [('Content-Type', 'text/html; charset=utf-8')]
+
+
+def wstx_list_page(site: StandInSite, page: int) -> str:
+    """外设天下结构的列表页（文章与替身站点相同）"""
+    aids = sorted(site.articles, reverse=True)[(page - 1) * site.per_page:page * site.per_page]
+    links = '\n'.join(f'<li><a href="/p-{aid}-1">替身键盘 {aid}</a></li>' for aid in aids)
+    return f'<html><head><title>新闻 {page}</title></head><body><ul class="newsList">{links}</ul></body></html>'
+
+
+def wstx_article_page(site: StandInSite, aid: int) -> str:
+    """外设天下结构的详情页"""
+    publish_time = site.articles[aid].strftime('%Y-%m-%d %H:%M:%S')
+    body = ''.join(f'<p>第 {i} 段：替身键盘 {aid} 采用磁轴，支持 RT 快速触发。</p>' for i in range(20))
+    return (
+        f'<html><head><title>替身键盘 {aid}</title></head><body>'
+        f'<h1>替身键盘 {aid} 发布</h1>'
+        f'<span class="author">作者：编辑|发布时间：{publish_time}</span>'
+        f'<div class="articleNr">{body}<img src="//img.wstx.com/{aid}.jpg"></div>'
+        f'</body></html>'
+    )
+
+
+def synthesize_archive(path: Path, year: int, month: int, pages: int, per_page: int, latency: float):
+    """生成两个站点一个月的样例存档（录制耗时记为 latency）"""
+    site = StandInSite(year, month, pages=pages, per_page=per_page, latency=0)
+    writer = http_archive.HttpArchiveWriter(str(path))
+    for page in range(1, pages + 1):
+        writer.write(f'{INWAISHE}/portal.php?mod=list&catid=1&page={page}', 200, 'OK', HTML_HEADERS,
+                     site.list_page(page).encode('utf-8'), latency)
+        writer.write(f'{WSTX}/news/{page}', 200, 'OK', HTML_HEADERS, wstx_list_page(site, page).encode('utf-8'), latency)
+    for aid in sorted(site.articles, reverse=True):
+        writer.write(f'{INWAISHE}/article-{aid}-1.html', 200, 'OK', HTML_HEADERS,
+                     site.article_page(aid).encode('utf-8'), latency)
+        writer.write(f'{WSTX}/p-{aid}-1', 200, 'OK', HTML_HEADERS, wstx_article_page(site, aid).encode('utf-8'), latency)
+    writer.close()
+
+
+def replay_run(archive: Path, args, work_dir: Path):
+    """回放一遍完整抓取，返回 (数据, 耗时, 回放统计)"""
+    latency = args.latency if args.latency == 'recorded' else float(args.latency)
+    server = http_archive.ReplayServer(archive, latency=latency, jitter=args.jitter, error_rate=args.error_rate,
+                                       error_status=args.error_status, retry_after=args.retry_after, seed=args.seed)
+    config.SPIDER_REPLAY_URL = server.start()
+    config.CONTENT_STORE_DIR = str(work_dir / 'content_store')
+    content_store.reset_content_store()
+    spider.reset_rate_limiter()
+    try:
+        start = time.perf_counter()
+        data = spider.run_spider_all(args.year, args.month_number, max_pages=args.max_pages)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    return data, elapsed, server.stats
+
+
+def digest(data: list) -> str:
+    ordered = sorted(data, key=lambda article: article['url'])
+    return hashlib.sha256(json.dumps(ordered, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取吞吐量基准测试（离线回放）')
+    parser.add_argument('--archive', help='录制的抓取存档（默认生成样例存档）')
+    parser.add_argument('--month', default='2026-01', metavar='YYYY-MM', help='存档对应的目标月份（默认: 2026-01）')
+    parser.add_argument('--pages', type=int, default=5, help='样例存档每个站点的列表页数（默认: 5）')
+    parser.add_argument('--per-page', type=int, default=10, help='样例存档每页文章数（默认: 10）')
+    parser.add_argument('--max-pages', type=int, default=20, help='每个站点最大抓取页数（默认: 20）')
+    parser.add_argument('--latency', default='0.05',
+                        help="回放延迟/秒，'recorded' 则按录制时的请求耗时（默认: 0.05）")
+    parser.add_argument('--jitter', type=float, default=0.0, help='回放延迟抖动上限/秒（默认: 0）')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='注入错误的比例（默认: 0.05）')
+    parser.add_argument('--error-status', type=int, default=503, help='注入的错误状态码（默认: 503）')
+    parser.add_argument('--retry-after', type=float, default=0.2, help='注入错误时的 Retry-After 秒数（默认: 0.2）')
+    parser.add_argument('--seed', type=int, default=0, help='错误注入的随机种子（默认: 0）')
+    parser.add_argument('--rate', type=float, default=20.0, help='单主机限速 请求/秒（默认: 20）')
+    parser.add_argument('--concurrency', type=int, default=config.SPIDER_CONCURRENCY,
+                        help=f'单主机并发数（默认: {config.SPIDER_CONCURRENCY}）')
+    args = parser.parse_args()
+    args.year, args.month_number = map(int, args.month.split('-'))
+
+    logging.getLogger().setLevel(logging.ERROR)
+    spider.logger.setLevel(logging.ERROR)
+    config.SPIDER_RATE_PER_HOST = args.rate
+    config.SPIDER_RATE_BURST = 1
+    config.SPIDER_RATE_JITTER = 0.0
+    config.SPIDER_HOST_RATES = {}
+    config.SPIDER_CONCURRENCY = args.concurrency
+    config.SPIDER_RECORD_ARCHIVE = ''
+
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_replay_'))
+    config.OUTPUT_DIR = str(work_dir)
+    config.CRAWL_STATE_DIR = str(work_dir / 'crawl_state')
+    try:
+        archive = Path(args.archive) if args.archive else work_dir / 'sample.warc.gz'
+        if not args.archive:
+            synthesize_archive(archive, args.year, args.month_number, args.pages, args.per_page,
+                               0.0 if args.latency == 'recorded' else float(args.latency))
+        elif not archive.exists():
+            print(f"[ERROR] 存档不存在: {archive}")
+            return 1
+        runs = [replay_run(archive, args, work_dir) for _ in range(2)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"存档: {args.archive or '样例（2 个站点，每站 %d 页 x %d 篇）' % (args.pages, args.per_page)}，"
+          f"月份 {args.month}，延迟 {args.latency}s，错误注入 {args.error_rate:.0%}（{args.error_status}），"
+          f"限速 {args.rate:g} 请求/秒/主机，并发 {args.concurrency}")
+    for index, (data, elapsed, stats) in enumerate(runs, 1):
+        print(f"  第 {index} 遍{elapsed:8.2f}s  {len(data)} 篇，{stats['requests']} 次请求"
+              f"（{len(data) / elapsed:.1f} 篇/秒，{stats['requests'] / elapsed:.1f} 请求/秒），"
+              f"注入错误 {stats['errors']} 次，存档缺失 {stats['misses']} 次")
+
+    (first, _, _), (second, _, _) = runs
+    if not first:
+        print("[FAIL] 回放没有采集到任何文章（存档与 --month 是否对应？）")
+        return 1
+    if digest(first) != digest(second):
+        print("[FAIL] 两遍回放的采集结果不一致")
+        return 1
+
+    elapsed = sum(run[1] for run in runs) / len(runs)
+    print(f"[OK] 两遍回放结果一致（{len(first)} 篇），平均 {elapsed:.2f}s，{len(first) / elapsed:.1f} 篇/秒")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+爬虫抓取性能基准
+
+在本地启动一个模拟 in外设 的替身 HTTP 服务（带可配置的响应延迟与错误注入），
+用同一个月份对比不同抓取模式：
+
+- concurrency 场景：相同的按主机限速下，顺序抓取 vs 异步并发抓取，
+  对比耗时、限速等待/请求耗时，并校验结果一致
+- autothrottle 场景：服务端容量有限（超出即返回 429）且中途进入慢速期（高延迟 + 503），
+  对比固定限速 vs AutoThrottle 的耗时、服务端报错数与采集完整度
+- cache 场景：启用 HTTP 缓存连续抓取两次，对比第二次的请求数、下载量与耗时
+- prefetch 场景：关闭 vs 开启列表页预取，对比耗时（列表页延迟被详情页处理掩盖）并校验结果一致
+- locate 场景：目标月份之前有大量更新的列表页（回填历史月份），
+  对比从第 1 页逐页翻 vs 页码定位（列表页有/无日期）的请求数、耗时，并校验结果一致
+- outage 场景：站点抓取中途整站宕机（503 + Retry-After），
+  对比无熔断 vs 熔断时宕机期间发出的请求数与耗时
+
+使用方式:
+    python scripts/bench_spider.py [--scenario concurrency|autothrottle|cache|prefetch|locate|outage] [--pages 5]
+                                   [--per-page 10] [--latency 0.2] [--rate 20] [--concurrency 4]
+
+示例:
+    python scripts/bench_spider.py --pages 4 --concurrency 8
+    python scripts/bench_spider.py --scenario autothrottle --concurrency 8
+    python scripts/bench_spider.py --scenario cache
+    python scripts/bench_spider.py --scenario prefetch --pages 8 --prefetch 3
+    python scripts/bench_spider.py --scenario locate --lead-pages 300
+    python scripts/bench_spider.py --scenario outage --pages 4 --latency 0.05
+"""
+
+import sys
+import time
+import random
+import hashlib
+import logging
+import tempfile
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+import spider  # noqa: E402
+
+
+class StandInSite:
+    """
+    替身站点：模拟 in外设 的列表页与详情页结构
+
+    文章按发布时间倒序分布在各列表页上：前 lead_pages 页晚于目标月份（会被跳过），
+    最后一页早于目标月份（触发停止信号），中间各页属于目标月份。
+    列表页与 Discuz 门户一致，在每篇文章的标题下显示发布时间（list_dates=False 可关闭）。
+    """
+
+    def __init__(self, year: int, month: int, pages: int = 5, per_page: int = 10, latency: float = 0.05,
+                 capacity: int = 0, slow_phase: tuple = None, slow_error_rate: float = 0.0,
+                 list_dates: bool = True, lead_pages: int = 1, outage_after: float = None):
+        """
+        Args:
+            year / month: 目标月份
+            pages / per_page: 列表页数与每页文章数
+            latency: 基础响应延迟（秒）
+            capacity: 同时处理的请求上限，超出直接返回 429（0 表示不限制）
+            slow_phase: 慢速期 (开始秒, 结束秒)，相对服务启动时间；期间延迟 x5
+            slow_error_rate: 慢速期内返回 503 的概率
+            list_dates: 列表页是否显示发布时间
+            lead_pages: 晚于目标月份的列表页数（pages 中包含这些页）
+            outage_after: 服务启动该秒数后整站宕机，所有请求返回 503（带 Retry-After: 1）
+        """
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.capacity = capacity
+        self.slow_phase = slow_phase
+        self.slow_error_rate = slow_error_rate
+        self.list_dates = list_dates
+        self.lead_pages = lead_pages
+        self.outage_after = outage_after
+        self.articles = self._build_articles(year, month)
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.errors_served = 0
+        self.bytes_served = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def _build_articles(self, year: int, month: int) -> dict:
+        """生成 {aid: publish_time}，aid 越大越新"""
+        month_start = datetime(year, month, 1)
+        next_month = datetime(year + (month == 12), month % 12 + 1, 1)
+        total = self.pages * self.per_page
+        lead = self.lead_pages * self.per_page
+        inner = max(1, total - lead - self.per_page)
+        step = (next_month - month_start) / (inner + 1)
+
+        articles = {}
+        for index in range(total):
+            aid = 10000 + total - index
+            if index < lead:
+                publish_time = next_month + timedelta(hours=total - index)
+            elif index >= total - self.per_page:
+                publish_time = month_start - timedelta(hours=index)
+            else:
+                publish_time = next_month - step * (index - lead + 1)
+            articles[aid] = publish_time.replace(second=0, microsecond=0)
+        return articles
+
+    def list_page(self, page: int) -> str:
+        aids = sorted(self.articles, reverse=True)[(page - 1) * self.per_page:page * self.per_page]
+        links = '\n'.join(
+            f'<dl class="bbda cl"><dt class="xs2"><a href="article-{aid}-1.html">替身鼠标 {aid}</a></dt>'
+            + (f'<dd><span class="xg1">{self.articles[aid]:%Y-%m-%d %H:%M}</span></dd>' if self.list_dates else '')
+            + '</dl>'
+            for aid in aids
+        )
+        return f'<html><head><title>列表 {page}</title></head><body><div class="bm_c">{links}</div></body></html>'
+
+    def article_page(self, aid: int) -> str:
+        publish_time = self.articles[aid].strftime('%Y-%m-%d %H:%M')
+        body = ''.join(f'<p>第 {i} 段：替身鼠标 {aid} 采用新传感器，重量 55g。</p>' for i in range(20))
+        return (
+            f'<html><head><title>替身鼠标 {aid}</title></head><body>'
+            f'<h1 class="ph">替身鼠标 {aid} 发布</h1>'
+            f'<p class="xg1"><span class="xg1">{publish_time}</span> '
+            f'<a class="xw1" href="home.php?mod=space&uid=1">编辑</a></p>'
+            f'<table><tr><td id="article_content_{aid}">{body}'
+            f'<img src="/data/attachment/portal/{aid}.jpg"></td></tr></table>'
+            f'</body></html>'
+        )
+
+    def serve(self, path: str):
+        """模拟服务端负载：按容量/慢速期注入延迟与错误，返回 (状态码, HTML)"""
+        with self._lock:
+            overloaded = self.capacity and self.in_flight >= self.capacity
+            if overloaded:
+                self.errors_served += 1
+            else:
+                self.in_flight += 1
+        if overloaded:
+            return 429, '<html><body>429 Too Many Requests</body></html>'
+
+        try:
+            elapsed = time.monotonic() - self.started
+            if self.outage_after is not None and elapsed >= self.outage_after:
+                time.sleep(self.latency)
+                with self._lock:
+                    self.errors_served += 1
+                return 503, '<html><body>503 Service Unavailable</body></html>'
+            slow = self.slow_phase and self.slow_phase[0] <= elapsed < self.slow_phase[1]
+            time.sleep(self.latency * (5 if slow else 1))
+            if slow and random.random() < self.slow_error_rate:
+                with self._lock:
+                    self.errors_served += 1
+                return 503, '<html><body>503 Service Unavailable</body></html>'
+            return self.handle(path)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def handle(self, path: str):
+        """返回 (状态码, HTML)"""
+        parsed = urlparse(path)
+        if parsed.path == '/portal.php':
+            query = parse_qs(parsed.query)
+            if query.get('mod') == ['list']:
+                return 200, self.list_page(int(query.get('page', ['1'])[0]))
+            if query.get('mod') == ['view']:
+                aid = int(query.get('aid', ['0'])[0])
+                if aid in self.articles:
+                    return 200, self.article_page(aid)
+        elif parsed.path.startswith('/article-'):
+            aid = int(parsed.path.split('-')[1])
+            if aid in self.articles:
+                return 200, self.article_page(aid)
+        return 404, '<html><body>404</body></html>'
+
+
+def start_server(site: StandInSite):
+    """启动替身 HTTP 服务，返回 (server, base_url)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, html = site.serve(self.path)
+            body = html.encode('utf-8')
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                with site._lock:
+                    site.not_modified += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            with site._lock:
+                site.bytes_served += len(body)
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if status == 200:
+                self.send_header('ETag', etag)
+            if status == 503 and site.outage_after is not None:
+                self.send_header('Retry-After', '1')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def make_spider_class(base_url: str):
+    """构造指向替身服务的 InwaisheSpider 子类"""
+
+    class StandInInwaisheSpider(spider.InwaisheSpider):
+        BASE_URL = base_url
+        LIST_URL_TEMPLATE = f'{base_url}/portal.php?mod=list&catid=1&page={{page}}'
+
+    return StandInInwaisheSpider
+
+
+def timed_run(spider_class, max_pages: int, concurrency: int, locate_pages: bool = False):
+    """运行一次抓取，返回 (数据, 耗时, 限速统计)；每次运行使用全新的限速器"""
+    spider.reset_rate_limiter()
+    spider.reset_circuit_breaker()
+    start = time.perf_counter()
+    data = spider.run_spider(spider_class, 'stand-in', max_pages=max_pages, concurrency=concurrency,
+                             locate_pages=locate_pages)
+    elapsed = time.perf_counter() - start
+    stats = next(iter(spider.get_rate_limiter().stats().values()))
+    return data, elapsed, stats
+
+
+def print_run(label: str, data, elapsed: float, stats: dict):
+    print(f"  {label:<18}{elapsed:6.2f}s  ({len(data)} 篇，{stats['requests']} 次请求，"
+          f"限速等待 {stats['wait_seconds']:.2f}s，请求耗时 {stats['fetch_seconds']:.2f}s)")
+
+
+def bench_concurrency(args) -> int:
+    """顺序抓取 vs 异步并发抓取"""
+    site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency)
+    server, base_url = start_server(site)
+    spider_class = make_spider_class(base_url)
+
+    try:
+        seq_data, seq_time, seq_stats = timed_run(spider_class, args.pages + 1, concurrency=1)
+        async_data, async_time, async_stats = timed_run(spider_class, args.pages + 1, concurrency=args.concurrency)
+    finally:
+        server.shutdown()
+
+    print(f"替身站点: {args.pages} 页 x {args.per_page} 篇，延迟 {args.latency}s，限速 {args.rate:g} req/s")
+    print_run('顺序抓取:', seq_data, seq_time, seq_stats)
+    print_run(f'异步并发 (x{args.concurrency}):', async_data, async_time, async_stats)
+    print(f"  加速比:           {seq_time / async_time:6.2f}x")
+
+    if seq_data != async_data:
+        print("[FAIL] 两种模式的抓取结果不一致")
+        return 1
+
+    print("[OK] 两种模式的抓取结果一致")
+    return 0
+
+
+def bench_autothrottle(args) -> int:
+    """固定限速 vs AutoThrottle（服务端容量有限 + 慢速期报错）"""
+    capacity = 2
+    slow_phase = (1.0, 4.0)
+    results = {}
+
+    # 基准答案：无错误注入时的完整结果
+    site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency)
+    server, base_url = start_server(site)
+    try:
+        expected, _, _ = timed_run(make_spider_class(base_url), args.pages + 1, concurrency=1)
+    finally:
+        server.shutdown()
+
+    config.SPIDER_CONCURRENCY = args.concurrency
+    config.AUTOTHROTTLE_START_DELAY = 1 / args.rate
+    config.AUTOTHROTTLE_MIN_DELAY = 0.01
+
+    for label, autothrottle in (('固定限速:', False), ('AutoThrottle:', True)):
+        config.SPIDER_AUTOTHROTTLE = autothrottle
+        site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency,
+                           capacity=capacity, slow_phase=slow_phase, slow_error_rate=0.3)
+        server, base_url = start_server(site)
+        try:
+            data, elapsed, stats = timed_run(make_spider_class(base_url), args.pages + 1, concurrency=args.concurrency)
+        finally:
+            server.shutdown()
+        results[label] = (data, elapsed, stats, site.errors_served)
+
+    config.SPIDER_AUTOTHROTTLE = False
+
+    print(f"替身站点: {args.pages} 页 x {args.per_page} 篇，延迟 {args.latency}s，容量 {capacity} 并发，"
+          f"慢速期 {slow_phase[0]:g}-{slow_phase[1]:g}s（延迟 x5，30% 返回 503）")
+    print(f"  固定限速 {args.rate:g} req/s、并发 {args.concurrency}；AutoThrottle 并发上限 {args.concurrency}")
+    for label, (data, elapsed, stats, errors) in results.items():
+        print_run(label, data, elapsed, stats)
+        print(f"  {'':<18}服务端返回错误 {errors} 次，采集完整度 {len(data)}/{len(expected)}")
+
+    fixed_errors = results['固定限速:'][3]
+    throttled_errors = results['AutoThrottle:'][3]
+    if throttled_errors >= fixed_errors:
+        print("[FAIL] AutoThrottle 未减少服务端报错")
+        return 1
+
+    print(f"[OK] AutoThrottle 将服务端报错从 {fixed_errors} 次降到 {throttled_errors} 次")
+    return 0
+
+
+def bench_cache(args) -> int:
+    """启用 HTTP 缓存后连续抓取两次（列表页 TTL 设为 0，强制走条件请求）"""
+    site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency)
+    server, base_url = start_server(site)
+    spider_class = make_spider_class(base_url)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        config.SPIDER_HTTP_CACHE = True
+        config.HTTP_CACHE_DIR = cache_dir
+        config.HTTP_CACHE_LIST_TTL = 0
+        runs = []
+        try:
+            for _ in range(2):
+                spider._http_cache_instance = None
+                bytes_before = site.bytes_served
+                data, elapsed, stats = timed_run(spider_class, args.pages + 1, concurrency=args.concurrency)
+                runs.append((data, elapsed, stats, site.bytes_served - bytes_before, spider.get_http_cache().stats()))
+        finally:
+            server.shutdown()
+            config.SPIDER_HTTP_CACHE = False
+
+    print(f"替身站点: {args.pages} 页 x {args.per_page} 篇，延迟 {args.latency}s，列表页 TTL 0（条件请求）")
+    for label, (data, elapsed, stats, downloaded, cache_stats) in zip(('首次抓取:', '再次抓取:'), runs):
+        print_run(label, data, elapsed, stats)
+        print(f"  {'':<18}下载 {downloaded / 1024:.0f} KB，缓存命中 {cache_stats['hits']}，"
+              f"304 {cache_stats['revalidated']}，未命中 {cache_stats['misses']}")
+
+    if runs[0][0] != runs[1][0]:
+        print("[FAIL] 两次抓取结果不一致")
+        return 1
+
+    print(f"[OK] 两次抓取结果一致，再次抓取下载量 {runs[1][3] / 1024:.0f} KB（首次 {runs[0][3] / 1024:.0f} KB）")
+    return 0
+
+
+def bench_prefetch(args) -> int:
+    """列表页预取：关闭 vs 开启"""
+    site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency)
+    server, base_url = start_server(site)
+    spider_class = make_spider_class(base_url)
+
+    runs = {}
+    try:
+        for label, depth in (('不预取:', 0), (f'预取 {args.prefetch} 页:', args.prefetch)):
+            config.SPIDER_LIST_PREFETCH = depth
+            runs[label] = timed_run(spider_class, args.pages + 1, concurrency=args.concurrency)
+    finally:
+        server.shutdown()
+
+    print(f"替身站点: {args.pages} 页 x {args.per_page} 篇，延迟 {args.latency}s，限速 {args.rate:g} req/s，"
+          f"并发 {args.concurrency}")
+    for label, (data, elapsed, stats) in runs.items():
+        print_run(label, data, elapsed, stats)
+
+    (base_data, base_time, _), (data, elapsed, _) = runs.values()
+    print(f"  加速比:           {base_time / elapsed:6.2f}x")
+    if base_data != data:
+        print("[FAIL] 预取前后的抓取结果不一致")
+        return 1
+
+    print("[OK] 预取前后的抓取结果一致")
+    return 0
+
+
+def bench_outage(args) -> int:
+    """站点中途宕机：无熔断（每个请求都重试到底） vs 熔断"""
+    outage_after = 1.0
+    max_retries = 3
+    runs = {}
+
+    config.SPIDER_CONCURRENCY = args.concurrency
+    for label, threshold in (('无熔断:', 0), ('熔断:', config.SPIDER_CIRCUIT_THRESHOLD)):
+        config.SPIDER_CIRCUIT_THRESHOLD = threshold
+        site = StandInSite(2026, 1, pages=args.pages, per_page=args.per_page, latency=args.latency,
+                           outage_after=outage_after)
+        server, base_url = start_server(site)
+        try:
+            data, elapsed, stats = timed_run(make_spider_class(base_url), args.pages + 1, concurrency=args.concurrency)
+        finally:
+            server.shutdown()
+        breaker = next(iter(spider.get_circuit_breaker().stats().values()), {})
+        runs[label] = (data, elapsed, stats, site.errors_served, breaker)
+
+    print(f"替身站点: {args.pages} 页 x {args.per_page} 篇，延迟 {args.latency}s，并发 {args.concurrency}，"
+          f"{outage_after:g}s 后整站返回 503（Retry-After: 1），每个请求最多尝试 {max_retries} 次")
+    for label, (data, elapsed, stats, errors, breaker) in runs.items():
+        print_run(label, data, elapsed, stats)
+        print(f"  {'':<18}服务端返回 503 {errors} 次，重试 {breaker.get('retries', 0)} 次，"
+              f"熔断 {breaker.get('trips', 0)} 次，快速失败 {breaker.get('rejected', 0)} 次")
+
+    (_, base_time, _, base_errors, _), (_, elapsed, _, errors, breaker) = runs.values()
+    if not breaker.get('trips') or errors >= base_errors:
+        print("[FAIL] 熔断未减少宕机期间发出的请求")
+        return 1
+
+    print(f"[OK] 熔断后宕机期间的请求从 {base_errors} 次降到 {errors} 次，耗时 {base_time:.2f}s → {elapsed:.2f}s")
+    return 0
+
+
+def bench_locate(args) -> int:
+    """回填历史月份：从第 1 页逐页翻 vs 页码定位"""
+    pages = args.lead_pages + args.pages
+    runs = {}
+    for label, list_dates, locate_pages in (('逐页翻页:', True, False),
+                                            ('页码定位:', True, True),
+                                            ('定位(无列表日期):', False, True)):
+        site = StandInSite(2026, 1, pages=pages, per_page=args.per_page, latency=args.latency,
+                           list_dates=list_dates, lead_pages=args.lead_pages)
+        server, base_url = start_server(site)
+        try:
+            data, elapsed, stats = timed_run(make_spider_class(base_url), pages + 1,
+                                             concurrency=args.concurrency, locate_pages=locate_pages)
+        finally:
+            server.shutdown()
+        # 不同端口的替身站点 URL 不同，只比较文章标识与发布时间
+        runs[label] = (data, elapsed, stats, [(a['title'], a['publish_date']) for a in data])
+
+    print(f"替身站点: {pages} 页 x {args.per_page} 篇（前 {args.lead_pages} 页晚于目标月份），"
+          f"延迟 {args.latency}s，限速 {args.rate:g} req/s")
+    for label, (data, elapsed, stats, _) in runs.items():
+        print_run(label, data, elapsed, stats)
+
+    expected = runs['逐页翻页:'][3]
+    if any(run[3] != expected for run in runs.values()):
+        print("[FAIL] 页码定位的抓取结果与逐页翻页不一致")
+        return 1
+
+    print(f"[OK] 结果一致，请求数 {runs['逐页翻页:'][2]['requests']} → {runs['页码定位:'][2]['requests']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫抓取性能基准测试')
+    parser.add_argument('--scenario', choices=['concurrency', 'autothrottle', 'cache', 'prefetch', 'locate', 'outage'],
+                        default='concurrency',
+                        help='基准场景（默认: concurrency）')
+    parser.add_argument('--pages', type=int, default=5, help='替身站点列表页数（默认: 5）')
+    parser.add_argument('--lead-pages', type=int, default=200,
+                        help='locate 场景中晚于目标月份的列表页数（默认: 200）')
+    parser.add_argument('--per-page', type=int, default=10, help='每页文章数（默认: 10）')
+    parser.add_argument('--latency', type=float, default=0.2, help='服务端响应延迟/秒（默认: 0.2）')
+    parser.add_argument('--rate', type=float, default=20.0, help='单主机限速 请求/秒（默认: 20）')
+    parser.add_argument('--concurrency', type=int, default=4, help='并发抓取的单主机并发数（默认: 4）')
+    parser.add_argument('--prefetch', type=int, default=2, help='prefetch 场景的列表页预取深度（默认: 2）')
+    args = parser.parse_args()
+
+    spider.logger.setLevel(logging.WARNING)
+    config.SPIDER_RATE_PER_HOST = args.rate
+    config.SPIDER_RATE_BURST = 1
+    config.SPIDER_RATE_JITTER = 0.0
+    config.SPIDER_HOST_RATES = {}
+    config.SPIDER_HTTP_CACHE = False
+    config.TARGET_YEAR, config.TARGET_MONTH = 2026, 1
+
+    if args.scenario == 'autothrottle':
+        return bench_autothrottle(args)
+    if args.scenario == 'cache':
+        return bench_cache(args)
+    if args.scenario == 'prefetch':
+        return bench_prefetch(args)
+    if args.scenario == 'locate':
+        return bench_locate(args)
+    if args.scenario == 'outage':
+        return bench_outage(args)
+    return bench_concurrency(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+请求合并（single-flight）- 并发的相同请求只调用一次上游
+
+ThreadPoolExecutor 的多个工作线程同时处理相似产品时，相同的搜索查询、相同的 LLM 提示词经常同时在途：
+- 第一个调用方（leader）真正调用上游，其余相同 key 的调用方等待并共享它的结果（包括失败 / 异常）
+- 调用结束后 key 即移除，之后的请求重新调用上游（结果的复用由 MCP 缓存等负责）
+- 线程（do / do_many）与 asyncio 协程（do_async）共用同一组在途请求
+
+按用途分组（get_single_flight('MCP') / get_single_flight('LLM')），每组统计上游调用与合并次数。
+SINGLE_FLIGHT=false 时不合并，直接调用上游。
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class SingleFlight:
+    """
+    一组按 key 合并的在途请求
+
+    key 相同即视为同一个请求（由调用方规范化，如 MCP 的 cache_key、LLM 请求体的哈希）。
+    """
+
+    def __init__(self, name: str, enabled: bool = None):
+        """
+        Args:
+            name: 分组名称（统计输出用）
+            enabled: 是否合并，None 则读取 SINGLE_FLIGHT 环境变量（默认 true）
+        """
+        self.name = name
+        if enabled is None:
+            enabled = os.getenv('SINGLE_FLIGHT', 'true').lower() == 'true'
+        self.enabled = enabled
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def _join(self, key: Hashable):
+        """登记一个调用，返回 (future, 是否为 leader)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = Future()
+                self.stats['calls'] += 1
+                return future, True
+            self.stats['shared'] += 1
+            return future, False
+
+    def _resolve(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        """leader 调用结束：移除 key 并唤醒等待的调用方"""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Optional[Hashable], fn: Callable, *args, **kwargs) -> Any:
+        """
+        调用 fn(*args, **kwargs)；相同 key 的调用在途时等待并返回它的结果
+
+        key 为 None（不可合并的请求）或未启用时直接调用 fn。
+        """
+        if key is None or not self.enabled:
+            return fn(*args, **kwargs)
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    def do_many(self, keys: List[Optional[Hashable]], fn: Callable[[List[int]], List[Any]]) -> List[Any]:
+        """
+        批量版本：keys 中已在途的等待其结果，其余的由一次 fn(positions) 取得
+
+        Args:
+            keys: 每个请求的 key（None 表示不合并）
+            fn: 接收需要由本次调用取得的位置列表，返回与之一一对应的结果
+
+        Returns:
+            与 keys 一一对应的结果
+        """
+        results = [None] * len(keys)
+        owned, waiting = [], {}
+        for position, key in enumerate(keys):
+            if key is None or not self.enabled:
+                owned.append((position, None, None))
+                continue
+            future, leader = self._join(key)
+            if leader:
+                owned.append((position, key, future))
+            else:
+                waiting[position] = future
+
+        if owned:
+            try:
+                fetched = fn([position for position, _, _ in owned])
+            except BaseException as e:
+                for _, key, future in owned:
+                    if future is not None:
+                        self._resolve(key, future, error=e)
+                raise
+            for (position, key, future), result in zip(owned, fetched):
+                results[position] = result
+                if future is not None:
+                    self._resolve(key, future, result)
+
+        for position, future in waiting.items():
+            results[position] = future.result()
+        return results
+
+    async def do_async(self, key: Optional[Hashable], coro_fn: Callable, *args,
+                       wait_timeout: float = None, **kwargs) -> Any:
+        """
+        协程版本：await coro_fn(*args, **kwargs)；相同 key 的调用（线程或协程）在途时等待其结果
+
+        - 等待方最多等待 wait_timeout 秒（超时抛出 asyncio.TimeoutError），等待方超时或被取消不影响 leader 的调用
+        - leader 被取消时等待方得到 None（与调用失败相同），CancelledError 只在 leader 中抛出
+        """
+        if key is None or not self.enabled:
+            return await coro_fn(*args, **kwargs)
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait_timeout)
+        try:
+            result = await coro_fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._resolve(key, future, None)
+            raise
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def print_stats(self):
+        """输出合并统计（没有调用时不输出）"""
+        with self._lock:
+            stats = dict(self.stats)
+        total = stats['calls'] + stats['shared']
+        if not total:
+            return
+        print(f"[请求合并] {self.name}: 请求 {total} 次，上游调用 {stats['calls']} 次，"
+              f"合并 {stats['shared']} 次（避免 {stats['shared'] / total:.0%} 的上游调用）")
+
+
+# 全局共享的分组（按名称的单例）
+_single_flights: Dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """获取指定名称的全局请求合并分组"""
+    with _single_flights_lock:
+        if name not in _single_flights:
+            _single_flights[name] = SingleFlight(name)
+        return _single_flights[name]
+
+
+def reset_single_flights():
+    """丢弃全部分组及其统计（修改 SINGLE_FLIGHT 后调用）"""
+    with _single_flights_lock:
+        _single_flights.clear()
+
+
+def print_single_flight_stats():
+    """输出全部分组的合并统计"""
+    with _single_flights_lock:
+        groups = list(_single_flights.values())
+    for group in groups:
+        group.print_stats()
@@ -12,13 +12,48 @@ import time
 import random
 import logging
 import re
-from datetime import datetime
+import asyncio
+import threading
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, TimeoutError as FuturesTimeoutError
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse, urlencode, parse_qsl
 import requests
+from requests.structures import CaseInsensitiveDict
 from bs4 import BeautifulSoup
+from lxml import etree
 import pandas as pd
-from typing import Dict, List, Optional, Generator
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from typing import Dict, Iterable, List, Optional, Generator, Tuple
 import config
+from content_store import get_content_store, load_body
+from http_archive import get_archive_writer, mount_replay
+
+try:
+    import pyarrow  # Parquet 导出（可选依赖）
+except ImportError:
+    pyarrow = None
+
+
+# ParserPool 解析进程的进程名前缀
+PARSER_PROCESS_PREFIX = 'SpiderParser'
+
+
+def in_parser_worker() -> bool:
+    """
+    当前进程是否为 ParserPool 的解析进程
+
+    spawn 启动的解析进程会重新导入本模块，据此跳过只属于主进程的副作用（日志文件、站点描述加载）
+    """
+    return multiprocessing.current_process().name.startswith(PARSER_PROCESS_PREFIX)
 
 
 class SpiderLogger:
@@ -26,7 +61,13 @@ class SpiderLogger:
 
     @staticmethod
     def setup():
-        """配置日志系统"""
+        """配置日志系统（解析进程只输出到控制台，不再打开日志文件）"""
+        if in_parser_worker():
+            logging.basicConfig(level=getattr(logging, config.LOG_LEVEL),
+                                format='%(asctime)s [%(levelname)s] %(message)s',
+                                handlers=[logging.StreamHandler(sys.stdout)])
+            return logging.getLogger(__name__)
+
         # 确保输出目录存在
         from pathlib import Path
         Path(config.OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
@@ -45,9 +86,1006 @@ class SpiderLogger:
 logger = SpiderLogger.setup()
 
 
+class TokenBucket:
+    """
+    单主机令牌桶
+
+    采用"预约"方式取令牌：令牌不足时余额可以为负，调用方按返回的等待时间休眠，
+    这样多个线程/协程排队时先到先得，且锁只在计算期间持有。
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        """
+        Args:
+            rate: 令牌生成速率（请求/秒），<= 0 表示不限速
+            burst: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数（调用方需持有外部锁）"""
+        if self.rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    按主机划分的令牌桶限速器
+
+    所有爬虫共享同一个实例：同一主机的请求（列表页、详情页、重试）共用一个令牌桶，
+    不同主机互不影响。acquire() 供线程调用，acquire_async() 供协程调用，两者可混用。
+    同时统计每个主机的等待耗时与请求耗时，便于按站点调整速率。
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, jitter: float = None,
+                 host_rates: Dict[str, float] = None):
+        """
+        Args:
+            rate: 默认速率（请求/秒），None 则使用 config.SPIDER_RATE_PER_HOST
+            burst: 桶容量，None 则使用 config.SPIDER_RATE_BURST
+            jitter: 需要等待时额外附加的随机延时上限（秒），None 则使用 config.SPIDER_RATE_JITTER
+            host_rates: 按主机覆盖的速率 {host: rate}，None 则使用 config.SPIDER_HOST_RATES
+        """
+        self.rate = config.SPIDER_RATE_PER_HOST if rate is None else rate
+        self.burst = config.SPIDER_RATE_BURST if burst is None else burst
+        self.jitter = config.SPIDER_RATE_JITTER if jitter is None else jitter
+        self.host_rates = dict(config.SPIDER_HOST_RATES if host_rates is None else host_rates)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _host(url_or_host: str) -> str:
+        return urlparse(url_or_host).netloc or url_or_host
+
+    def _reserve(self, host: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+                self._stats[host] = {'requests': 0, 'wait_seconds': 0.0, 'fetch_seconds': 0.0}
+            wait = bucket.reserve()
+            self._stats[host]['requests'] += 1
+
+        if wait > 0 and self.jitter > 0:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def _record_wait(self, host: str, seconds: float):
+        with self._lock:
+            self._stats[host]['wait_seconds'] += seconds
+
+    def acquire(self, url_or_host: str) -> float:
+        """阻塞直到获得令牌，返回等待的秒数"""
+        host = self._host(url_or_host)
+        wait = self._reserve(host)
+        if wait > 0:
+            logger.debug(f"限速等待 {wait:.2f} 秒: {host}")
+            time.sleep(wait)
+        self._record_wait(host, wait)
+        return wait
+
+    async def acquire_async(self, url_or_host: str) -> float:
+        """协程版 acquire，等待期间不阻塞事件循环"""
+        host = self._host(url_or_host)
+        wait = self._reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._record_wait(host, wait)
+        return wait
+
+    def set_rate(self, url_or_host: str, rate: float):
+        """调整某个主机的速率（请求/秒），供 AutoThrottle 使用"""
+        host = self._host(url_or_host)
+        with self._lock:
+            if host in self._buckets:
+                bucket = self._buckets[host]
+                # 先按旧速率结算已生成的令牌，再切换速率
+                now = time.monotonic()
+                if bucket.rate > 0:
+                    bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+                bucket.rate = rate
+            else:
+                self.host_rates[host] = rate
+
+    def record_fetch(self, url_or_host: str, seconds: float):
+        """记录一次请求的网络耗时"""
+        host = self._host(url_or_host)
+        with self._lock:
+            if host in self._stats:
+                self._stats[host]['fetch_seconds'] += seconds
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """返回各主机的统计快照 {host: {requests, wait_seconds, fetch_seconds, rate}}"""
+        with self._lock:
+            return {
+                host: dict(values, rate=self._buckets[host].rate)
+                for host, values in self._stats.items()
+            }
+
+    def log_stats(self):
+        """输出各主机的限速统计"""
+        for host, values in self.stats().items():
+            logger.info(
+                f"[限速统计] {host}: 请求 {values['requests']} 次，"
+                f"等待 {values['wait_seconds']:.1f}s，请求耗时 {values['fetch_seconds']:.1f}s，"
+                f"速率 {values['rate']:g} req/s"
+            )
+
+
+# 全局共享的限速器实例（单例模式）
+_rate_limiter_instance = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """获取全局限速器单例（多个站点的爬虫在线程池中同时创建）"""
+    global _rate_limiter_instance
+    with _rate_limiter_lock:
+        if _rate_limiter_instance is None:
+            _rate_limiter_instance = HostRateLimiter()
+        return _rate_limiter_instance
+
+
+def reset_rate_limiter():
+    """丢弃全局限速器（修改 config 中的限速配置后调用，下次使用时按新配置重建）"""
+    global _rate_limiter_instance
+    with _rate_limiter_lock:
+        _rate_limiter_instance = None
+
+
+class AutoThrottle:
+    """
+    自适应限速（AutoThrottle）
+
+    根据每个主机实测的响应延迟与错误率，动态调整该主机的请求间隔和并发上限：
+    - 正常响应：目标间隔 = 延迟 / 目标并发数，与当前间隔取平均平滑过渡；
+      近期错误率低时逐步放开并发（最多到 config.SPIDER_CONCURRENCY）
+    - 429 / 5xx / 超时等错误：间隔加倍、并发减半（乘性退避）
+
+    调整后的间隔通过 HostRateLimiter.set_rate() 生效，并发上限由抓取引擎读取。
+    """
+
+    # 视为"服务端过载"的状态码
+    BACKOFF_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, rate_limiter: HostRateLimiter, target_concurrency: float = None,
+                 min_delay: float = None, max_delay: float = None, start_delay: float = None,
+                 max_concurrency: int = None):
+        """
+        Args:
+            rate_limiter: 被调节的限速器
+            target_concurrency: 期望同时在途的请求数，None 则使用 config.AUTOTHROTTLE_TARGET_CONCURRENCY
+            min_delay / max_delay: 请求间隔上下限（秒）
+            start_delay: 初始请求间隔（秒）
+            max_concurrency: 并发上限，None 则使用 config.SPIDER_CONCURRENCY
+        """
+        self.rate_limiter = rate_limiter
+        self.target_concurrency = target_concurrency or config.AUTOTHROTTLE_TARGET_CONCURRENCY
+        self.min_delay = config.AUTOTHROTTLE_MIN_DELAY if min_delay is None else min_delay
+        self.max_delay = config.AUTOTHROTTLE_MAX_DELAY if max_delay is None else max_delay
+        self.start_delay = config.AUTOTHROTTLE_START_DELAY if start_delay is None else start_delay
+        self.max_concurrency = max(1, max_concurrency or config.SPIDER_CONCURRENCY)
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+
+    def _state(self, host: str) -> Dict[str, float]:
+        """获取主机状态（调用方需持有锁）"""
+        if host not in self._hosts:
+            self._hosts[host] = {
+                'delay': self.start_delay,
+                'concurrency': 1,
+                'latency': 0.0,
+                'error_rate': 0.0,
+                'responses': 0,
+                'errors': 0,
+            }
+        return self._hosts[host]
+
+    def concurrency(self, url_or_host: str) -> int:
+        """当前允许的并发上限"""
+        host = HostRateLimiter._host(url_or_host)
+        with self._lock:
+            return int(self._state(host)['concurrency'])
+
+    def record(self, url_or_host: str, latency: float, status: Optional[int] = None):
+        """
+        记录一次请求结果并调整限速
+
+        Args:
+            url_or_host: 请求 URL 或主机名
+            latency: 请求耗时（秒）
+            status: HTTP 状态码；None 表示超时/连接错误等异常
+        """
+        host = HostRateLimiter._host(url_or_host)
+        failed = status is None or status in self.BACKOFF_STATUS
+
+        with self._lock:
+            state = self._state(host)
+            state['responses'] += 1
+            state['error_rate'] = 0.8 * state['error_rate'] + 0.2 * (1.0 if failed else 0.0)
+
+            if failed:
+                state['errors'] += 1
+                state['delay'] = min(self.max_delay, max(state['delay'], self.min_delay) * 2)
+                state['concurrency'] = max(1, state['concurrency'] // 2)
+            else:
+                state['latency'] = latency if state['responses'] == 1 else 0.7 * state['latency'] + 0.3 * latency
+                target_delay = latency / self.target_concurrency
+                # 延迟变大时立即跟上；变小时取平均，避免单次快速响应导致猛烈提速
+                new_delay = max(target_delay, (state['delay'] + target_delay) / 2)
+                state['delay'] = min(self.max_delay, max(self.min_delay, new_delay))
+                if state['error_rate'] < 0.1 and state['concurrency'] < self.max_concurrency:
+                    state['concurrency'] += 1
+
+            delay = state['delay']
+
+        self.rate_limiter.set_rate(host, 1 / delay if delay > 0 else 0)
+        if failed:
+            logger.info(f"[AutoThrottle] {host} 响应异常 ({status or '超时/连接错误'})，"
+                        f"退避至间隔 {delay:.2f}s，并发 {self.concurrency(host)}")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """返回各主机的调节状态快照"""
+        with self._lock:
+            return {host: dict(state) for host, state in self._hosts.items()}
+
+    def log_stats(self):
+        """输出各主机的自适应限速状态"""
+        for host, state in self.stats().items():
+            logger.info(
+                f"[AutoThrottle] {host}: 间隔 {state['delay']:.2f}s，并发 {int(state['concurrency'])}，"
+                f"平均延迟 {state['latency']:.2f}s，错误 {state['errors']}/{state['responses']}"
+            )
+
+
+# 全局共享的自适应限速实例（单例模式）
+_autothrottle_instance = None
+_autothrottle_lock = threading.Lock()
+
+
+def get_autothrottle() -> Optional[AutoThrottle]:
+    """获取全局 AutoThrottle 单例；未启用 SPIDER_AUTOTHROTTLE 时返回 None"""
+    global _autothrottle_instance
+    if not config.SPIDER_AUTOTHROTTLE:
+        return None
+    rate_limiter = get_rate_limiter()
+    with _autothrottle_lock:
+        if _autothrottle_instance is None or _autothrottle_instance.rate_limiter is not rate_limiter:
+            _autothrottle_instance = AutoThrottle(rate_limiter)
+        return _autothrottle_instance
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器，并统计请求重试情况
+
+    连续失败（超时/连接错误、429/5xx）达到阈值后熔断：该主机之后的请求不再发出，直接失败。
+    cooldown > 0 时冷却期满放行一个探测请求（半开），成功则恢复，失败则重新熔断；
+    cooldown = 0 时熔断持续到本次运行结束。
+    同时按主机记录重试次数、无效请求（未得到可用响应的请求）、熔断次数与熔断时长。
+    """
+
+    def __init__(self, threshold: int = None, cooldown: float = None):
+        """
+        Args:
+            threshold: 触发熔断的连续失败次数，None 则使用 config.SPIDER_CIRCUIT_THRESHOLD（<= 0 不熔断）
+            cooldown: 熔断后的冷却时间（秒），None 则使用 config.SPIDER_CIRCUIT_COOLDOWN
+        """
+        self.threshold = config.SPIDER_CIRCUIT_THRESHOLD if threshold is None else threshold
+        self.cooldown = config.SPIDER_CIRCUIT_COOLDOWN if cooldown is None else cooldown
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+
+    def _state(self, host: str) -> Dict:
+        """获取主机状态（调用方需持有锁）"""
+        if host not in self._hosts:
+            self._hosts[host] = {
+                'failures': 0, 'opened_at': None, 'probing': False,
+                'retries': 0, 'wasted': 0, 'rejected': 0, 'trips': 0, 'open_seconds': 0.0,
+            }
+        return self._hosts[host]
+
+    def allow(self, url_or_host: str) -> bool:
+        """是否允许向该主机发请求；熔断中返回 False（记为快速失败）"""
+        host = HostRateLimiter._host(url_or_host)
+        with self._lock:
+            state = self._state(host)
+            if state['opened_at'] is None:
+                return True
+            if self.cooldown > 0 and not state['probing'] and \
+                    time.monotonic() - state['opened_at'] >= self.cooldown:
+                # 半开：放行一个探测请求
+                state['probing'] = True
+                return True
+            state['rejected'] += 1
+            return False
+
+    def is_open(self, url_or_host: str) -> bool:
+        """主机是否处于熔断状态（不计入快速失败）"""
+        host = HostRateLimiter._host(url_or_host)
+        with self._lock:
+            state = self._hosts.get(host)
+            return bool(state) and state['opened_at'] is not None and not \
+                (self.cooldown > 0 and time.monotonic() - state['opened_at'] >= self.cooldown)
+
+    def record_success(self, url_or_host: str):
+        host = HostRateLimiter._host(url_or_host)
+        with self._lock:
+            state = self._state(host)
+            state['failures'] = 0
+            state['probing'] = False
+            if state['opened_at'] is not None:
+                state['open_seconds'] += time.monotonic() - state['opened_at']
+                state['opened_at'] = None
+                logger.info(f"[熔断] {host} 探测请求成功，恢复访问")
+
+    def record_failure(self, url_or_host: str):
+        """记录一次主机故障（超时/连接错误、429/5xx），连续失败达到阈值时熔断"""
+        host = HostRateLimiter._host(url_or_host)
+        with self._lock:
+            state = self._state(host)
+            state['failures'] += 1
+            state['wasted'] += 1
+            if state['opened_at'] is not None:
+                # 半开探测失败：重新开始冷却
+                if state['probing']:
+                    state['open_seconds'] += time.monotonic() - state['opened_at']
+                    state['opened_at'] = time.monotonic()
+                    state['probing'] = False
+                return
+            if 0 < self.threshold <= state['failures']:
+                state['opened_at'] = time.monotonic()
+                state['trips'] += 1
+                logger.warning(f"[熔断] {host} 连续失败 {state['failures']} 次，暂停访问该站点"
+                               + (f" {self.cooldown:.0f} 秒" if self.cooldown > 0 else "（本次运行内）"))
+
+    def record_wasted(self, url_or_host: str):
+        """记录一次未得到可用响应、但不代表站点故障的请求（如 403/404）"""
+        with self._lock:
+            self._state(HostRateLimiter._host(url_or_host))['wasted'] += 1
+
+    def record_retry(self, url_or_host: str):
+        with self._lock:
+            self._state(HostRateLimiter._host(url_or_host))['retries'] += 1
+
+    def stats(self) -> Dict[str, Dict]:
+        """返回各主机的统计快照（熔断时长含当前仍在熔断中的时间）"""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = {}
+            for host, state in self._hosts.items():
+                open_seconds = state['open_seconds']
+                if state['opened_at'] is not None:
+                    open_seconds += now - state['opened_at']
+                snapshot[host] = {
+                    'retries': state['retries'], 'wasted': state['wasted'], 'rejected': state['rejected'],
+                    'trips': state['trips'], 'open_seconds': open_seconds, 'open': state['opened_at'] is not None,
+                }
+            return snapshot
+
+    def log_stats(self):
+        """输出各主机的重试与熔断统计"""
+        for host, values in self.stats().items():
+            if not (values['retries'] or values['wasted'] or values['trips']):
+                continue
+            logger.info(
+                f"[请求重试] {host}: 重试 {values['retries']} 次，无效请求 {values['wasted']} 次，"
+                f"熔断 {values['trips']} 次（累计 {values['open_seconds']:.1f}s，快速失败 {values['rejected']} 次）"
+                + ("，当前仍在熔断中" if values['open'] else "")
+            )
+
+
+# 全局共享的熔断器实例（单例模式）
+_circuit_breaker_instance = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取全局熔断器单例"""
+    global _circuit_breaker_instance
+    with _circuit_breaker_lock:
+        if _circuit_breaker_instance is None:
+            _circuit_breaker_instance = CircuitBreaker()
+        return _circuit_breaker_instance
+
+
+def reset_circuit_breaker():
+    """丢弃全局熔断器（修改熔断配置后或开始新一轮抓取前调用）"""
+    global _circuit_breaker_instance
+    with _circuit_breaker_lock:
+        _circuit_breaker_instance = None
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），无法解析返回 None"""
+    value = (response.headers.get('Retry-After') or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpCache:
+    """
+    磁盘 HTTP 缓存（按 URL 存储）
+
+    每个条目由 <key>.json（状态码、响应头、ETag、Last-Modified、编码、抓取时间）
+    和 <key>.body（原始响应体）两个文件组成，key 为 URL 的 SHA-1。
+    - 新鲜期内（列表页 TTL 短、文章页 TTL 长）直接从磁盘返回，不发请求
+    - 过期后带 If-None-Match / If-Modified-Since 重新验证，304 时仍用磁盘内容
+    - 总大小超过上限时按最近访问时间（body 文件 mtime）淘汰最旧的条目
+    """
+
+    def __init__(self, cache_dir: str = None, list_ttl: float = None, article_ttl: float = None,
+                 max_bytes: int = None):
+        """
+        Args:
+            cache_dir: 缓存目录，None 则使用 config.HTTP_CACHE_DIR
+            list_ttl: 列表页新鲜期（秒），None 则使用 config.HTTP_CACHE_LIST_TTL
+            article_ttl: 文章页新鲜期（秒），None 则使用 config.HTTP_CACHE_ARTICLE_TTL
+            max_bytes: 缓存总大小上限（字节），None 则使用 config.HTTP_CACHE_MAX_MB
+        """
+        self.cache_dir = Path(cache_dir or config.HTTP_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = {
+            'list': config.HTTP_CACHE_LIST_TTL if list_ttl is None else list_ttl,
+            'article': config.HTTP_CACHE_ARTICLE_TTL if article_ttl is None else article_ttl,
+        }
+        self.max_bytes = int(config.HTTP_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+
+        # 内存索引 {key: [body 大小, 最近访问时间]}，用于淘汰
+        self._index: Dict[str, list] = {}
+        for body_path in self.cache_dir.glob('*.body'):
+            stat = body_path.stat()
+            self._index[body_path.stem] = [stat.st_size, stat.st_mtime]
+        self._total_bytes = sum(size for size, _ in self._index.values())
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        return self.cache_dir / f'{key}.json', self.cache_dir / f'{key}.body'
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """读取缓存条目（含 body），不存在或已损坏返回 None"""
+        meta_path, body_path = self._paths(self._key(url))
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            meta['body'] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def is_fresh(self, entry: Dict, kind: str = 'article') -> bool:
+        """条目是否仍在新鲜期内"""
+        return time.time() - entry.get('fetched_at', 0) < self.ttl.get(kind, self.ttl['article'])
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """构造重新验证用的条件请求头"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def to_response(entry: Dict) -> requests.Response:
+        """把缓存条目还原为 requests.Response"""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.url = entry['url']
+        response._content = entry['body']
+        response.encoding = entry.get('encoding')
+        return response
+
+    def hit(self, url: str, entry: Dict, revalidated: bool = False):
+        """记录一次命中（revalidated=True 表示经 304 确认），并刷新新鲜期/访问时间"""
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        now = time.time()
+
+        if revalidated:
+            entry['fetched_at'] = now
+            meta = {k: v for k, v in entry.items() if k != 'body'}
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+        try:
+            os.utime(body_path, (now, now))
+        except OSError:
+            pass
+
+        with self._lock:
+            self._stats['revalidated' if revalidated else 'hits'] += 1
+            self._stats['bytes_saved'] += len(entry['body'])
+            if key in self._index:
+                self._index[key][1] = now
+
+    def miss(self):
+        with self._lock:
+            self._stats['misses'] += 1
+
+    def store(self, url: str, response: requests.Response):
+        """写入一个 200 响应"""
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        body = response.content
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding,
+            'fetched_at': time.time(),
+        }
+
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+        with self._lock:
+            old_size = self._index.get(key, [0])[0]
+            self._index[key] = [len(body), time.time()]
+            self._total_bytes += len(body) - old_size
+            self._stats['stored'] += 1
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """超过大小上限时淘汰最久未访问的条目（调用方需持有锁）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            del self._index[key]
+            self._total_bytes -= size
+            self._stats['evicted'] += 1
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计快照"""
+        with self._lock:
+            return dict(self._stats)
+
+    def log_stats(self):
+        """输出缓存统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            total_mb = self._total_bytes / 1024 / 1024
+        logger.info(
+            f"[HTTP缓存] 命中 {stats['hits']}，304 重新验证 {stats['revalidated']}，未命中 {stats['misses']}，"
+            f"写入 {stats['stored']}，淘汰 {stats['evicted']}，节省下载 {stats['bytes_saved'] / 1024:.0f} KB，"
+            f"当前占用 {total_mb:.1f} MB"
+        )
+
+
+# 全局共享的 HTTP 缓存实例（单例模式）
+_http_cache_instance = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """获取全局 HTTP 缓存单例；未启用 SPIDER_HTTP_CACHE 时返回 None"""
+    global _http_cache_instance
+    if not config.SPIDER_HTTP_CACHE:
+        return None
+    with _http_cache_lock:
+        if _http_cache_instance is None:
+            _http_cache_instance = HttpCache()
+        return _http_cache_instance
+
+
+class HighWaterMarkStore:
+    """
+    增量抓取的高水位线（按 站点 + 月份 持久化）
+
+    记录某站点在某月份数据集中已采集到的最新发布时间，以及最近采集过的文章 URL。
+    增量抓取时跳过已采集的 URL，遇到早于高水位线的文章即停止，只追加新文章。
+    按月份区分，避免用较新月份的进度误判较早月份的数据。
+    """
+
+    # 每个站点/月份最多记录的已采集 URL 数
+    MAX_URLS = 500
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or Path(config.CRAWL_STATE_DIR) / 'high_water_marks.json')
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(site: str, year: int, month: int) -> str:
+        return f'{site}:{year}-{month:02d}'
+
+    def _load(self) -> Dict:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, site: str, year: int, month: int) -> Optional[Dict]:
+        """返回 {'publish_date': 'YYYY-mm-dd HH:MM:SS', 'url': 最新文章 URL, 'urls': [...]}，没有则返回 None"""
+        with self._lock:
+            return self._load().get(self._key(site, year, month))
+
+    def advance(self, site: str, year: int, month: int, articles: List[Dict]):
+        """用本次采集的文章推进高水位线（只前进不后退）"""
+        if not articles:
+            return
+
+        with self._lock:
+            marks = self._load()
+            key = self._key(site, year, month)
+            mark = marks.get(key) or {'publish_date': '', 'url': '', 'urls': []}
+
+            newest = max(articles, key=lambda article: article['publish_date'])
+            if newest['publish_date'] > mark['publish_date']:
+                mark['publish_date'] = newest['publish_date']
+                mark['url'] = newest['url']
+
+            new_urls = [article['url'] for article in articles if article['url'] not in mark['urls']]
+            mark['urls'] = (new_urls + mark['urls'])[:self.MAX_URLS]
+            marks[key] = mark
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            tmp_path.write_text(json.dumps(marks, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+        logger.info(f"[高水位线] {site} {year}-{month:02d} 更新至 {mark['publish_date']}")
+
+
+class CrawlCheckpointStore:
+    """
+    抓取检查点（按 站点 + 目标月份范围，每个一个文件）
+
+    记录抓取进度：当前列表页、该页尚未完成的详情页 URL、已采集的文章 URL 以及是否已结束。
+    抓取中断（网络故障、Ctrl-C、超时）后以 --resume 重新运行即从断点继续；
+    已采集文章的完整数据在流式导出的 JSONL 中，不再重新请求。抓取正常结束后删除检查点。
+    """
+
+    def __init__(self, state_dir: str = None):
+        self.state_dir = Path(state_dir or config.CRAWL_STATE_DIR)
+
+    @staticmethod
+    def _key(site: str, months: List[Tuple[int, int]]) -> str:
+        oldest, newest = min(months), max(months)
+        return f'{site}:{oldest[0]}-{oldest[1]:02d}~{newest[0]}-{newest[1]:02d}'
+
+    def _path(self, site: str, months: List[Tuple[int, int]]) -> Path:
+        digest = hashlib.sha1(self._key(site, months).encode('utf-8')).hexdigest()[:12]
+        return self.state_dir / f'checkpoint_{digest}.json'
+
+    def get(self, site: str, months: List[Tuple[int, int]]) -> Optional[Dict]:
+        """
+        返回 {'page', 'end_page', 'pending': [...], 'stop_after_page', 'parsed': [...], 'stopped'}，
+        没有则返回 None
+        """
+        try:
+            state = json.loads(self._path(site, months).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return state if state.get('key') == self._key(site, months) else None
+
+    def save(self, site: str, months: List[Tuple[int, int]], state: Dict):
+        path = self._path(site, months)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps(dict(state, key=self._key(site, months)), ensure_ascii=False),
+                            encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def clear(self, site: str, months: List[Tuple[int, int]]):
+        try:
+            self._path(site, months).unlink()
+        except OSError:
+            pass
+
+
+# ==================== lxml 快速解析 ====================
+# 直接用 lxml 建树（C 实现），不再构建 BeautifulSoup 的 Python 对象树；
+# LxmlNode 只实现爬虫用到的 BeautifulSoup 接口，并逐条复刻其文本/HTML 输出规则，
+# 保证 parse_article / get_article_candidates 得到的结果与 BeautifulSoup 完全一致。
+
+# BeautifulSoup（HTMLTreeBuilder）的相关规则
+_SOUP_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer',
+})
+_SOUP_LIST_ATTRIBUTES = {
+    '*': frozenset({'class', 'accesskey', 'dropzone'}),
+    'a': frozenset({'rel', 'rev'}), 'link': frozenset({'rel', 'rev'}),
+    'td': frozenset({'headers'}), 'th': frozenset({'headers'}),
+    'form': frozenset({'accept-charset'}), 'object': frozenset({'archive'}),
+    'area': frozenset({'rel'}), 'icon': frozenset({'sizes'}),
+    'iframe': frozenset({'sandbox'}), 'output': frozenset({'for'}),
+}
+_SOUP_HIDDEN_TEXT_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})  # get_text() 不包含其中的文字
+_SOUP_RAW_TEXT_TAGS = frozenset({'script', 'style'})                            # 输出 HTML 时不转义
+_SOUP_PRESERVE_WHITESPACE_TAGS = frozenset({'pre', 'textarea'})
+_SOUP_ASCII_SPACES = frozenset('\x20\x0a\x09\x0c\x0d')
+_SOUP_ESCAPE = {'&': '&amp;', '<': '&lt;', '>': '&gt;'}
+_SOUP_ESCAPE_PATTERN = re.compile('[&<>]')
+_SOUP_NONWHITESPACE = re.compile(r'\S+')
+_SOUP_META_CHARSET = re.compile(r'((^|;)\s*charset=)([^;]*)', re.M)
+# libxml2 建树时把无值的 HTML4 布尔属性（<td nowrap>）补成 nowrap="nowrap"，BeautifulSoup 得到的是空字符串；
+# 树上无法区分这两种写法，遇到时该元素的 str() 回退到 BeautifulSoup
+_LIBXML2_BOOLEAN_ATTRIBUTES = frozenset({
+    'checked', 'compact', 'declare', 'defer', 'disabled', 'ismap', 'multiple', 'nohref',
+    'noresize', 'noshade', 'nowrap', 'readonly', 'selected',
+})
+
+
+class _AmbiguousBooleanAttribute(Exception):
+    pass
+
+
+def _soup_escape(text: str) -> str:
+    return _SOUP_ESCAPE_PATTERN.sub(lambda m: _SOUP_ESCAPE[m.group()], text)
+
+
+def _soup_string(text: str, preserve: bool) -> str:
+    """BeautifulSoup 会把只含 ASCII 空白的文本节点压缩成一个换行或空格（pre/textarea 内除外）"""
+    if not preserve and all(char in _SOUP_ASCII_SPACES for char in text):
+        return '\n' if '\n' in text else ' '
+    return text
+
+
+def _soup_attribute_items(element) -> List[Tuple[str, str]]:
+    """按 BeautifulSoup 的规则返回 (属性名, 输出值)：多值属性按空白拆分后以单个空格连接，meta 编码声明替换为 utf-8"""
+    tag = element.tag
+    list_attributes = _SOUP_LIST_ATTRIBUTES.get(tag, frozenset())
+    items = []
+    for key, value in element.attrib.items():
+        if key in _SOUP_LIST_ATTRIBUTES['*'] or key in list_attributes:
+            value = ' '.join(_SOUP_NONWHITESPACE.findall(value))
+        items.append((key, value))
+
+    if tag == 'meta':
+        attrs = dict(items)
+        if 'charset' in attrs:
+            items = [(k, 'utf-8' if k == 'charset' else v) for k, v in items]
+        elif 'content' in attrs and attrs.get('http-equiv', '').lower() == 'content-type':
+            content = _SOUP_META_CHARSET.sub(lambda m: m.group(1) + 'utf-8', attrs['content'])
+            items = [(k, content if k == 'content' else v) for k, v in items]
+    return sorted(items)
+
+
+class LxmlNode:
+    """
+    lxml 元素的 BeautifulSoup 兼容包装
+
+    支持 find / find_all（标签名 + class_ / id / href 等属性条件，条件可为字符串、True 或函数）、
+    get / get_text / parents / name / title 以及 str()，行为与 BeautifulSoup 一致
+    （get() 对 class 等多值属性返回原始字符串而非列表）。
+    查找直接走 lxml 的 C 实现迭代器（iter / iterdescendants）按标签名筛选，只对同名标签做属性判断。
+    """
+
+    __slots__ = ('element', 'source', 'is_document')
+
+    def __init__(self, element, source: str, is_document: bool = False):
+        self.element = element
+        self.source = source  # 原始 HTML，仅在需要回退到 BeautifulSoup 时使用
+        self.is_document = is_document
+
+    @property
+    def name(self) -> str:
+        return '[document]' if self.is_document else self.element.tag
+
+    @property
+    def parents(self) -> Generator['LxmlNode', None, None]:
+        for ancestor in self.element.iterancestors():
+            yield LxmlNode(ancestor, self.source)
+
+    @property
+    def title(self) -> Optional['LxmlNode']:
+        return self.find('title')
+
+    def get(self, key: str, default=None):
+        value = self.element.get(key)
+        return default if value is None else value
+
+    @staticmethod
+    def _match_value(value: Optional[str], condition, multi_valued: bool = False) -> bool:
+        if condition is True:
+            return value is not None
+        if callable(condition):
+            return bool(condition(value))
+        if value is None:
+            return False
+        if multi_valued:
+            # class="a b" 既匹配 'a'、'b'，也匹配整串 'a b'
+            values = _SOUP_NONWHITESPACE.findall(value)
+            return condition in values or ' '.join(values) == condition
+        return value == condition
+
+    def find_all(self, name: str, attrs: Dict = None, **kwargs) -> Generator['LxmlNode', None, None]:
+        """按标签名和属性条件查找后代元素（class_ 对应 class 属性）"""
+        conditions = dict(attrs or {})
+        for key, condition in kwargs.items():
+            conditions['class' if key == 'class_' else key] = condition
+
+        elements = self.element.iter(name) if self.is_document else self.element.iterdescendants(name)
+        list_attributes = _SOUP_LIST_ATTRIBUTES['*'] | _SOUP_LIST_ATTRIBUTES.get(name, frozenset())
+        for element in elements:
+            if all(self._match_value(element.get(key), condition, key in list_attributes)
+                   for key, condition in conditions.items()):
+                yield LxmlNode(element, self.source)
+
+    def find(self, name: str, attrs: Dict = None, **kwargs) -> Optional['LxmlNode']:
+        return next(self.find_all(name, attrs, **kwargs), None)
+
+    def _strings(self) -> Generator[str, None, None]:
+        """
+        与 BeautifulSoup _all_strings 一致的文本节点序列
+
+        BeautifulSoup 把 script/style/template/rt/rp 内的文字归为各自的字符串类型（取最内层的这类标签），
+        get_text() 只返回与当前标签同类型的文字：普通标签跳过这些文字，对 <script> 本身调用则只返回脚本内容。
+        注释不属于文本。
+        """
+        preserve = False
+        container = None
+        for ancestor in self.element.iterancestors():
+            preserve = preserve or ancestor.tag in _SOUP_PRESERVE_WHITESPACE_TAGS
+            if container is None and ancestor.tag in _SOUP_HIDDEN_TEXT_TAGS:
+                container = ancestor.tag
+        wanted = self.element.tag if self.element.tag in _SOUP_HIDDEN_TEXT_TAGS else None
+
+        def walk(element, preserve, container):
+            preserve = preserve or element.tag in _SOUP_PRESERVE_WHITESPACE_TAGS
+            if element.tag in _SOUP_HIDDEN_TEXT_TAGS:
+                container = element.tag
+            visible = container == wanted
+            if element.text and visible:
+                yield _soup_string(element.text, preserve)
+            for child in element:
+                if isinstance(child.tag, str):
+                    yield from walk(child, preserve, container)
+                if child.tail and visible:
+                    yield _soup_string(child.tail, preserve)
+
+        yield from walk(self.element, preserve, container)
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        strings = self._strings()
+        if strip:
+            strings = (text for text in (s.strip() for s in strings) if text)
+        return separator.join(strings)
+
+    def __str__(self) -> str:
+        parts = []
+        preserve = any(a.tag in _SOUP_PRESERVE_WHITESPACE_TAGS for a in self.element.iterancestors())
+        try:
+            self._serialize(self.element, parts, preserve)
+        except _AmbiguousBooleanAttribute:
+            return str(self._to_soup())
+        return ''.join(parts)
+
+    def _to_soup(self):
+        """用 BeautifulSoup 重新解析原文，按元素下标路径找到对应的标签（两者树结构相同）"""
+        path = []
+        element = self.element
+        for parent in self.element.iterancestors():
+            path.append([child for child in parent if isinstance(child.tag, str)].index(element))
+            element = parent
+
+        soup = BeautifulSoup(self.source, 'lxml')
+        node = soup.find(element.tag, recursive=False)
+        for index in reversed(path):
+            node = node.find_all(True, recursive=False)[index]
+        return node
+
+    @classmethod
+    def _serialize(cls, element, parts: List[str], preserve: bool):
+        """按 BeautifulSoup str(tag) 的格式输出（属性排序、minimal 转义、空元素 <br/>）"""
+        tag = element.tag
+        attributes = ''.join(
+            f' {key}="{value}"' if '"' not in value
+            else (f" {key}='{value}'" if "'" not in value else f' {key}="{value.replace(chr(34), "&quot;")}"')
+            for key, value in ((k, _soup_escape(v)) for k, v in _soup_attribute_items(element))
+        )
+        if any(key in _LIBXML2_BOOLEAN_ATTRIBUTES and value == key for key, value in element.attrib.items()):
+            raise _AmbiguousBooleanAttribute()
+
+        if tag in _SOUP_VOID_ELEMENTS and not element.text and len(element) == 0:
+            parts.append(f'<{tag}{attributes}/>')
+            return
+
+        parts.append(f'<{tag}{attributes}>')
+        preserve = preserve or tag in _SOUP_PRESERVE_WHITESPACE_TAGS
+        raw = tag in _SOUP_RAW_TEXT_TAGS
+        if element.text:
+            text = _soup_string(element.text, preserve)
+            parts.append(text if raw else _soup_escape(text))
+        for child in element:
+            if isinstance(child.tag, str):
+                cls._serialize(child, parts, preserve)
+            elif child.tag is etree.Comment:
+                parts.append(f'<!--{child.text or ""}-->')
+            elif child.tag is etree.ProcessingInstruction:
+                parts.append(f'<?{child.target} {child.text or ""}>')
+            if child.tail:
+                text = _soup_string(child.tail, preserve)
+                parts.append(text if raw else _soup_escape(text))
+        parts.append(f'</{tag}>')
+
+
+def parse_html(html: str, fast: bool = None):
+    """
+    解析 HTML 文档
+
+    fast=True（默认 config.SPIDER_FAST_PARSE）时返回 lxml 建树的 LxmlNode，否则返回 BeautifulSoup；
+    lxml 无法解析（如空文档）时回退到 BeautifulSoup。两者对爬虫用到的接口输出一致。
+    """
+    if config.SPIDER_FAST_PARSE if fast is None else fast:
+        if html and html[0] == '\ufeff':
+            html = html[1:]
+        try:
+            # 与 BeautifulSoup 的 lxml 构建器相同：以 feed 方式把整个字符串交给 libxml2
+            parser = etree.HTMLParser()
+            parser.feed(html)
+            root = parser.close()
+        except (etree.LxmlError, ValueError):
+            root = None
+        if root is not None:
+            return LxmlNode(root, html, is_document=True)
+    return BeautifulSoup(html, 'lxml')
+
+
+# 列表页上的日期格式（如 2026-01-21 10:03、2026/1/5）
+LIST_DATE_PATTERN = re.compile(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?')
+
+
+# 按主机缓存的页面编码 {host: encoding}，见 BaseSpider.response_encoding()
+_host_encodings: Dict[str, str] = {}
+
+
+class ListPageError(Exception):
+    """列表页请求失败（重试用尽、熔断、超时），与没有文章的空页区分"""
+
+
 class BaseSpider:
     """爬虫基类"""
 
+    # 站点页面编码（已知时设置，可省去字符集检测）
+    ENCODING: Optional[str] = None
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
@@ -56,6 +1094,19 @@ class BaseSpider:
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         })
         self.target_date = datetime(config.TARGET_YEAR, config.TARGET_MONTH, 1)
+        # 目标范围中最早的月份（单月抓取时与 target_date 相同），见 set_target_months()
+        self.oldest_date = self.target_date
+        self.rate_limiter = get_rate_limiter()
+        self.throttle = get_autothrottle()
+        self.http_cache = get_http_cache()
+        self.circuit_breaker = get_circuit_breaker()
+
+        # 录制 / 回放：存档要包含每一次真实的 HTTP 交换，回放时也不能混入之前缓存的线上页面，都不使用 HTTP 缓存
+        self.archive = get_archive_writer()
+        if config.SPIDER_REPLAY_URL:
+            mount_replay(self.session, config.SPIDER_REPLAY_URL)
+        if self.archive or config.SPIDER_REPLAY_URL:
+            self.http_cache = None
 
     def random_delay(self):
         """
@@ -63,6 +1114,9 @@ class BaseSpider:
 
         使用 SPIDER_DELAY_SECONDS + SPIDER_DELAY_JITTER 配置
         降级支持旧的 MIN_DELAY/MAX_DELAY（向后兼容）
+
+        注意：抓取流程已改由 request() 内的按主机令牌桶限速（HostRateLimiter），
+        此方法仅为兼容自定义爬虫保留。
         """
         # 优先使用新的统一配置
         if hasattr(config, 'SPIDER_DELAY_SECONDS'):
@@ -77,41 +1131,202 @@ class BaseSpider:
         logger.debug(f"延时 {delay:.2f} 秒...")
         time.sleep(delay)
 
-    def request(self, url: str, max_retries: int = 3) -> Optional[requests.Response]:
-        """发送 HTTP 请求"""
+    def request(self, url: str, max_retries: int = 3, kind: str = 'article') -> Optional[requests.Response]:
+        """
+        发送 HTTP 请求
+
+        启用 HTTP 缓存时，新鲜期内的页面直接从磁盘返回；过期页面发送条件请求，
+        收到 304 时复用磁盘内容。每次真正发出请求前先从所属主机的令牌桶取令牌。
+        超时/连接错误与 429/5xx（config.SPIDER_RETRY_STATUS）按指数退避 + 随机抖动重试，
+        响应带 Retry-After 时按其等待；403/404 等其他非 2xx 响应不重试，直接返回 None。
+        主机连续故障达到阈值后熔断，之后的请求直接失败（见 CircuitBreaker）。
+        配置了 SPIDER_RECORD_ARCHIVE 时，每次收到的响应都写入存档（见 http_archive）。
+
+        Args:
+            url: 目标 URL
+            max_retries: 最大尝试次数
+            kind: 页面类型，'list'（列表页，缓存 TTL 短）或 'article'（文章页，缓存 TTL 长）
+        """
+        cached = self.http_cache.lookup(url) if self.http_cache else None
+        if cached and self.http_cache.is_fresh(cached, kind):
+            self.http_cache.hit(url, cached)
+            logger.debug(f"缓存命中: {url}")
+            return self.http_cache.to_response(cached)
+        headers = self.http_cache.conditional_headers(cached) if cached else {}
+
         for attempt in range(max_retries):
+            if not self.circuit_breaker.allow(url):
+                logger.warning(f"站点已熔断，跳过请求: {url}")
+                return None
+            if attempt:
+                self.circuit_breaker.record_retry(url)
+
+            self.rate_limiter.acquire(url)
+            start = time.monotonic()
+            retry_after = None
             try:
-                response = self.session.get(url, timeout=config.REQUEST_TIMEOUT)
-                response.encoding = response.apparent_encoding
-                return response
+                response = self.session.get(url, headers=headers, timeout=config.REQUEST_TIMEOUT)
             except Exception as e:
+                self.rate_limiter.record_fetch(url, time.monotonic() - start)
+                if self.throttle:
+                    self.throttle.record(url, time.monotonic() - start, None)
+                self.circuit_breaker.record_failure(url)
                 logger.warning(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {url}")
                 logger.warning(f"错误: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
+            else:
+                elapsed = time.monotonic() - start
+                if self.archive:
+                    self.archive.record(response)
+                self.rate_limiter.record_fetch(url, elapsed)
+                if self.throttle:
+                    self.throttle.record(url, elapsed, response.status_code)
+
+                if cached and response.status_code == 304:
+                    # 内容未变化，使用磁盘缓存
+                    self.circuit_breaker.record_success(url)
+                    self.http_cache.hit(url, cached, revalidated=True)
+                    return self.http_cache.to_response(cached)
+                if self.http_cache:
+                    self.http_cache.miss()
+
+                status = response.status_code
+                if status in config.SPIDER_RETRY_STATUS:
+                    # 429 表示被限流而非站点故障，只重试不计入熔断
+                    if status == 429:
+                        self.circuit_breaker.record_wasted(url)
+                    else:
+                        self.circuit_breaker.record_failure(url)
+                    retry_after = retry_after_seconds(response)
+                    logger.warning(f"服务端返回 {status} (尝试 {attempt + 1}/{max_retries}): {url}")
+                elif not 200 <= status < 300:
+                    self.circuit_breaker.record_success(url)
+                    self.circuit_breaker.record_wasted(url)
+                    logger.warning(f"请求返回 {status}，不再重试: {url}")
+                    return None
+                else:
+                    self.circuit_breaker.record_success(url)
+                    response.encoding = self.response_encoding(url, response)
+                    if self.http_cache and status == 200:
+                        self.http_cache.store(url, response)
+                    return response
+
+            if attempt < max_retries - 1:
+                time.sleep(self.retry_delay(attempt, retry_after))
         logger.error(f"请求最终失败: {url}")
         return None
 
+    @staticmethod
+    def retry_delay(attempt: int, retry_after: float = None) -> float:
+        """
+        第 attempt 次（从 0 开始）失败后的等待秒数
+
+        指数退避：SPIDER_RETRY_BACKOFF * 2^attempt（不超过 SPIDER_RETRY_BACKOFF_MAX），
+        取其一半加上随机抖动，避免多个请求同时重试；服务端给出 Retry-After 时按其等待（不超过 SPIDER_RETRY_AFTER_MAX）。
+        """
+        if retry_after is not None:
+            return min(retry_after, config.SPIDER_RETRY_AFTER_MAX)
+        delay = min(config.SPIDER_RETRY_BACKOFF_MAX, config.SPIDER_RETRY_BACKOFF * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def response_encoding(self, url: str, response: requests.Response) -> Optional[str]:
+        """
+        页面编码：优先使用站点声明的 ENCODING；否则每个主机只对第一个成功响应做一次字符集检测
+        （response.apparent_encoding 需要扫描整个响应体），之后复用缓存结果
+        """
+        if self.ENCODING:
+            return self.ENCODING
+        host = urlparse(url).netloc
+        encoding = _host_encodings.get(host)
+        if encoding is None:
+            encoding = response.apparent_encoding
+            if encoding and response.status_code == 200:
+                _host_encodings[host] = encoding
+        return encoding
+
+    def set_target_months(self, months: List[Tuple[int, int]]):
+        """
+        设置目标月份范围 [(year, month), ...]，一次遍历采集多个月份
+
+        target_date 为其中最新的月份，oldest_date 为最早的月份。
+        """
+        self.target_date = datetime(*max(months), 1)
+        self.oldest_date = datetime(*min(months), 1)
+
     def compare_date(self, article_date: datetime) -> str:
         """
-        比较文章日期与目标日期
+        比较文章日期与目标月份范围（oldest_date 所在月 ~ target_date 所在月）
 
         Returns:
             'skip': 晚于目标月份，跳过
             'stop': 早于目标月份，停止抓取
             'keep': 属于目标月份，保留
         """
-        if article_date.year > self.target_date.year:
+        article_month = (article_date.year, article_date.month)
+        if article_month > (self.target_date.year, self.target_date.month):
             return 'skip'
-        elif article_date.year < self.target_date.year:
+        elif article_month < (self.oldest_date.year, self.oldest_date.month):
             return 'stop'
         else:
-            if article_date.month > self.target_date.month:
-                return 'skip'
-            elif article_date.month < self.target_date.month:
-                return 'stop'
-            else:
-                return 'keep'
+            return 'keep'
+
+    def canonical_key(self, url: str) -> str:
+        """
+        文章 URL 的规范化键，同一篇文章的不同写法映射到同一个键
+
+        默认实现：忽略协议、主机名小写、去掉默认端口和 #片段、查询参数排序、去掉路径末尾的 /。
+        子类可按站点的 URL 规则把文章 ID 的各种写法归一。
+        """
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or '').lower()
+        if parsed.port not in (None, 80, 443):
+            host = f'{host}:{parsed.port}'
+        path = parsed.path.rstrip('/') or '/'
+        query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+        return f'{host}{path}?{query}' if query else f'{host}{path}'
+
+    def get_article_candidates(self, page: int) -> Generator[Dict, None, None]:
+        """
+        从列表页获取文章候选：{'url', 'title', 'publish_time'}
+
+        默认实现只有 URL；子类可从列表页标记中提取标题和发布时间，
+        抓取引擎据此在请求详情页之前就过滤掉目标月份之外的文章。
+
+        Raises:
+            ListPageError: 列表页请求失败（页面存在但没有文章时不抛出，返回空）
+        """
+        for url in self.get_article_urls(page):
+            yield {'url': url, 'title': '', 'publish_time': None}
+
+    def _list_link_date(self, link, is_article_href) -> Optional[datetime]:
+        """
+        从列表页中文章链接附近的文本提取发布时间
+
+        自链接向上最多查找 3 层父节点；父节点中出现多篇文章的链接时日期归属不明，放弃；
+        恰好出现一个日期时才采用。
+        """
+        for depth, parent in enumerate(link.parents):
+            if depth >= 3 or parent.name in ('body', 'html', '[document]'):
+                break
+            hrefs = {a.get('href') for a in parent.find_all('a', href=True) if is_article_href(a.get('href'))}
+            if len(hrefs) > 1:
+                break
+            dates = LIST_DATE_PATTERN.findall(parent.get_text(' '))
+            if len(dates) == 1:
+                return self.parse_date(dates[0])
+            if dates:
+                break
+        return None
+
+    def extract_publish_time(self, soup: BeautifulSoup) -> Optional[datetime]:
+        """从详情页提取发布时间（子类实现）"""
+        return None
+
+    def article_publish_time(self, url: str) -> Optional[datetime]:
+        """请求详情页并只提取发布时间（列表页无日期时供页码定位使用）"""
+        response = self.request(url)
+        if not response:
+            return None
+        return self.extract_publish_time(parse_html(response.text))
 
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """解析日期字符串"""
@@ -134,213 +1349,164 @@ class BaseSpider:
         return None
 
 
-class InwaisheSpider(BaseSpider):
-    """in外设 爬虫"""
-
-    BASE_URL = 'http://www.inwaishe.com'
-    LIST_URL_TEMPLATE = f'{BASE_URL}/portal.php?mod=list&catid=1&page={{page}}'
-
-    def get_article_urls(self, page: int) -> Generator[str, None, None]:
-        """从列表页获取文章链接"""
-        url = self.LIST_URL_TEMPLATE.format(page=page)
-        logger.info(f"正在访问列表页 (第 {page} 页): {url}")
-
-        response = self.request(url)
-        if not response:
-            return
-
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        # 查找文章链接，使用集合去重
-        seen_urls = set()
-        # in外设的文章链接通常在 .bm_c 或类似容器中
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-
-            # 匹配文章详情页链接 pattern
-            if href and ('article-' in href or 'portal.php?mod=view&aid=' in href):
-                # 处理相对路径
-                if href.startswith('/'):
-                    full_url = self.BASE_URL + href
-                elif not href.startswith('http'):
-                    full_url = self.BASE_URL + '/' + href
-                else:
-                    full_url = href
-
-                # 去重：只保留唯一的URL
-                if full_url not in seen_urls:
-                    seen_urls.add(full_url)
-                    yield full_url
-
-        self.random_delay()
-
-    def parse_article(self, url: str) -> Optional[Dict]:
-        """解析文章详情页"""
-        response = self.request(url)
-        if not response:
-            return None
-
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        try:
-            # 提取发布时间
-            publish_time = None
-            time_element = soup.find('span', class_='xg1') or soup.find('em', class_='xg1')
-
-            if time_element:
-                time_text = time_element.get_text(strip=True)
-                publish_time = self.parse_date(time_text)
-
-            if not publish_time:
-                logger.warning(f"无法提取发布时间: {url}")
-                return None
-
-            # 判断是否为目标月份
-            action = self.compare_date(publish_time)
-
-            if action == 'skip':
-                logger.debug(f"跳过 (晚于目标月份): {soup.title.get_text(strip=True) if soup.title else url} - {publish_time}")
-                return None
-            elif action == 'stop':
-                logger.info(f"遇到早于目标月份的文章，停止抓取: {publish_time}")
-                return 'STOP'
-
-            # 提取标题
-            title = ''
-            title_elem = soup.find('h1') or soup.find('h2', class_='ph') or soup.find('title')
-            if title_elem:
-                title = title_elem.get_text(strip=True)
-
-            # 提取作者
-            author = ''
-            author_elem = soup.find('a', class_='xw1') or soup.find('a', href=lambda x: x and 'uid=' in x)
-            if author_elem:
-                author = author_elem.get_text(strip=True)
-
-            # 提取正文内容
-            content_elem = soup.find('td', id=lambda x: x and x.startswith('article_content')) or \
-                          soup.find('div', class_='d') or \
-                          soup.find('div', class_='content')
-
-            content_text = ''
-            content_html = ''
-
-            if content_elem:
-                # 保留换行符的纯文本
-                content_text = content_elem.get_text('\n', strip=True)
-                # HTML 内容
-                content_html = str(content_elem)
-
-            # 提取图片链接（只取第一张）
-            images = []
-            if content_elem:
-                first_img = content_elem.find('img', src=True)
-                if first_img:
-                    img_src = first_img.get('src')
-                    if img_src:
-                        if img_src.startswith('//'):
-                            img_src = 'http:' + img_src
-                        elif img_src.startswith('/'):
-                            img_src = self.BASE_URL + img_src
-                        images.append(img_src)
-
-            data = {
-                'source': 'in外设',
-                'title': title,
-                'publish_date': publish_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'url': url,
-                'author': author,
-                'content_text': content_text,
-                'content_html': content_html,
-                'images': images
-            }
+_SELECTOR_PATTERN = re.compile(
+    r'^(?P<tag>[\w-]+)(?:\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)(?P<op>[\^*]?=)(?P<value>[^\]]+)\])?$'
+)
 
-            logger.info(f"✓ 采集: {title} - {publish_time}")
-            return data
 
-        except Exception as e:
-            logger.error(f"解析文章失败: {url}")
-            logger.error(f"错误: {e}")
-            return None
+def compile_selector(selector: str) -> Tuple[str, Dict]:
+    """
+    把简单选择器编译成 find() 的 (标签名, 属性条件)
 
+    支持：tag、tag.class、tag#id、tag[attr=值]、tag[attr^=前缀]、tag[attr*=子串]
+    """
+    match = _SELECTOR_PATTERN.match(selector.strip())
+    if not match:
+        raise ValueError(f"不支持的选择器: {selector}")
+
+    attrs = {}
+    if match.group('cls'):
+        attrs['class'] = match.group('cls')
+    elif match.group('id'):
+        attrs['id'] = match.group('id')
+    elif match.group('attr'):
+        value = match.group('value').strip('\'"')
+        op = match.group('op')
+        if op == '^=':
+            attrs[match.group('attr')] = lambda x, value=value: bool(x) and x.startswith(value)
+        elif op == '*=':
+            attrs[match.group('attr')] = lambda x, value=value: bool(x) and value in x
+        else:
+            attrs[match.group('attr')] = value
+    return match.group('tag'), attrs
 
-class WstxSpider(BaseSpider):
-    """外设天下 爬虫"""
 
-    BASE_URL = 'https://www.wstx.com'
+class SiteAdapter(BaseSpider):
+    """
+    声明式站点适配器
 
-    def get_article_urls(self, page: int) -> Generator[str, None, None]:
-        """从列表页获取文章链接"""
-        # 正确的URL模式：https://www.wstx.com/news/1, /news/2, /news/3...
-        url = f'{self.BASE_URL}/news/{page}'
+    站点由一份描述（SITE 字典，见 SITE_SPECS）定义：列表页 URL 模板、文章链接/ID 正则、
+    发布时间/标题/作者/正文选择器和页面编码。选择器与正则在 make_site_adapter() 中只编译一次，
+    存为类属性；新增站点只需添加一份描述，不必再写爬虫类。
+    需要特殊处理的站点仍可继承生成的类并覆盖对应方法。
+    """
+
+    SITE: Dict = {}
+    BASE_URL = ''
+    LIST_URL_TEMPLATE = ''
+    LINK_PATTERN = None
+    ARTICLE_ID_PATTERN = None
+    TIME_PATTERN = None
+    TIME_SELECTORS: List[Tuple[str, Dict]] = []
+    TITLE_SELECTORS: List[Tuple[str, Dict]] = []
+    AUTHOR_SELECTORS: List[Tuple[str, Dict]] = []
+    CONTENT_SELECTORS: List[Tuple[str, Dict]] = []
+
+    @classmethod
+    def _is_article_href(cls, href: str) -> bool:
+        """匹配文章详情页链接"""
+        return bool(href) and bool(cls.LINK_PATTERN.search(href))
+
+    def canonical_key(self, url: str) -> str:
+        """按文章 ID 归一（同一篇文章的不同 URL 写法映射到同一个键）"""
+        match = self.ARTICLE_ID_PATTERN.search(url) if self.ARTICLE_ID_PATTERN else None
+        if match:
+            article_id = next((group for group in match.groups() if group), match.group())
+            return f"{self.SITE['id']}:{article_id}"
+        return super().canonical_key(url)
+
+    def absolute_url(self, href: str) -> str:
+        """处理相对路径"""
+        if href.startswith('//'):
+            return urlparse(self.BASE_URL).scheme + ':' + href
+        if href.startswith('/'):
+            return self.BASE_URL + href
+        if not href.startswith('http'):
+            return self.BASE_URL + '/' + href
+        return href
 
+    @staticmethod
+    def _find_first(soup, selectors: List[Tuple[str, Dict]]):
+        """按顺序尝试选择器，返回第一个找到的元素"""
+        for tag, attrs in selectors:
+            element = soup.find(tag, attrs)
+            if element:
+                return element
+        return None
+
+    def get_article_candidates(self, page: int) -> Generator[Dict, None, None]:
+        """
+        从列表页获取文章候选（URL + 列表页上的标题/发布时间）
+
+        Raises:
+            ListPageError: 列表页请求失败
+        """
+        url = self.LIST_URL_TEMPLATE.format(page=page)
         logger.info(f"正在访问列表页 (第 {page} 页): {url}")
 
-        response = self.request(url)
+        response = self.request(url, kind='list')
         if not response:
-            return
-
-        soup = BeautifulSoup(response.text, 'lxml')
+            raise ListPageError(f"第 {page} 页列表页请求失败: {url}")
 
-        # 查找文章链接，使用集合去重
-        seen_urls = set()
+        soup = parse_html(response.text)
 
-        # 外设天下的文章链接特征: /p-{id}-1 格式
+        # 查找文章链接，按规范化键去重（同一文章可能有图片链接和标题链接，URL 写法也可能不同）
+        candidates = {}
         for link in soup.find_all('a', href=True):
             href = link.get('href')
 
-            # 匹配文章详情页链接 pattern: /p-数字-1
-            if href and href.startswith('/p-') and href.endswith('-1'):
-                # 进一步验证格式: /p-{数字}-1
-                if re.match(r'^/p-\d+-1$', href):
-                    # 处理相对路径
-                    if href.startswith('/'):
-                        full_url = self.BASE_URL + href
-                    elif not href.startswith('http'):
-                        full_url = self.BASE_URL + '/' + href
-                    else:
-                        full_url = href
+            if self._is_article_href(href):
+                full_url = self.absolute_url(href)
+
+                candidate = candidates.setdefault(self.canonical_key(full_url),
+                                                  {'url': full_url, 'title': '', 'publish_time': None})
+                if not candidate['title']:
+                    candidate['title'] = link.get_text(strip=True)
+                if not candidate['publish_time']:
+                    candidate['publish_time'] = self._list_link_date(link, self._is_article_href)
+
+        yield from candidates.values()
+
+    def get_article_urls(self, page: int) -> Generator[str, None, None]:
+        """从列表页获取文章链接"""
+        for candidate in self.get_article_candidates(page):
+            yield candidate['url']
 
-                    # 去重：只保留唯一的URL
-                    if full_url not in seen_urls:
-                        seen_urls.add(full_url)
-                        yield full_url
+    def extract_publish_time(self, soup) -> Optional[datetime]:
+        """
+        从详情页提取发布时间
+
+        配置了 time_pattern 时，依次尝试时间选择器，取第一个文本中含日期的元素；
+        否则取第一个存在的元素，整段文本按日期解析。
+        """
+        if self.TIME_PATTERN is None:
+            time_element = self._find_first(soup, self.TIME_SELECTORS)
+            if time_element:
+                return self.parse_date(time_element.get_text(strip=True))
+            return None
 
-        self.random_delay()
+        for tag, attrs in self.TIME_SELECTORS:
+            time_element = soup.find(tag, attrs)
+            if time_element:
+                date_match = self.TIME_PATTERN.search(time_element.get_text(strip=True))
+                if date_match:
+                    return self.parse_date(date_match.group())
+        return None
 
     def parse_article(self, url: str) -> Optional[Dict]:
         """解析文章详情页"""
         response = self.request(url)
         if not response:
             return None
+        return self.parse_article_html(url, response.text)
 
-        soup = BeautifulSoup(response.text, 'lxml')
+    def parse_article_html(self, url: str, html: str) -> Optional[Dict]:
+        """从详情页 HTML 提取文章（不发请求，可交给解析进程执行，见 ParserPool）"""
+        soup = parse_html(html)
 
         try:
-            # 提取发布时间 - 必须从详情页获取
-            publish_time = None
-
-            # 尝试多种时间定位方式
-            # 外设天下的时间在 <span class="author"> 中，格式：作者：xxx|发布时间：2026-01-21 10:03:37
-            time_selectors = [
-                ('span', {'class': 'author'}),  # 外设天下专用
-                ('div', {'class': 'artTime'}),   # 备用：父容器
-                ('span', {'class': 'info'}),
-                ('span', {'class': 'property'}),
-                ('div', {'class': 'info'}),
-                ('div', {'class': 'property'}),
-                ('p', {'class': 'info'}),
-            ]
-
-            for tag, attrs in time_selectors:
-                time_elem = soup.find(tag, attrs)
-                if time_elem:
-                    time_text = time_elem.get_text(strip=True)
-                    # 提取日期时间部分 (支持格式：2026-01-21 10:03:37)
-                    date_match = re.search(r'\d{4}[-/]\d{1,2}[-/]\d{1,2}(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?', time_text)
-                    if date_match:
-                        publish_time = self.parse_date(date_match.group())
-                        break
+            # 提取发布时间
+            publish_time = self.extract_publish_time(soup)
 
             if not publish_time:
                 logger.warning(f"无法提取发布时间: {url}")
@@ -358,22 +1524,18 @@ class WstxSpider(BaseSpider):
 
             # 提取标题
             title = ''
-            title_elem = soup.find('h1') or soup.find('h2') or soup.find('title')
+            title_elem = self._find_first(soup, self.TITLE_SELECTORS)
             if title_elem:
                 title = title_elem.get_text(strip=True)
 
             # 提取作者
             author = ''
-            author_elem = soup.find('a', href=lambda x: x and 'uid=' in x) or \
-                         soup.find('span', class_='author')
+            author_elem = self._find_first(soup, self.AUTHOR_SELECTORS)
             if author_elem:
                 author = author_elem.get_text(strip=True)
 
             # 提取正文内容
-            content_elem = soup.find('div', class_='articleNr') or \
-                          soup.find('div', class_='content') or \
-                          soup.find('div', id='content') or \
-                          soup.find('div', class_='article-content')
+            content_elem = self._find_first(soup, self.CONTENT_SELECTORS)
 
             content_text = ''
             content_html = ''
@@ -391,14 +1553,12 @@ class WstxSpider(BaseSpider):
                 if first_img:
                     img_src = first_img.get('src')
                     if img_src:
-                        if img_src.startswith('//'):
-                            img_src = 'https:' + img_src
-                        elif img_src.startswith('/'):
-                            img_src = self.BASE_URL + img_src
+                        if img_src.startswith('//') or img_src.startswith('/'):
+                            img_src = self.absolute_url(img_src)
                         images.append(img_src)
 
             data = {
-                'source': '外设天下',
+                'source': self.SITE['name'],
                 'title': title,
                 'publish_date': publish_time.strftime('%Y-%m-%d %H:%M:%S'),
                 'url': url,
@@ -416,6 +1576,112 @@ class WstxSpider(BaseSpider):
             logger.error(f"错误: {e}")
             return None
 
+    def parser_spec(self) -> Optional[Dict]:
+        """
+        在解析进程中重建本爬虫解析逻辑所需的参数（可 pickle）
+
+        解析进程按站点描述重新生成爬虫类，因此子类或实例覆盖了 parse_article 或解析相关方法时返回 None，
+        只能在抓取线程中解析。
+        """
+        for name in _WORKER_PARSE_METHODS:
+            if name in self.__dict__ or getattr(type(self), name) is not getattr(SiteAdapter, name):
+                return None
+        return {
+            'site': self.SITE,
+            'base_url': self.BASE_URL,
+            'target_date': self.target_date,
+            'oldest_date': self.oldest_date,
+            'fast_parse': config.SPIDER_FAST_PARSE,
+        }
+
+
+# 解析进程中执行的方法（及调用它们的 parse_article）；爬虫覆盖其中任何一个都不能交给解析进程
+_WORKER_PARSE_METHODS = ('parse_article', 'parse_article_html', 'extract_publish_time', 'compare_date',
+                         'parse_date', 'absolute_url', '_find_first')
+
+
+def make_site_adapter(site: Dict) -> type:
+    """
+    根据站点描述生成 SiteAdapter 子类（选择器、正则在此编译一次）
+
+    站点描述字段：
+        id: 站点标识（类名、URL 规范化键前缀），如 'wstx'
+        name: 站点名称（文章 source 字段、日志、检查点）
+        base_url: 站点根地址
+        list_url: 列表页路径模板，含 {page}
+        link_pattern: 文章链接正则（re.search 匹配 href）
+        article_id: 文章 ID 正则（第一个非空分组为 ID，用于 URL 去重），可选
+        time_selectors / title_selectors / author_selectors / content_selectors: 选择器列表，按顺序尝试
+        time_pattern: 时间元素文本中的日期正则，可选（见 SiteAdapter.extract_publish_time）
+        encoding: 页面编码，可选；未指定时每个主机只检测一次并缓存
+    """
+    missing = [field for field in ('id', 'name', 'base_url', 'list_url', 'link_pattern') if not site.get(field)]
+    if missing:
+        raise ValueError(f"站点描述缺少字段 {missing}: {site.get('name') or site.get('id')}")
+
+    base_url = site['base_url'].rstrip('/')
+    attrs = {
+        '__doc__': f"{site['name']} 爬虫（由站点描述生成）",
+        'SITE': dict(site),
+        'BASE_URL': base_url,
+        'LIST_URL_TEMPLATE': base_url + site['list_url'],
+        'ENCODING': site.get('encoding'),
+        'LINK_PATTERN': re.compile(site['link_pattern']),
+        'ARTICLE_ID_PATTERN': re.compile(site['article_id']) if site.get('article_id') else None,
+        'TIME_PATTERN': re.compile(site['time_pattern']) if site.get('time_pattern') else None,
+    }
+    for field in ('time', 'title', 'author', 'content'):
+        attrs[f'{field.upper()}_SELECTORS'] = [compile_selector(s) for s in site.get(f'{field}_selectors', [])]
+
+    return type(f"{site['id'].title().replace('_', '')}Spider", (SiteAdapter,), attrs)
+
+
+# 内置站点描述（额外站点可通过 SPIDER_SITES_FILE 配置，无需新增代码）
+SITE_SPECS = [
+    {
+        'id': 'inwaishe',
+        'name': 'in外设',
+        'base_url': 'http://www.inwaishe.com',
+        'list_url': '/portal.php?mod=list&catid=1&page={page}',
+        'link_pattern': r'article-|portal\.php\?mod=view&aid=',
+        # article-123-1.html 与 portal.php?mod=view&aid=123 是同一篇文章
+        'article_id': r'article-(\d+)-\d+\.html|[?&]aid=(\d+)',
+        'time_selectors': ['span.xg1', 'em.xg1'],
+        'title_selectors': ['h1', 'h2.ph', 'title'],
+        'author_selectors': ['a.xw1', 'a[href*=uid=]'],
+        'content_selectors': ['td[id^=article_content]', 'div.d', 'div.content'],
+    },
+    {
+        'id': 'wstx',
+        'name': '外设天下',
+        'base_url': 'https://www.wstx.com',
+        # 正确的URL模式：https://www.wstx.com/news/1, /news/2, /news/3...
+        'list_url': '/news/{page}',
+        'link_pattern': r'^/p-\d+-1\Z',
+        'article_id': r'/p-(\d+)-\d+',
+        # 外设天下的时间在 <span class="author"> 中，格式：作者：xxx|发布时间：2026-01-21 10:03:37
+        'time_selectors': ['span.author', 'div.artTime', 'span.info', 'span.property',
+                           'div.info', 'div.property', 'p.info'],
+        'time_pattern': r'\d{4}[-/]\d{1,2}[-/]\d{1,2}(?:\s+\d{1,2}:\d{1,2}(?::\d{1,2})?)?',
+        'title_selectors': ['h1', 'h2', 'title'],
+        'author_selectors': ['a[href*=uid=]', 'span.author'],
+        'content_selectors': ['div.articleNr', 'div.content', 'div#content', 'div.article-content'],
+    },
+]
+
+
+def load_site_specs(path: str) -> List[Dict]:
+    """读取站点描述文件（JSON 数组，字段见 make_site_adapter）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise ValueError(f"站点描述文件应为 JSON 数组: {path}")
+    return specs
+
+
+InwaisheSpider = make_site_adapter(SITE_SPECS[0])
+WstxSpider = make_site_adapter(SITE_SPECS[1])
+
 
 class DataExporter:
     """数据导出器"""
@@ -424,23 +1690,92 @@ class DataExporter:
         self.output_dir = Path(config.OUTPUT_DIR)
         self.output_dir.mkdir(exist_ok=True)
 
-    def export_to_excel(self, data: List[Dict], filename: str = None):
-        """导出到 Excel"""
+    # 文章表的列顺序：正文列（内联正文 / 内容存储引用）位于作者与图片之间
+    COLUMNS = ['source', 'title', 'publish_date', 'url', 'author', 'content_text', 'content_html', 'images']
+    REF_COLUMNS = ['content_text_ref', 'content_html_ref']
+    # Excel 摘要中保留的正文开头字数
+    EXCEL_EXCERPT_CHARS = 200
+
+    @classmethod
+    def _table_columns(cls, columns) -> List[str]:
+        """文章表的列；有正文引用列时只保留实际存在的内联正文列"""
+        if 'content_text_ref' not in columns:
+            return list(cls.COLUMNS)
+        inline = [column for column in ('content_text', 'content_html') if column in columns]
+        return cls.COLUMNS[:5] + inline + cls.REF_COLUMNS + ['images']
+
+    def export_tables(self, data: List[Dict], excel_filename: str = None, parquet_filename: str = None):
+        """
+        导出表格文件：Parquet（完整数据，供 ETL 读取）与 Excel 摘要，分别由 EXPORT_PARQUET / EXPORT_EXCEL 控制
+
+        parquet_filename 为 None 时与 Excel 同名（扩展名 .parquet），两者都未指定时使用 config 中的文件名。
+        """
+        if parquet_filename is None:
+            parquet_filename = Path(excel_filename).with_suffix('.parquet').name if excel_filename \
+                else config.OUTPUT_PARQUET
+        if config.EXPORT_PARQUET:
+            self.export_to_parquet(data, parquet_filename)
+        if config.EXPORT_EXCEL:
+            self.export_to_excel(data, excel_filename)
+
+    def export_to_parquet(self, data: List[Dict], filename: str = None) -> Optional[Path]:
+        """
+        导出到 Parquet（列式存储，zstd 压缩）
+
+        保留全部字段，DataCleaner 只读取清洗用到的列；未安装 pyarrow 时跳过并返回 None。
+        """
+        if pyarrow is None:
+            logger.warning("未安装 pyarrow，跳过 Parquet 导出（pip install pyarrow）")
+            return None
         if not filename:
-            filename = config.OUTPUT_EXCEL
+            filename = config.OUTPUT_PARQUET
 
         filepath = self.output_dir / filename
-
         df = pd.DataFrame(data)
+        df = df.reindex(columns=self._table_columns(df.columns), fill_value='')
+        df.to_parquet(filepath, index=False, compression='zstd')
+        logger.info(f"数据已导出到: {filepath}")
+        return filepath
 
-        # 重新排列列顺序
-        columns_order = ['source', 'title', 'publish_date', 'url', 'author',
-                        'content_text', 'content_html', 'images']
-        df = df.reindex(columns=columns_order, fill_value='')
+    def export_to_excel(self, data: Iterable[Dict], filename: str = None):
+        """
+        导出 Excel 摘要表
+
+        每篇文章一行：来源、标题、发布时间、链接、作者、正文开头（excerpt）、图片，
+        正文在内容存储中时附带引用列；完整正文见 JSON / Parquet（Excel 单元格最多 32767 字符）。
+        用 openpyxl 只写模式逐行写出，data 可以是生成器。
+        """
+        if not filename:
+            filename = config.OUTPUT_EXCEL
 
-        df.to_excel(filepath, index=False, engine='openpyxl')
+        filepath = self.output_dir / filename
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Sheet1')
+
+        count = 0
+        columns = None
+        for article in data:
+            if columns is None:
+                columns = ['source', 'title', 'publish_date', 'url', 'author', 'excerpt'] + \
+                          (self.REF_COLUMNS if 'content_text_ref' in article else []) + ['images']
+                sheet.append(columns)
+            row = dict(article, excerpt=load_body(article, 'content_text')[:self.EXCEL_EXCERPT_CHARS])
+            values = []
+            for column in columns:
+                value = row.get(column, '')
+                if isinstance(value, (list, dict)):
+                    value = str(value)
+                elif isinstance(value, str):
+                    value = ILLEGAL_CHARACTERS_RE.sub('', value)
+                values.append(value)
+            sheet.append(values)
+            count += 1
+        if columns is None:
+            sheet.append(['source', 'title', 'publish_date', 'url', 'author', 'excerpt', 'images'])
+
+        workbook.save(filepath)
         logger.info(f"数据已导出到: {filepath}")
-        logger.info(f"共导出 {len(data)} 条记录")
+        logger.info(f"共导出 {count} 条记录")
 
     def export_to_json(self, data: List[Dict], filename: str = None):
         """导出到 JSON"""
@@ -449,110 +1784,1096 @@ class DataExporter:
 
         filepath = self.output_dir / filename
 
-        import json
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
         logger.info(f"数据已导出到: {filepath}")
 
+    def merge_into_json(self, data: List[Dict], filename: str = None) -> List[Dict]:
+        """
+        把增量抓取的新文章合并进已有的 JSON 数据集（按 URL 去重，新文章在前）
 
-def run_spider(spider_class, spider_name: str, max_pages: int = 50):
-    """运行爬虫"""
-    logger.info(f"\n{'='*60}")
-    logger.info(f"开始抓取: {spider_name}")
-    logger.info(f"目标月份: {config.TARGET_YEAR}-{config.TARGET_MONTH:02d}")
-    logger.info(f"{'='*60}\n")
+        Returns:
+            List[Dict]: 合并后的完整数据
+        """
+        if not filename:
+            filename = config.OUTPUT_JSON
 
-    spider = spider_class()
-    all_data = []
+        filepath = self.output_dir / filename
+        existing = []
+        if filepath.exists():
+            with open(filepath, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+
+        new_urls = {article['url'] for article in data}
+        merged = data + [article for article in existing if article.get('url') not in new_urls]
+        self.export_to_json(merged, filename)
+        logger.info(f"增量合并: 新增 {len(data)} 条，已有 {len(existing)} 条，合并后 {len(merged)} 条")
+
+        return merged
+
+    def export_jsonl(self, jsonl_path: Path, json_filename: str = None, excel_filename: str = None) -> int:
+        """
+        由流式导出的 JSONL 生成 JSON、Parquet 与 Excel 摘要
 
-    for page in range(1, max_pages + 1):
-        logger.info(f"\n--- 第 {page} 页 ---")
+        JSON 与 Excel 摘要逐条写出（JSON 输出与 export_to_json 一致），不把整个文件读入内存；
+        Parquet 需要整表，仍一次性载入。
+
+        Returns:
+            int: 文章条数
+        """
+        if not json_filename:
+            json_filename = config.OUTPUT_JSON
+
+        filepath = self.output_dir / json_filename
+        count = 0
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for article in iter_jsonl(jsonl_path):
+                item = json.dumps(article, ensure_ascii=False, indent=2)
+                f.write(',\n' if count else '\n')
+                f.write('\n'.join('  ' + line for line in item.splitlines()))
+                count += 1
+            f.write('\n]' if count else ']')
+
+        logger.info(f"数据已导出到: {filepath}")
+
+        if count:
+            if config.EXPORT_PARQUET:
+                parquet_filename = Path(excel_filename).with_suffix('.parquet').name if excel_filename else None
+                self.export_to_parquet(list(iter_jsonl(jsonl_path)), parquet_filename)
+            if config.EXPORT_EXCEL:
+                self.export_to_excel(iter_jsonl(jsonl_path), excel_filename)
+
+        return count
+
+
+def iter_jsonl(path) -> Generator[Dict, None, None]:
+    """逐行读取 JSONL 文件；崩溃时写了一半的行会被跳过"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"跳过不完整的 JSONL 行: {path}:{line_no}")
+
+
+def _article_summary(article: Dict) -> Dict:
+    """文章摘要（不含正文），流式导出时代替完整文章留在内存中"""
+    return {key: article.get(key) for key in ('source', 'title', 'publish_date', 'url')}
 
-        # 获取该页的所有文章链接
-        article_urls = list(spider.get_article_urls(page))
 
-        if not article_urls:
-            logger.warning(f"第 {page} 页没有找到文章链接")
-            continue
+class JsonlExporter:
+    """
+    流式 JSONL 导出器
+
+    每解析完一篇文章就追加一行到所属月份的 report_data_YYYY_MM.jsonl：
+    抓取中途崩溃时已写入的文章不会丢失，内存中也不必保留全部正文。
+    每行写入后 flush 到操作系统，每 fsync_every 篇 fsync 一次落盘。
+
+    append=True 时沿用已有文件（用于增量抓取和续抓）：截掉崩溃时写了一半的末行，
+    已写入的文章记入 written，不再重复写入，抓取引擎也据此跳过其详情页请求。
+    多个站点线程共用同一个实例。
+    """
+
+    def __init__(self, months: List[Tuple[int, int]], output_dir: str = None, append: bool = False,
+                 fsync_every: int = None):
+        """
+        Args:
+            months: 目标月份 [(year, month), ...]，不属于这些月份的文章不写入
+            output_dir: 输出目录，None 则使用 config.OUTPUT_DIR
+            append: 沿用已有文件（否则清空重写）
+            fsync_every: 每写入多少篇 fsync 一次，None 则使用 config.SPIDER_JSONL_FSYNC_EVERY
+        """
+        self.output_dir = Path(output_dir or config.OUTPUT_DIR)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.months = set(months)
+        self.fsync_every = max(1, fsync_every or config.SPIDER_JSONL_FSYNC_EVERY)
+        self._lock = threading.Lock()
+        self._files = {}
+        self._unsynced = 0
+        self._closed = False
+        # 已写入的文章 {url: 摘要}，以及本次运行新写入的篇数
+        self.written: Dict[str, Dict] = {}
+        self.appended = 0
+
+        for year, month in sorted(self.months):
+            path = self.path_for(year, month)
+            if not append:
+                path.write_text('', encoding='utf-8')
+                continue
+            if not path.exists():
+                # 首次流式导出时沿用该月已有的 JSON 数据集
+                json_path = path.with_suffix('.json')
+                if json_path.exists():
+                    with open(json_path, 'r', encoding='utf-8') as f:
+                        existing = json.load(f)
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.writelines(json.dumps(article, ensure_ascii=False) + '\n' for article in existing)
+                continue
+            self._truncate_partial_line(path)
+            for article in iter_jsonl(path):
+                self.written[article['url']] = _article_summary(article)
+
+        if self.written:
+            logger.info(f"[流式导出] 沿用已写入的 {len(self.written)} 篇文章")
+
+    def path_for(self, year: int, month: int) -> Path:
+        return self.output_dir / f'report_data_{year}_{month:02d}.jsonl'
+
+    @staticmethod
+    def _truncate_partial_line(path: Path):
+        """截掉文件末尾不完整的一行（崩溃时写了一半）"""
+        with open(path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                step = min(65536, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step)
+                if position + step == end and block.endswith(b'\n'):
+                    return
+                index = block.rfind(b'\n')
+                if index >= 0:
+                    f.truncate(position + index + 1)
+                    logger.warning(f"[流式导出] 已截掉不完整的末行: {path}")
+                    return
+            f.truncate(0)
+
+    def write(self, article: Dict) -> bool:
+        """追加一篇文章；已写入过或不属于目标月份时返回 False"""
+        key = (int(article['publish_date'][:4]), int(article['publish_date'][5:7]))
+        if key not in self.months:
+            return False
+        line = json.dumps(article, ensure_ascii=False) + '\n'
+
+        with self._lock:
+            if self._closed or article['url'] in self.written:
+                return False
+            f = self._files.get(key)
+            if f is None:
+                f = open(self.path_for(*key), 'a', encoding='utf-8')
+                self._files[key] = f
+            f.write(line)
+            f.flush()
+            self.written[article['url']] = _article_summary(article)
+            self.appended += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync_locked()
+        return True
+
+    def _sync_locked(self):
+        for f in self._files.values():
+            os.fsync(f.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """落盘并关闭所有文件"""
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+            self._closed = True
+
+
+class PageLocator:
+    """
+    列表页页码定位器（回填历史月份用）
+
+    列表页按发布时间倒序排列，"该页是否已到达目标月份"、"该页是否已越过目标月份"
+    都随页码单调变化。先按 1, 2, 4, 8... 指数探测找到越界的页，再在区间内二分，
+    用 O(log N) 次列表页请求定位目标月份的首页与末页，抓取时只访问这一范围。
+    每页的日期范围取列表页上显示的发布时间；列表页没有日期时，请求该页首尾两篇文章的详情页。
+    """
 
-        logger.info(f"找到 {len(article_urls)} 个链接")
+    def __init__(self, spider: BaseSpider, max_page: int = None):
+        """
+        Args:
+            spider: 爬虫实例（目标月份范围取自 spider.oldest_date ~ spider.target_date）
+            max_page: 探测的最大页码，None 则使用 config.SPIDER_LOCATE_MAX_PAGE
+        """
+        self.spider = spider
+        self.max_page = max(1, max_page or config.SPIDER_LOCATE_MAX_PAGE)
+        target = spider.target_date
+        self.month_start = spider.oldest_date
+        self.next_month = datetime(target.year + (target.month == 12), target.month % 12 + 1, 1)
+        # 定位过程中请求的列表页数
+        self.probes = 0
+        self._pages: Dict[int, Optional[Tuple[datetime, datetime]]] = {}
 
-        # 逐个访问详情页
-        stop_signal = False
-        for url in article_urls:
-            spider.random_delay()
+    @staticmethod
+    def enabled_for(year: int, month: int) -> bool:
+        """按 config.SPIDER_LOCATE_PAGES 判断该目标月份是否启用页码定位"""
+        mode = config.SPIDER_LOCATE_PAGES
+        if mode in ('true', '1', 'yes'):
+            return True
+        if mode != 'auto':
+            return False
+        # auto：本月和上个月的文章都在前几页，直接从第 1 页抓取更省事
+        now = datetime.now()
+        return (year, month) < ((now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12))
+
+    def page_dates(self, page: int) -> Optional[Tuple[datetime, datetime]]:
+        """
+        返回该列表页的 (最新, 最早) 发布时间；页面没有文章（已超出最后一页）时返回 None
 
-            result = spider.parse_article(url)
+        Raises:
+            ValueError: 页面有文章但无法确定任何发布时间
+            ListPageError: 列表页请求失败（不能当作已超出最后一页）
+        """
+        if page not in self._pages:
+            self.probes += 1
+            candidates = list(self.spider.get_article_candidates(page))
+            dates = [candidate['publish_time'] for candidate in candidates if candidate.get('publish_time')]
+            if candidates and not dates:
+                for candidate in {candidates[0]['url']: candidates[0], candidates[-1]['url']: candidates[-1]}.values():
+                    publish_time = self.spider.article_publish_time(candidate['url'])
+                    if publish_time:
+                        dates.append(publish_time)
+                if not dates:
+                    raise ValueError(f"无法确定第 {page} 页的发布时间")
+            self._pages[page] = (max(dates), min(dates)) if dates else None
+            if dates:
+                logger.debug(f"[页码定位] 第 {page} 页: {min(dates):%Y-%m-%d} ~ {max(dates):%Y-%m-%d}")
+        return self._pages[page]
+
+    def _reached(self, page: int) -> bool:
+        """该页是否已到达目标月份（含有不晚于目标月份的文章，或已超出最后一页）"""
+        dates = self.page_dates(page)
+        return dates is None or dates[1] < self.next_month
+
+    def _passed(self, page: int) -> bool:
+        """该页是否已越过目标月份（全部文章早于目标月份，或已超出最后一页）"""
+        dates = self.page_dates(page)
+        return dates is None or dates[0] < self.month_start
+
+    def _first_page_where(self, predicate, after: int = 0) -> int:
+        """
+        查找 after 之后第一个满足单调条件的页码；max_page 内都不满足时返回 max_page + 1
 
-            if result == 'STOP':
-                # 遇到早于目标月份的文章，停止整个爬虫
-                logger.info(f"收到停止信号，结束抓取")
-                stop_signal = True
+        先以 after+1, after+2, after+4... 指数探测出区间，再在区间内二分。
+        """
+        low, step = after, 1
+        while True:
+            page = min(after + step, self.max_page)
+            if predicate(page):
+                high = page
                 break
-            elif result:
-                all_data.append(result)
+            low = page
+            if page >= self.max_page:
+                return self.max_page + 1
+            step *= 2
+
+        # 不变式：low 不满足（或为起点），high 满足
+        while high - low > 1:
+            middle = (low + high) // 2
+            if predicate(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def locate(self) -> Optional[Tuple[int, int]]:
+        """
+        定位目标月份所在的列表页范围
+
+        Returns:
+            (首页, 末页)；无法定位（页面缺少日期、列表页请求失败、目标月份超出探测范围）时返回 None
+        """
+        try:
+            first = self._first_page_where(self._reached)
+            if first > self.max_page:
+                logger.warning(f"[页码定位] 前 {self.max_page} 页均晚于目标月份")
+                return None
+            last = self._first_page_where(self._passed, after=first - 1) - 1
+        except (ValueError, ListPageError) as e:
+            logger.warning(f"[页码定位] {e}")
+            return None
+
+        # 首页已越过目标月份说明该月没有文章，仍抓取这一页以确认
+        return first, min(max(first, last), self.max_page)
+
+
+class UrlFrontier:
+    """
+    单次抓取范围内的文章 URL 去重表（frontier）
+
+    以爬虫的 canonical_key() 为键，保证一次运行中每篇文章的详情页最多请求一次：
+    置顶/推荐文章在多个列表页重复出现、同一文章的不同 URL 写法都只抓取第一次出现的那个。
+    同时统计列表页链接的重复率。
+    """
+
+    def __init__(self, key_func):
+        """
+        Args:
+            key_func: URL → 规范化键（通常为 spider.canonical_key）
+        """
+        self.key_func = key_func
+        self._lock = threading.Lock()
+        self._seen: Dict[str, str] = {}
+        self.offered = 0
+        self.duplicates = 0
+
+    def claim(self, url: str) -> bool:
+        """登记一个 URL；首次出现返回 True，重复（含其他写法）返回 False"""
+        key = self.key_func(url)
+        with self._lock:
+            self.offered += 1
+            if key in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen[key] = url
+            return True
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.offered if self.offered else 0.0
+
+    def log_stats(self, site: str):
+        """输出去重统计"""
+        logger.info(f"[URL 去重] {site}: 列表页文章链接 {self.offered} 个，跨页重复 {self.duplicates} 个"
+                    f"（重复率 {self.duplicate_rate:.1%}），不同文章 {len(self._seen)} 篇")
+
+
+# 解析进程中缓存的爬虫实例 {(站点 id, base_url): 实例}
+_worker_spiders: Dict[Tuple[str, str], 'SiteAdapter'] = {}
+
+
+class _ParserProcess(multiprocessing.get_context('spawn').Process):
+    """解析进程：进程名带 PARSER_PROCESS_PREFIX 前缀，供重新导入本模块时识别（见 in_parser_worker）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = f'{PARSER_PROCESS_PREFIX}-{self.name}'
+
+
+class _ParserContext(type(multiprocessing.get_context('spawn'))):
+    """以 spawn 方式启动 _ParserProcess 的多进程上下文"""
+    Process = _ParserProcess
+
+
+def _init_parser_worker(log_level: int):
+    """解析进程初始化：日志级别与主进程一致"""
+    logger.setLevel(log_level)
+
+
+def _parse_article_in_worker(spec: Dict, url: str, html: str) -> Optional[Dict]:
+    """解析进程入口：按 parser_spec() 重建爬虫并解析详情页 HTML"""
+    key = (spec['site']['id'], spec['base_url'])
+    instance = _worker_spiders.get(key)
+    if instance is None:
+        spider_class = make_site_adapter(dict(spec['site'], base_url=spec['base_url']))
+        # 只做解析，不需要会话、限速器、HTTP 缓存，跳过 BaseSpider.__init__
+        instance = spider_class.__new__(spider_class)
+        _worker_spiders[key] = instance
+    instance.target_date = spec['target_date']
+    instance.oldest_date = spec['oldest_date']
+    config.SPIDER_FAST_PARSE = spec['fast_parse']
+    return instance.parse_article_html(url, html)
+
+
+class ParserPool:
+    """
+    HTML 解析进程池
+
+    抓取并发后，parse_article 中的解析（CPU 密集）受 GIL 限制只能用满一个核。
+    启用后网络请求仍在线程 / 事件循环中并发执行，详情页 HTML 交给 ProcessPoolExecutor 中的解析进程，
+    抓取引擎按列表页顺序等待结果，输出顺序不变。
+    爬虫不支持进程解析（parser_spec() 返回 None）时抓取引擎照常在线程中调用 parse_article；
+    进程池异常时退回本进程线程中解析。
+    """
+
+    def __init__(self, workers: int = None):
+        """
+        Args:
+            workers: 解析进程数，None 则使用 config.SPIDER_PARSE_WORKERS
+        """
+        self.workers = max(1, workers or config.SPIDER_PARSE_WORKERS)
+        # 抓取线程运行时 fork 不安全，用 spawn 启动解析进程
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=_ParserContext(),
+                                             initializer=_init_parser_worker, initargs=(logger.level,))
+        self._lock = threading.Lock()
+        self.stats = {'pooled': 0, 'local': 0}
+
+    def submit(self, spec: Dict, url: str, html: str) -> Future:
+        """提交一篇详情页到解析进程（spec 为爬虫的 parser_spec()）"""
+        with self._lock:
+            self.stats['pooled'] += 1
+        return self._executor.submit(_parse_article_in_worker, spec, url, html)
+
+    async def parse_article(self, spider: 'SiteAdapter', spec: Dict, url: str, html: str) -> Optional[Dict]:
+        """协程版解析入口，供抓取引擎调用（spec 为 spider.parser_spec()）"""
+        try:
+            return await asyncio.wrap_future(self.submit(spec, url, html))
+        except BrokenProcessPool as e:
+            logger.warning(f"解析进程异常，改在本进程解析: {e}")
+        with self._lock:
+            self.stats['local'] += 1
+        return await asyncio.to_thread(spider.parse_article_html, url, html)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def log_stats(self):
+        """输出解析进程池统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(f"[解析进程池] {self.workers} 个进程，进程内解析 {stats['pooled']} 篇，本进程解析 {stats['local']} 篇")
+
+
+# 全局共享的解析进程池（单例模式）
+_parser_pool_instance = None
+_parser_pool_lock = threading.Lock()
+
+
+def get_parser_pool() -> Optional[ParserPool]:
+    """获取全局解析进程池单例；SPIDER_PARSE_WORKERS <= 0 时返回 None（在抓取线程中解析）"""
+    global _parser_pool_instance
+    if config.SPIDER_PARSE_WORKERS <= 0:
+        return None
+    with _parser_pool_lock:
+        if _parser_pool_instance is None:
+            _parser_pool_instance = ParserPool()
+        return _parser_pool_instance
+
+
+def shutdown_parser_pool():
+    """关闭全局解析进程池（修改 SPIDER_PARSE_WORKERS 后调用，下次使用时按新配置重建）"""
+    global _parser_pool_instance
+    with _parser_pool_lock:
+        if _parser_pool_instance is not None:
+            _parser_pool_instance.shutdown()
+            _parser_pool_instance = None
+
+
+class _HostGate:
+    """可动态调整上限的异步并发闸门（上限由回调函数实时给出）"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < max(1, self.limit()))
+            self.active += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class AsyncCrawlEngine:
+    """
+    异步抓取引擎
+
+    列表页仍按页顺序访问；列表页上能看到发布时间的文章先按日期筛选，
+    目标月份之外的不再请求详情页。同一列表页中的详情页在事件循环中并发抓取，
+    并发数由每个主机一个的并发闸门限制（并发数为 1 时即逐篇顺序抓取；
+    启用 AutoThrottle 时上限随服务端表现动态调整）。
+    BaseSpider 的 request / parse_article 是同步实现，这里通过 asyncio.to_thread
+    放入线程执行，爬虫子类无需改动。启用解析进程池（SPIDER_PARSE_WORKERS）时，
+    线程中只发请求，详情页 HTML 交给 ParserPool 解析。
+    返回结果与顺序抓取一致：按列表页中的链接顺序排列，遇到 'STOP' 即截断。
+    """
+
+    def __init__(self, spider: BaseSpider, concurrency: int = None, deadline: float = None,
+                 high_water: Dict = None, sink: 'JsonlExporter' = None, checkpoint=None,
+                 resume_state: Dict = None, prefetch: int = None, cancel: threading.Event = None):
+        """
+        Args:
+            spider: 爬虫实例
+            concurrency: 单主机详情页并发数（None 则使用 config.SPIDER_CONCURRENCY）
+            deadline: 截止时间（time.monotonic() 时间点），到点后不再发起新请求，返回已采集数据
+            high_water: 增量抓取的高水位线（HighWaterMarkStore.get 的返回值），
+                        已采集的 URL 跳过（置顶文章可能排在新文章之前），遇到更早的文章即停止
+            sink: 流式导出器；文章解析后立即写入，结果列表中只保留摘要（不含正文），
+                  sink 中已写入的文章不再请求详情页
+            checkpoint: 保存进度的回调 checkpoint(state)，state 格式见 CrawlCheckpointStore.get
+            resume_state: 上次中断时保存的进度，从该处继续（需配合 sink，已采集的文章从 sink 取摘要）
+            prefetch: 列表页预取深度（None 则使用 config.SPIDER_LIST_PREFETCH）
+            cancel: 中断标志（如 Ctrl-C）；置位后与超时相同，不再发起新请求，进度留在检查点中
+        """
+        self.spider = spider
+        self.concurrency = max(1, concurrency or config.SPIDER_CONCURRENCY)
+        self.prefetch = max(0, config.SPIDER_LIST_PREFETCH if prefetch is None else prefetch)
+        # 列表页预取统计：发起 / 被使用 / 停止时未使用（尚未开始的已取消）
+        self.prefetch_stats = {'scheduled': 0, 'used': 0, 'unused': 0}
+        self.deadline = deadline
+        self.cancel = cancel
+        self.timed_out = False
+        # 站点熔断导致提前结束（此时 timed_out 也为 True）
+        self.circuit_open = False
+        # 被中断导致提前结束（此时 timed_out 也为 True）
+        self.interrupted = False
+        self._site_host = urlparse(getattr(spider, 'BASE_URL', '')).netloc
+        self.high_water = high_water
+        # 增量模式下已采集的文章（按规范化键比较，不受 URL 写法影响）
+        self._known_keys = {spider.canonical_key(url) for url in high_water['urls']} if high_water else set()
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.resume_state = resume_state
+        # 检查点中的进度
+        self._parsed: List[str] = list(resume_state['parsed']) if resume_state else []
+        self._progress: Dict = {}
+        self.frontier = UrlFrontier(spider.canonical_key)
+        if resume_state:
+            # 中断前已处理过的文章不再重复抓取
+            for url in resume_state['parsed'] + (resume_state['pending'] or []):
+                self.frontier.claim(url)
+        # 凭列表页元数据省下的详情页请求数
+        self.saved_detail_requests = 0
+        self._host_gates: Dict[str, '_HostGate'] = {}
+
+    def _expired(self) -> bool:
+        """检查是否已超过截止时间、被中断或站点已熔断（都按超时处理：停止发起新请求，进度留在检查点中）"""
+        if self.timed_out:
+            return True
+        if self.cancel is not None and self.cancel.is_set():
+            logger.warning("抓取已中断，停止发起新请求")
+            self.interrupted = True
+            self.timed_out = True
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            logger.warning(f"已到达抓取截止时间，停止发起新请求")
+            self.timed_out = True
+        elif self._site_host and self.spider.circuit_breaker.is_open(self._site_host):
+            logger.warning(f"站点 {self._site_host} 已熔断，停止发起新请求")
+            self.circuit_open = True
+            self.timed_out = True
+        return self.timed_out
+
+    def _gate_for(self, url: str) -> '_HostGate':
+        """获取 URL 所属主机的并发闸门"""
+        host = urlparse(url).netloc
+        if host not in self._host_gates:
+            throttle = self.spider.throttle
+            if throttle:
+                # AutoThrottle 模式下并发上限随服务端表现动态变化
+                limit = lambda: min(self.concurrency, throttle.concurrency(host))
+            else:
+                limit = lambda: self.concurrency
+            self._host_gates[host] = _HostGate(limit)
+        return self._host_gates[host]
+
+    def _select_candidates(self, candidates: List[Dict]):
+        """
+        按列表页元数据筛选需要访问详情页的文章
+
+        Returns:
+            (待抓取的 URL 列表, 是否应在本页之后停止)
+        """
+        article_urls = []
+        for index, candidate in enumerate(candidates):
+            url = candidate['url']
+
+            # 增量模式：已采集过的文章不再访问；置顶文章会出现在新文章之前，因此不据此停止，
+            # 停止只看发布时间（列表页日期早于高水位线，或详情页发布时间不晚于高水位线）
+            if self._known_keys and self.spider.canonical_key(url) in self._known_keys:
+                self.saved_detail_requests += 1
+                continue
+
+            # 本次运行中已出现过的文章（置顶/重复/其他 URL 写法）
+            if not self.frontier.claim(url):
+                continue
+
+            publish_time = candidate.get('publish_time')
+            if publish_time:
+                action = self.spider.compare_date(publish_time)
+                if action == 'skip':
+                    self.saved_detail_requests += 1
+                    continue
+                if action == 'stop':
+                    logger.info(f"列表页显示文章早于目标月份，停止抓取: {publish_time}")
+                    self.saved_detail_requests += len(candidates) - index
+                    return article_urls, True
+                # 列表页日期可能只精确到天，只在严格早于高水位线当天时停止
+                if self.high_water and publish_time.strftime('%Y-%m-%d') < self.high_water['publish_date'][:10]:
+                    logger.info(f"列表页显示文章早于高水位线，停止增量抓取: {publish_time}")
+                    self.saved_detail_requests += len(candidates) - index
+                    return article_urls, True
+
+            article_urls.append(url)
+
+        return article_urls, False
+
+    def _below_high_water(self, article: Dict) -> bool:
+        """文章是否已被之前的抓取采集过（不晚于高水位线）"""
+        if not self.high_water:
+            return False
+        mark = self.high_water['publish_date']
+        return article['publish_date'] < mark or \
+            (article['publish_date'] == mark and self.spider.canonical_key(article['url']) in self._known_keys)
+
+    async def _fetch_article(self, url: str):
+        """在主机并发上限内抓取并解析单篇文章"""
+        if self.sink and url in self.sink.written:
+            # 之前的运行已写入，直接使用摘要
+            return dict(self.sink.written[url])
+        parser_pool = get_parser_pool()
+        spec = self.spider.parser_spec() if parser_pool and hasattr(self.spider, 'parser_spec') else None
+
+        def fetch_html() -> Optional[str]:
+            response = self.spider.request(url)
+            return response.text if response else None
+
+        async with self._gate_for(url):
+            if self._expired():
+                return None
+            if spec is None:
+                result = await asyncio.to_thread(self.spider.parse_article, url)
+            else:
+                # 只有请求占用主机并发名额，解析在进程池中进行，不阻塞下一个请求
+                html = await asyncio.to_thread(fetch_html)
+        if spec is not None:
+            if html is None:
+                return None
+            result = await parser_pool.parse_article(self.spider, spec, url, html)
+
+        content_store = get_content_store()
+        if content_store and isinstance(result, dict):
+            # 正文写入内容存储，之后的结果、JSONL、JSON / Excel 中只保留引用
+            result = await asyncio.to_thread(content_store.externalize, result)
+        return result
+
+    def _save_checkpoint(self, stopped: bool = False):
+        """保存当前进度"""
+        if self.checkpoint and self._progress:
+            self.checkpoint(dict(self._progress, parsed=self._parsed, stopped=stopped))
+
+    async def crawl(self, max_pages: int, start_page: int = 1) -> List[Dict]:
+        """抓取从 start_page 起的 max_pages 个列表页及其详情页"""
+        # 默认线程池大小与 CPU 数相关，这里按并发上限显式配置，避免并发被线程池卡住
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency + self.prefetch + 1, thread_name_prefix='spider')
+        )
+        all_data = []
+
+        resume = self.resume_state
+        if resume:
+            if resume.get('stopped'):
+                logger.info(f"检查点显示该站点已抓取完毕")
+                return all_data
+            start_page, end_page = resume['page'], resume['end_page']
+        else:
+            end_page = start_page + max_pages - 1
+
+        # 列表页抓取任务 {页码: Task}：当前页之后的 prefetch 个列表页提前抓取，与详情页并行
+        list_tasks: Dict[int, asyncio.Task] = {}
+        cancelled = threading.Event()
+
+        def fetch_candidates(page_no: int):
+            if cancelled.is_set():
+                return []
+            try:
+                return list(self.spider.get_article_candidates(page_no))
+            except ListPageError as e:
+                # 与空页相同：跳过该页，继续下一页
+                logger.warning(str(e))
+                return []
+
+        def schedule(page_no: int):
+            if page_no <= end_page and page_no not in list_tasks:
+                list_tasks[page_no] = asyncio.create_task(asyncio.to_thread(fetch_candidates, page_no))
+
+        finished = False
+        try:
+            for page in range(start_page, end_page + 1):
+                if self._expired():
+                    break
+
+                logger.info(f"\n--- 第 {page} 页 ---")
+
+                resuming = resume and page == start_page and resume.get('pending') is not None
+                if not resuming:
+                    schedule(page)
+                for ahead in range(page + 1, page + 1 + self.prefetch):
+                    if ahead not in list_tasks:
+                        self.prefetch_stats['scheduled'] += 1
+                    schedule(ahead)
+
+                if resuming:
+                    # 从检查点恢复：直接处理该页剩余的详情页，不重新筛选列表页
+                    article_urls, stop_signal = list(resume['pending']), resume['stop_after_page']
+                    logger.info(f"从检查点恢复：本页剩余 {len(article_urls)} 个详情页")
+                else:
+                    # 获取该页的所有文章候选（可能已由预取完成）
+                    task = list_tasks.pop(page)
+                    if page != start_page and self.prefetch:
+                        self.prefetch_stats['used'] += 1
+                    candidates = await task
+
+                    if not candidates:
+                        logger.warning(f"第 {page} 页没有找到文章链接")
+                        continue
+
+                    article_urls, stop_signal = self._select_candidates(candidates)
+                    logger.info(f"找到 {len(candidates)} 个链接，需访问详情页 {len(article_urls)} 个"
+                                f"（并发 {self.concurrency}）")
+
+                self._progress = {'page': page, 'end_page': end_page, 'pending': article_urls,
+                                  'stop_after_page': stop_signal}
+                self._save_checkpoint()
+
+                # 并发访问详情页，按原顺序收集结果
+                tasks = [asyncio.create_task(self._fetch_article(url)) for url in article_urls]
+                try:
+                    for index, task in enumerate(tasks):
+                        result = await task
+                        if result is None and self.timed_out:
+                            # 超时后未发起的请求保留在 pending 中，续抓时再处理
+                            break
+                        if result == 'STOP':
+                            # 遇到早于目标月份的文章，停止整个爬虫
+                            logger.info(f"收到停止信号，结束抓取")
+                            stop_signal = True
+                            break
+                        elif result and self._below_high_water(result):
+                            logger.info(f"到达高水位线 {self.high_water['publish_date']}，停止增量抓取")
+                            stop_signal = True
+                            break
+                        elif result and self.sink:
+                            self.sink.write(result)
+                            all_data.append(_article_summary(result))
+                        elif result:
+                            all_data.append(result)
+
+                        if result and result['url'] not in self._parsed:
+                            self._parsed.append(result['url'])
+                        self._progress['pending'] = article_urls[index + 1:]
+                        if (index + 1) % config.SPIDER_CHECKPOINT_EVERY == 0:
+                            self._save_checkpoint()
+                finally:
+                    # 取消尚未开始的详情页请求（已在线程中执行的请求会自然结束）
+                    for task in tasks:
+                        if not task.done():
+                            task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+                if self.timed_out:
+                    break
+
+                # 本页已完成，下次从下一页继续
+                self._progress = {'page': page + 1, 'end_page': end_page, 'pending': None,
+                                  'stop_after_page': False}
+
+                if stop_signal:
+                    break
+
+            finished = not self.timed_out
+        finally:
+            # 停止后不再需要的预取：尚未开始的直接取消，已在线程中执行的请求会自然结束
+            cancelled.set()
+            for task in list_tasks.values():
+                task.cancel()
+            self.prefetch_stats['unused'] += len(list_tasks)
+            await asyncio.gather(*list_tasks.values(), return_exceptions=True)
+
+            # 正常结束、超时或被中断（Ctrl-C 时事件循环会取消本协程）都保存进度
+            self._save_checkpoint(stopped=finished)
+
+        return all_data
+
+    def run(self, max_pages: int, start_page: int = 1) -> List[Dict]:
+        """同步入口"""
+        return asyncio.run(self.crawl(max_pages, start_page))
+
+
+def month_range(oldest: Tuple[int, int], newest: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """返回 oldest ~ newest（含两端）的所有月份 [(year, month), ...]，按时间正序"""
+    months = []
+    year, month = oldest
+    while (year, month) <= newest:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def bucket_by_month(articles: List[Dict]) -> Dict[Tuple[int, int], List[Dict]]:
+    """按发布月份分桶 {(year, month): [文章, ...]}，桶内保持原顺序"""
+    buckets: Dict[Tuple[int, int], List[Dict]] = {}
+    for article in articles:
+        key = (int(article['publish_date'][:4]), int(article['publish_date'][5:7]))
+        buckets.setdefault(key, []).append(article)
+    return buckets
+
+
+def run_spider(spider_class, spider_name: str, max_pages: int = 50, concurrency: int = None,
+               deadline: float = None, incremental: bool = False, locate_pages: bool = None,
+               months: List[Tuple[int, int]] = None, sink: JsonlExporter = None, resume: bool = False,
+               cancel: threading.Event = None):
+    """
+    运行爬虫
+
+    Args:
+        spider_class: 爬虫类
+        spider_name: 爬虫名称（用于日志）
+        max_pages: 最大抓取页数
+        concurrency: 单主机详情页并发数（None 则使用 config.SPIDER_CONCURRENCY，1 为顺序抓取）
+        deadline: 截止时间（time.monotonic() 时间点），超时后返回已采集的部分数据
+        incremental: 增量模式，只返回高水位线之后的新文章
+        locate_pages: 先用 PageLocator 定位目标月份所在的列表页范围再抓取
+                      （None 则按 config.SPIDER_LOCATE_PAGES 判断）
+        months: 目标月份列表 [(year, month), ...]，一次遍历采集全部月份；
+                None 则为 config.TARGET_YEAR / TARGET_MONTH 单月
+        sink: 流式导出器，文章边抓边写入 JSONL；此时返回的列表只含摘要字段（见 _article_summary）
+        resume: 从上次中断时保存的检查点继续（需配合以 append=True 打开的 sink）
+        cancel: 中断标志，置位后停止发起新请求并保留检查点（见 run_spider_all 的 Ctrl-C 处理）
+
+    抓取过程中定期保存检查点；抓取正常结束（未超时）时删除检查点，并推进该站点各目标月份的高水位线。
+    """
+    months = sorted(set(months or [(config.TARGET_YEAR, config.TARGET_MONTH)]))
+    oldest, newest = months[0], months[-1]
 
-        if stop_signal:
-            break
+    logger.info(f"\n{'='*60}")
+    logger.info(f"开始抓取: {spider_name}")
+    if len(months) == 1:
+        logger.info(f"目标月份: {newest[0]}-{newest[1]:02d}")
+    else:
+        logger.info(f"目标月份: {oldest[0]}-{oldest[1]:02d} ~ {newest[0]}-{newest[1]:02d}（共 {len(months)} 个月）")
+    logger.info(f"{'='*60}\n")
+
+    hwm_store = HighWaterMarkStore()
+    high_water = None
+    if incremental:
+        marks = [hwm_store.get(spider_name, year, month) for year, month in months]
+        if all(marks):
+            # 多个月份时以最早的高水位线为准：较早月份在其高水位线之后发布的文章也需要补齐
+            high_water = min(marks, key=lambda mark: mark['publish_date'])
+            logger.info(f"增量模式：高水位线 {high_water['publish_date']} ({high_water['url']})")
+        else:
+            logger.info(f"增量模式：部分目标月份尚无高水位线，执行完整抓取")
+
+    checkpoints = CrawlCheckpointStore()
+    resume_state = None
+    if resume and sink is None:
+        logger.warning(f"续抓需要流式导出（JSONL）保存已采集的文章，本次从头抓取")
+    elif resume:
+        resume_state = checkpoints.get(spider_name, months)
+        if resume_state:
+            logger.info(f"从检查点续抓：第 {resume_state['page']} 页，已采集 {len(resume_state['parsed'])} 篇"
+                        + ("（已抓取完毕）" if resume_state['stopped'] else ""))
+        else:
+            logger.info(f"没有可用的检查点，从头抓取")
+
+    spider = spider_class()
+    spider.set_target_months(months)
+
+    start_page = 1
+    if resume_state:
+        # 页码范围沿用检查点
+        locate_pages = False
+    elif locate_pages is None:
+        locate_pages = PageLocator.enabled_for(*oldest)
+    if locate_pages:
+        locator = PageLocator(spider)
+        page_range = locator.locate()
+        if page_range:
+            start_page, last_page = page_range
+            # 多抓一页：定位之后若有新文章发布，目标月份会整体后移
+            max_pages = min(max_pages, last_page - start_page + 2)
+            logger.info(f"[页码定位] 目标月份位于第 {start_page}-{last_page} 页（探测 {locator.probes} 页），"
+                        f"抓取第 {start_page}-{start_page + max_pages - 1} 页")
+        else:
+            logger.info(f"[页码定位] 未能定位（探测 {locator.probes} 页），从第 1 页开始抓取")
+
+    engine = AsyncCrawlEngine(spider, concurrency=concurrency, deadline=deadline, high_water=high_water,
+                              sink=sink, checkpoint=lambda state: checkpoints.save(spider_name, months, state),
+                              resume_state=resume_state, cancel=cancel)
+    all_data = engine.run(max_pages, start_page)
+    if resume_state:
+        # 补上中断前已采集的文章（摘要取自 JSONL）
+        fetched = {article['url'] for article in all_data}
+        earlier = [sink.written[url] for url in resume_state['parsed'] if url in sink.written and url not in fetched]
+        all_data = earlier + all_data
+    if len(months) > 1:
+        # 月份不连续时，范围内未请求的月份不保留
+        wanted = set(months)
+        all_data = [article for article in all_data
+                    if (int(article['publish_date'][:4]), int(article['publish_date'][5:7])) in wanted]
+
+    if engine.saved_detail_requests:
+        logger.info(f"{spider_name} 凭列表页元数据节省详情页请求 {engine.saved_detail_requests} 次")
+    engine.frontier.log_stats(spider_name)
+    if engine.prefetch_stats['scheduled']:
+        stats = engine.prefetch_stats
+        logger.info(f"{spider_name} 列表页预取 {stats['scheduled']} 页，命中 {stats['used']} 页，未使用 {stats['unused']} 页")
+
+    if engine.timed_out:
+        # 中途超时/熔断：较新的文章已采集而较旧的没有，此时推进高水位线会漏掉中间的文章
+        reason = '站点熔断' if engine.circuit_open else '抓取中断' if engine.interrupted else '抓取超时'
+        logger.warning(f"{spider_name} {reason}，仅返回已采集的 {len(all_data)} 条数据")
+    else:
+        checkpoints.clear(spider_name, months)
+        buckets = bucket_by_month(all_data)
+        for year, month in months:
+            hwm_store.advance(spider_name, year, month, buckets.get((year, month), []))
 
     logger.info(f"\n{spider_name} 抓取完成，共获取 {len(all_data)} 条数据\n")
 
     return all_data
 
 
-def run_spider_all(target_year: int = None, target_month: int = None, max_pages: int = 20) -> List[Dict]:
+# 已注册的站点爬虫：(爬虫类, 站点名称)，顺序即合并结果的顺序
+SPIDER_REGISTRY = [
+    (InwaisheSpider, 'in外设'),
+    (WstxSpider, '外设天下'),
+]
+
+
+def register_site(site: Dict) -> type:
+    """按站点描述注册爬虫（id 与已注册站点相同时替换该站点），返回生成的爬虫类"""
+    spider_class = make_site_adapter(site)
+    SPIDER_REGISTRY[:] = [
+        (registered, name) for registered, name in SPIDER_REGISTRY
+        if getattr(registered, 'SITE', {}).get('id') != site['id']
+    ]
+    SPIDER_REGISTRY.append((spider_class, site['name']))
+    return spider_class
+
+
+if config.SPIDER_SITES_FILE and not in_parser_worker():
+    # 解析进程按 parser_spec() 重建爬虫，不需要注册表
+    try:
+        for _site in load_site_specs(config.SPIDER_SITES_FILE):
+            register_site(_site)
+    except (OSError, ValueError, re.error) as e:
+        logger.error(f"加载站点描述失败 ({config.SPIDER_SITES_FILE}): {e}")
+
+
+def run_spider_all(target_year: int = None, target_month: int = None, max_pages: int = 20,
+                   site_timeout: float = None, incremental: bool = False,
+                   months: List[Tuple[int, int]] = None, stream: bool = False,
+                   resume: bool = False) -> List[Dict]:
     """
-    运行所有爬虫并返回数据
+    并行运行所有已注册的爬虫并返回数据
+
+    各站点在独立线程中运行，互不共享礼貌延时，总耗时约为最慢站点的耗时。
+    单个站点出错或超时只影响该站点，结果按 SPIDER_REGISTRY 顺序合并。
 
     Args:
         target_year: 目标年份（None 则使用 config 配置）
         target_month: 目标月份（None 则使用 config 配置）
         max_pages: 最大抓取页数
+        site_timeout: 单站点超时秒数（None 则使用 config.SPIDER_SITE_TIMEOUT）
+        incremental: 增量模式，各站点遇到已采集内容即停止，只返回新文章
+        months: 目标月份列表 [(year, month), ...]（见 month_range()）。每个站点只遍历一次列表页，
+                越过最早的月份才停止；结果可用 bucket_by_month() 按月拆分。
+                指定后忽略 target_year / target_month，max_pages 为整个范围的总页数
+        stream: 流式导出，文章边抓边追加到各月份的 report_data_YYYY_MM.jsonl
+                （增量模式下追加到已有文件，否则重写）
+        resume: 从各站点上次中断时的检查点继续，已采集的文章不再请求（隐含 stream，沿用已有 JSONL）
 
     Returns:
-        List[Dict]: 抓取到的文章数据列表
+        List[Dict]: 抓取到的文章数据列表（增量模式下仅为新文章；流式导出时只含摘要字段，
+                    完整数据在 JSONL 文件中）
     """
+    if months:
+        target_year, target_month = max(months)
+
     # 如果指定了年月，更新配置
     if target_year is not None and target_month is not None:
         config.TARGET_YEAR = target_year
         config.TARGET_MONTH = target_month
         config.OUTPUT_EXCEL = f'report_data_{target_year}_{target_month:02d}.xlsx'
         config.OUTPUT_JSON = f'report_data_{target_year}_{target_month:02d}.json'
+        config.OUTPUT_PARQUET = f'report_data_{target_year}_{target_month:02d}.parquet'
 
-    print(f"目标月份: {config.TARGET_YEAR}-{config.TARGET_MONTH:02d}")
+    if site_timeout is None:
+        site_timeout = config.SPIDER_SITE_TIMEOUT
+
+    if months and len(set(months)) > 1:
+        oldest = min(months)
+        print(f"目标月份: {oldest[0]}-{oldest[1]:02d} ~ {config.TARGET_YEAR}-{config.TARGET_MONTH:02d}")
+    else:
+        print(f"目标月份: {config.TARGET_YEAR}-{config.TARGET_MONTH:02d}")
     print(f"输出目录: {config.OUTPUT_DIR}/")
     print("-" * 60)
 
     # 创建输出目录
     Path(config.OUTPUT_DIR).mkdir(exist_ok=True)
 
-    # 运行爬虫
-    all_articles = []
+    sink = None
+    if stream or resume:
+        sink = JsonlExporter(months or [(config.TARGET_YEAR, config.TARGET_MONTH)], append=incremental or resume)
 
-    # in外设
-    try:
-        inwaishe_data = run_spider(InwaisheSpider, "in外设", max_pages=max_pages)
-        all_articles.extend(inwaishe_data)
-    except Exception as e:
-        logger.error(f"in外设 抓取出错: {e}")
+    # 熔断状态只在本次运行内有效
+    reset_circuit_breaker()
 
-    # 外设天下
+    # 并行运行各站点爬虫（爬虫内部按截止时间自行收尾）
+    deadline = time.monotonic() + site_timeout
+    # Ctrl-C 只在主线程抛出 KeyboardInterrupt，由该标志通知各站点线程停止
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(SPIDER_REGISTRY), thread_name_prefix='site')
+    futures = [
+        executor.submit(run_spider, spider_class, spider_name, max_pages=max_pages, deadline=deadline,
+                        incremental=incremental, months=months, sink=sink, resume=resume, cancel=cancel)
+        for spider_class, spider_name in SPIDER_REGISTRY
+    ]
+
+    all_articles = []
     try:
-        wstx_data = run_spider(WstxSpider, "外设天下", max_pages=max_pages)
-        all_articles.extend(wstx_data)
-    except Exception as e:
-        logger.error(f"外设天下 抓取出错: {e}")
+        for (spider_class, spider_name), future in zip(SPIDER_REGISTRY, futures):
+            # 额外留出宽限时间，等待正在进行的请求结束
+            remaining = max(0.0, deadline - time.monotonic()) + config.REQUEST_TIMEOUT * 2
+            try:
+                all_articles.extend(future.result(timeout=remaining))
+            except FuturesTimeoutError:
+                logger.error(f"{spider_name} 抓取超时（{site_timeout:.0f} 秒），已放弃该站点")
+            except Exception as e:
+                logger.error(f"{spider_name} 抓取出错: {e}")
+    except KeyboardInterrupt:
+        # 各站点不再发起新请求，等待正在进行的请求结束并保存检查点（之后可用 --resume 继续）
+        logger.warning("收到中断信号，正在停止各站点并保存检查点...")
+        cancel.set()
+        wait_futures(futures, timeout=config.REQUEST_TIMEOUT * 2)
+        raise
+    finally:
+        # 不等待已放弃的站点线程（其后续写入会被已关闭的 sink 忽略）
+        executor.shutdown(wait=False)
+        if sink:
+            sink.close()
+            logger.info(f"[流式导出] 本次写入 {sink.appended} 篇: "
+                        + ', '.join(str(sink.path_for(*month)) for month in sorted(sink.months)))
+
+    get_rate_limiter().log_stats()
+    get_circuit_breaker().log_stats()
+    if get_autothrottle():
+        get_autothrottle().log_stats()
+    if get_http_cache():
+        get_http_cache().log_stats()
+    if get_parser_pool():
+        get_parser_pool().log_stats()
+    if get_content_store():
+        get_content_store().log_stats()
+    if get_archive_writer():
+        get_archive_writer().log_stats()
 
     return all_articles
 
 
-def main(export: bool = True):
+def main(export: bool = True, target_year: int = None, target_month: int = None, max_pages: int = 20,
+         incremental: bool = False, months: List[Tuple[int, int]] = None, resume: bool = False):
     """
     主函数
 
     Args:
         export: 是否导出数据到文件（默认 True）
+        target_year: 目标年份（None 则使用 config 配置）
+        target_month: 目标月份（None 则使用 config 配置）
+        max_pages: 每个站点最大抓取页数
+        incremental: 增量模式，只抓取新文章并追加到该月已有数据集
+        months: 目标月份列表（多月份一次遍历），数据按月导出到各自的 report_data_YYYY_MM 文件
+        resume: 从上次中断处继续抓取（已采集的文章保存在 JSONL 中，不再重新请求）
     """
     print(r"""
     ╔═══════════════════════════════════════════════════════╗
@@ -561,8 +2882,10 @@ def main(export: bool = True):
     ╚═══════════════════════════════════════════════════════╝
     """)
 
-    # 运行爬虫
-    all_articles = run_spider_all()
+    # 运行爬虫（导出时默认边抓边写 JSONL，抓取结束后由 JSONL 生成 JSON / Excel）
+    stream = export and (config.SPIDER_STREAM_JSONL or resume)
+    all_articles = run_spider_all(target_year, target_month, max_pages=max_pages, incremental=incremental,
+                                  months=months, stream=stream, resume=resume)
 
     # 导出数据
     if export:
@@ -573,14 +2896,33 @@ def main(export: bool = True):
             logger.info(f"开始导出数据")
             logger.info(f"{'='*60}\n")
 
-            exporter.export_to_excel(all_articles)
-            exporter.export_to_json(all_articles)
+            if months:
+                buckets = bucket_by_month(all_articles)
+            else:
+                buckets = {(config.TARGET_YEAR, config.TARGET_MONTH): all_articles}
+            for (year, month), articles in sorted(buckets.items(), reverse=True):
+                # 单月时沿用 config.OUTPUT_JSON / OUTPUT_EXCEL / OUTPUT_PARQUET
+                excel_name = f'report_data_{year}_{month:02d}.xlsx' if months else None
+                json_name = f'report_data_{year}_{month:02d}.json' if months else config.OUTPUT_JSON
+                if stream:
+                    jsonl_path = exporter.output_dir / f'report_data_{year}_{month:02d}.jsonl'
+                    exporter.export_jsonl(jsonl_path, json_name, excel_name)
+                elif incremental:
+                    merged = exporter.merge_into_json(articles, json_name)
+                    exporter.export_tables(merged, excel_name)
+                else:
+                    exporter.export_tables(articles, excel_name)
+                    exporter.export_to_json(articles, json_name)
+                if len(buckets) > 1:
+                    print(f"  {year}-{month:02d}: {len(articles)} 条 → {json_name}")
 
             print(f"\n{'='*60}")
             print(f"✓ 抓取完成！")
-            print(f"✓ 共采集 {len(all_articles)} 条文章")
+            print(f"✓ 共采集 {len(all_articles)} 条{'新' if incremental else ''}文章")
             print(f"✓ 数据已保存到: {config.OUTPUT_DIR}/")
             print(f"{'='*60}\n")
+        elif incremental:
+            logger.info("没有新文章，数据集保持不变")
         else:
             logger.warning("没有采集到任何数据")
     else:
@@ -589,4 +2931,59 @@ def main(export: bool = True):
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='外设资讯自动化采集工具')
+    parser.add_argument(
+        '--month',
+        type=str,
+        metavar='YYYY-MM',
+        help='目标月份（格式: YYYY-MM，默认使用 config 配置）'
+    )
+    parser.add_argument(
+        '--since',
+        type=str,
+        metavar='YYYY-MM',
+        help='回填起始月份：一次遍历采集 --since ~ --month 的所有月份，按月分别导出'
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=None,
+        help='每个站点最大抓取页数（默认: 每个目标月份 20 页）'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='增量模式：遇到已采集的文章即停止，新文章追加到该月已有数据集'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断（崩溃、Ctrl-C、超时）的检查点继续抓取，已采集的文章不再请求'
+    )
+    args = parser.parse_args()
+
+    def parse_month(value: str):
+        match = re.match(r'(\d{4})-(\d{2})$', value)
+        if not match:
+            print(f"[ERROR] 无效的月份格式: {value}")
+            print("正确格式: YYYY-MM (例如: 2026-01)")
+            raise SystemExit(1)
+        return int(match.group(1)), int(match.group(2))
+
+    target_year = target_month = None
+    if args.month:
+        target_year, target_month = parse_month(args.month)
+
+    months = None
+    if args.since:
+        newest = (target_year, target_month) if args.month else (config.TARGET_YEAR, config.TARGET_MONTH)
+        months = month_range(parse_month(args.since), newest)
+        if not months:
+            print(f"[ERROR] --since {args.since} 晚于目标月份 {newest[0]}-{newest[1]:02d}")
+            raise SystemExit(1)
+
+    max_pages = args.max_pages or 20 * len(months or [None])
+    main(target_year=target_year, target_month=target_month, max_pages=max_pages,
+         incremental=args.incremental, months=months, resume=args.resume)